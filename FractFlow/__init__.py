@@ -1,4 +1,12 @@
-from .infra.config import ConfigManager
-from .agent import Agent
-
 __all__ = ['ConfigManager', 'Agent']
+
+def __getattr__(name):
+    # Loaded on first use, so that tool servers importing FractFlow helpers do not import the agent stack
+    if name == 'ConfigManager':
+        from .infra.config import ConfigManager as value
+    elif name == 'Agent':
+        from .agent import Agent as value
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
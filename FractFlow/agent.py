@@ -14,13 +14,16 @@ Provides a simple user-friendly interface for interacting with the FractalFlow a
 
 import os
 import asyncio
-from typing import Dict, Any, Optional, List
+from typing import AsyncIterator, Dict, Any, Optional, List, Tuple, Union
 
 from .core.orchestrator import Orchestrator
 from .core.query_processor import QueryProcessor
 from .core.tool_executor import ToolExecutor
+from .conversation.base_history import ConversationHistory
 from .infra.config import ConfigManager
+from .mcpcore.connection import is_remote_server
 from .infra.logging_utils import get_logger
+from .infra import tracing, usage
 
 class Agent:
     """
@@ -44,9 +47,14 @@ class Agent:
         
         # Push agent name to call path
         self.config.push_to_call_path(self.name)
+        self.call_path = self.config.get_call_path()
         
         # Initialize logger with call path
-        self.logger = get_logger(self.config.get_call_path())
+        self.logger = get_logger(self.call_path)
+        
+        # Start tracing if a trace file is configured
+        if self.config.get('tracing.file'):
+            tracing.configure(self.config.get('tracing.file'))
         
         # Initialize tool configs
         self.tool_configs = {}
@@ -63,11 +71,16 @@ class Agent:
         """
         Add a tool to the agent.
         
+        Tools are either scripts, started as stdio servers when the agent
+        starts, or URLs of running MCP servers: URLs ending with /sse use the
+        SSE transport, other URLs streamable HTTP, e.g.
+        ``http://127.0.0.1:9001/mcp``.
+        
         Args:
-            tool_path: Path to the tool script
+            tool_path: Path to the tool script, or URL of a running MCP server
             tool_name: Optional name for the tool. If not provided, the basename of the path will be used.
         """
-        if not os.path.exists(tool_path):
+        if not is_remote_server(tool_path) and not os.path.exists(tool_path):
             raise ValueError(f"Tool script not found: {tool_path}")
         
         self.tool_configs[tool_name] = tool_path
@@ -96,11 +109,16 @@ class Agent:
             
             self.logger.info("Agent components initialized")
     
+    async def _start_orchestrator(self) -> None:
+        """Start the orchestrator and bind its client pool to the tool executor."""
+        self.logger.info("Starting orchestrator")
+        await self._orchestrator.start()
+        self._tool_executor.set_client_pool(self._orchestrator.launcher.client_pool)
+    
     async def initialize(self) -> None:
         """Initialize and start the agent system."""
         self._ensure_initialized()
-        self.logger.info("Starting orchestrator")
-        await self._orchestrator.start()
+        await self._start_orchestrator()
         self.logger.info("Agent system started")
     
     async def shutdown(self) -> None:
@@ -111,31 +129,63 @@ class Agent:
             self._is_initialized = False
             self.logger.info("Agent system shut down")
     
-    async def process_query(self, query: str) -> str:
+    async def process_query(self, query: str, return_usage: bool = False) -> Union[str, Tuple[str, Dict[str, Any]]]:
         """
         Process a user query.
         
         Args:
             query: The user's input query
+            return_usage: Also return the token usage of the query, including
+                          the agents serving this one as tools
             
         Returns:
-            The agent's response
+            The agent's response, or a tuple of the response and the usage
+            summary (see UsageLedger.summarize) if return_usage is set
         """
         # Initialize if not already initialized
         self._ensure_initialized()
         
         # Start the orchestrator if not already started
         if not hasattr(self._orchestrator, "launcher") or self._orchestrator.launcher is None:
-            self.logger.info("Starting orchestrator")
-            await self._orchestrator.start()
+            await self._start_orchestrator()
         
         # Log the incoming query
         self.logger.info(f"Processing query", {"query": query})
         
         # Process the query
-        result = await self._query_processor.process_query(query)
+        with usage.collect(self.call_path) as ledger:
+            result = await self._query_processor.process_query(query)
         
-        return result 
+        if not return_usage:
+            return result
+        query_usage = ledger.summarize(self.config.get('usage.prices'))
+        self.logger.debug("Query usage", {"total": query_usage['total']})
+        return result, query_usage
+    
+    async def stream_query(self, query: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process a user query, streaming progress as it happens.
+        
+        Yields token deltas while the model generates, and tool requests and
+        results as soon as they are available. Tools start running as soon as
+        the model finishes writing each request. The last event is always of
+        type "final" and carries the same text process_query would return.
+        
+        Args:
+            query: The user's input query
+            
+        Yields:
+            Event dictionaries, see QueryProcessor.stream_query for the event types
+        """
+        self._ensure_initialized()
+        
+        if not hasattr(self._orchestrator, "launcher") or self._orchestrator.launcher is None:
+            await self._start_orchestrator()
+        
+        self.logger.info(f"Streaming query", {"query": query})
+        
+        async for event in self._query_processor.stream_query(query):
+            yield event
         
     def get_history(self) -> List[Dict[str, Any]]:
         """
@@ -145,4 +195,66 @@ class Agent:
             The current conversation history as a list of message dictionaries
         """
         self._ensure_initialized()
-        return self._query_processor.get_history() 
\ No newline at end of file
+        return self._query_processor.get_history()
+    
+    def get_tool_server_health(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the supervision counters of the agent's tool servers.
+        
+        Returns:
+            Server state, circuit state, restart, timeout and latency counters
+            by tool name, empty unless ``mcp_supervise`` is enabled
+        """
+        if not self._orchestrator or not self._orchestrator.launcher:
+            return {}
+        return self._orchestrator.launcher.get_server_health()
+    
+    def get_model_endpoint_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the latency and error statistics of the agent's model providers.
+        
+        Returns:
+            Request, error, hedge and win counters, error rate and latency
+            averages and p95 by provider, empty unless ``routing_providers``
+            lists more than one provider
+        """
+        if not self._orchestrator:
+            return {}
+        model = self._orchestrator.get_model()
+        return model.get_endpoint_stats() if hasattr(model, 'get_endpoint_stats') else {}
+    
+    def new_history(self) -> ConversationHistory:
+        """
+        Create an empty conversation history for this agent.
+        
+        Lets one agent serve several independent conversations by swapping
+        their histories in with swap_history().
+        
+        Returns:
+            A history holding only the agent's system prompt
+        """
+        self._ensure_initialized()
+        return self._orchestrator.get_model().create_history()
+    
+    def swap_history(self, history: ConversationHistory) -> ConversationHistory:
+        """
+        Continue another conversation with this agent.
+        
+        Args:
+            history: The conversation to continue, e.g. one from new_history()
+            
+        Returns:
+            The history the agent was using before
+        """
+        self._ensure_initialized()
+        return self._orchestrator.get_model().swap_history(history)
+    
+    def reset_history(self) -> None:
+        """
+        Clear the conversation history, keeping the system prompt.
+        
+        Lets a long-lived agent serve independent queries as if it had just been created.
+        """
+        if self._orchestrator:
+            self._orchestrator.get_model().history.clear()
+            self.logger.debug("Conversation history reset")
@@ -0,0 +1,265 @@
+"""
+Agent pool.
+
+Keeps a bounded set of pre-initialized agents alive so that repeated
+queries can reuse them instead of paying the startup cost of launching
+every tool server again.
+"""
+
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from .agent import Agent
+from .infra.logging_utils import get_logger
+from .infra import tracing
+
+class _PooledAgent:
+    """Bookkeeping for a single agent owned by the pool."""
+
+    def __init__(self):
+        self.agent: Optional[Agent] = None
+        self.task: Optional[asyncio.Task] = None
+        self.stop_event = asyncio.Event()
+        self.last_used = time.monotonic()
+
+class AgentPool:
+    """
+    Server-lifetime pool of initialized agents.
+
+    Each agent is created, and later shut down, inside its own owner task.
+    MCP stdio connections are bound to the task that opened them, so this
+    lets agents be created by one request and evicted by another without
+    tearing down their tool servers from the wrong task.
+
+    Agents are leased one query at a time. Their conversation history is
+    reset when they are returned so that every lease starts from the
+    system prompt, just like a freshly created agent.
+    """
+
+    def __init__(self,
+                 factory: Callable[[], Awaitable[Agent]],
+                 max_size: int = 1,
+                 idle_timeout: Optional[float] = 600.0,
+                 name: str = 'agent_pool'):
+        """
+        Initialize the agent pool.
+
+        Args:
+            factory: Coroutine function returning an initialized Agent
+            max_size: Maximum number of agents alive at the same time
+            idle_timeout: Seconds an idle agent is kept before being shut down,
+                          None keeps idle agents for the lifetime of the pool
+            name: Name used for logging
+        """
+        self.factory = factory
+        self.max_size = max(1, max_size)
+        self.idle_timeout = idle_timeout
+        self.name = name
+        self.logger = get_logger(name)
+
+        self._idle: List[_PooledAgent] = []
+        self._leased: Dict[int, _PooledAgent] = {}
+        self._size = 0
+        self._condition: Optional[asyncio.Condition] = None
+        self._reaper: Optional[asyncio.Task] = None
+        self._closed = False
+
+    def _get_condition(self) -> asyncio.Condition:
+        """Create the condition lazily so it binds to the running event loop."""
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    @property
+    def size(self) -> int:
+        """Number of agents currently alive, leased or idle."""
+        return self._size
+
+    async def _own_agent(self, entry: _PooledAgent, ready: asyncio.Future) -> None:
+        """
+        Create an agent and keep it alive until the entry is stopped.
+
+        Args:
+            entry: Pool entry to populate
+            ready: Future resolved with the agent once it is initialized
+        """
+        try:
+            agent = await self.factory()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            return
+
+        if ready.done():
+            # The requester went away while the agent was starting
+            await agent.shutdown()
+            return
+        ready.set_result(agent)
+
+        try:
+            await entry.stop_event.wait()
+        finally:
+            try:
+                await agent.shutdown()
+            except Exception as e:
+                self.logger.error("Error shutting down pooled agent", {"error": str(e)})
+
+    async def _create_entry(self) -> _PooledAgent:
+        """
+        Start a new agent in its own owner task.
+
+        Returns:
+            The populated pool entry
+        """
+        entry = _PooledAgent()
+        ready = asyncio.get_running_loop().create_future()
+        start_time = time.monotonic()
+        with tracing.span("agent_startup", "agent", pool=self.name):
+            entry.task = asyncio.create_task(self._own_agent(entry, ready))
+            entry.agent = await ready
+        self.logger.info("Started pooled agent", {
+            "startup_seconds": round(time.monotonic() - start_time, 3),
+            "pool_size": self._size
+        })
+        return entry
+
+    async def _stop_entry(self, entry: _PooledAgent) -> None:
+        """
+        Stop an agent and wait for its owner task to shut it down.
+
+        Args:
+            entry: Pool entry to stop
+        """
+        entry.stop_event.set()
+        if entry.task:
+            await entry.task
+
+    def _ensure_reaper(self) -> None:
+        """Start the idle eviction task if it is not running yet."""
+        if self.idle_timeout is None or self._reaper is not None:
+            return
+        self._reaper = asyncio.create_task(self._reap_idle())
+
+    async def _reap_idle(self) -> None:
+        """Periodically shut down agents that have been idle for too long."""
+        interval = max(1.0, min(self.idle_timeout / 2, 30.0))
+        while not self._closed:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            condition = self._get_condition()
+            async with condition:
+                expired = [e for e in self._idle if now - e.last_used >= self.idle_timeout]
+                self._idle = [e for e in self._idle if e not in expired]
+                self._size -= len(expired)
+                if expired:
+                    condition.notify(len(expired))
+            for entry in expired:
+                self.logger.info("Evicting idle pooled agent", {"idle_seconds": round(now - entry.last_used, 1)})
+                await self._stop_entry(entry)
+
+    async def acquire(self) -> Agent:
+        """
+        Lease an agent from the pool, starting a new one if there is room.
+
+        Waits for an agent to be released when the pool is at capacity.
+
+        Returns:
+            An initialized agent with a fresh conversation history
+        """
+        if self._closed:
+            raise RuntimeError("Agent pool is closed")
+
+        self._ensure_reaper()
+        condition = self._get_condition()
+        entry = None
+        async with condition:
+            while True:
+                if self._idle:
+                    # Reuse the most recently used agent so older ones can idle out
+                    entry = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                await condition.wait()
+
+        if entry is None:
+            try:
+                entry = await self._create_entry()
+            except BaseException:
+                async with condition:
+                    self._size -= 1
+                    condition.notify()
+                raise
+
+        self._leased[id(entry.agent)] = entry
+        return entry.agent
+
+    async def release(self, agent: Agent, discard: bool = False) -> None:
+        """
+        Return a leased agent to the pool.
+
+        Args:
+            agent: The agent obtained from acquire()
+            discard: Shut the agent down instead of keeping it warm, e.g. after a failure
+        """
+        entry = self._leased.pop(id(agent), None)
+        if entry is None:
+            self.logger.warning("Released an agent that is not leased from this pool")
+            return
+
+        if not discard:
+            try:
+                agent.reset_history()
+            except Exception as e:
+                self.logger.warning("Failed to reset pooled agent history", {"error": str(e)})
+                discard = True
+
+        condition = self._get_condition()
+        async with condition:
+            if discard or self._closed:
+                self._size -= 1
+            else:
+                entry.last_used = time.monotonic()
+                self._idle.append(entry)
+            condition.notify()
+
+        if discard or self._closed:
+            await self._stop_entry(entry)
+
+    @asynccontextmanager
+    async def lease(self):
+        """
+        Context manager that leases an agent for the duration of the block.
+
+        The agent is discarded if the block raises or is cancelled, since its
+        state can no longer be trusted.
+        """
+        agent = await self.acquire()
+        discard = True
+        try:
+            yield agent
+            discard = False
+        finally:
+            await self.release(agent, discard=discard)
+
+    async def close(self) -> None:
+        """Shut down every agent in the pool and stop idle eviction."""
+        self._closed = True
+        if self._reaper:
+            self._reaper.cancel()
+            try:
+                await self._reaper
+            except asyncio.CancelledError:
+                pass
+            self._reaper = None
+
+        entries = self._idle + list(self._leased.values())
+        self._idle = []
+        self._leased = {}
+        self._size = 0
+        for entry in entries:
+            await self._stop_entry(entry)
+        self.logger.info("Agent pool closed", {"agents_stopped": len(entries)})
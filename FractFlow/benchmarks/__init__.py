@@ -0,0 +1,19 @@
+"""
+Offline benchmarks.
+
+Measures the overhead of the agent framework itself by running agents
+against a local OpenAI-compatible stub server and synthetic MCP servers, so
+that results do not depend on network or model latency.
+
+Run with ``python -m FractFlow.benchmarks``.
+"""
+
+from .stub_llm import StubLLMServer, StubScript
+from .synthetic_servers import write_nested_agent, write_synthetic_server
+
+__all__ = [
+    'StubLLMServer',
+    'StubScript',
+    'write_nested_agent',
+    'write_synthetic_server',
+]
@@ -0,0 +1,361 @@
+"""
+Benchmark runner.
+
+Runs the offline benchmark scenarios and reports startup time, per-iteration
+framework overhead, latency percentiles and memory, optionally comparing
+them against a saved baseline.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import resource
+import tempfile
+import statistics
+from typing import Any, Dict, List, Optional
+
+from ..agent import Agent
+from ..infra.config import ConfigManager
+from ..mcpcore.launcher import MCPLauncher
+from ..mcpcore.zygote import zygote_supported
+from .stub_llm import StubLLMServer, StubScript
+from .synthetic_servers import write_nested_agent, write_synthetic_server
+
+# Metrics compared against a baseline, all lower is better
+COMPARED_METRICS = ('startup_s', 'p50_ms', 'p99_ms', 'overhead_ms_per_iteration')
+
+# Row keys that identify a scenario configuration
+_PARAMETERS = ('servers', 'launch_mode', 'launch_method', 'tools', 'history', 'agents')
+
+# Differences below these absolute amounts are noise, not regressions
+_NOISE_FLOOR = {'startup_s': 0.05, 'p50_ms': 1.0, 'p99_ms': 2.0, 'overhead_ms_per_iteration': 0.5}
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Compute a percentile with linear interpolation.
+
+    Args:
+        values: Samples
+        q: Percentile between 0 and 100
+
+    Returns:
+        The percentile, 0.0 for no samples
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def _rss_mb() -> float:
+    """Current resident set size of this process in MB."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, IndexError):
+        # Peak instead of current RSS where /proc is unavailable; ru_maxrss is bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+class BenchmarkRunner:
+    """
+    Runs the benchmark scenarios against one stub LLM server.
+
+    Scenarios:
+    - startup: MCPLauncher.launch_all with growing numbers of servers, in
+      sequential and concurrent launch mode, spawning servers or forking
+      them from a zygote
+    - agent_loop: Agent.process_query at varying tool counts and history lengths
+    - concurrency: several agents querying at once
+    - nested: an agent calling a ToolTemplate agent running as an MCP server
+    """
+
+    def __init__(self, stub: StubLLMServer, work_dir: str, queries: int = 20, repeats: int = 3,
+                 tool_calling_mode: str = 'auto'):
+        """
+        Initialize the runner.
+
+        Args:
+            stub: Running stub LLM server
+            work_dir: Directory for generated server scripts
+            queries: Queries measured per scenario
+            repeats: Launches measured per startup scenario
+            tool_calling_mode: Tool calling mode of the benchmarked agents
+        """
+        self.stub = stub
+        self.work_dir = work_dir
+        self.queries = queries
+        self.repeats = repeats
+        self.tool_calling_mode = tool_calling_mode
+        self.results: List[Dict[str, Any]] = []
+
+    def config_kwargs(self, **overrides: Any) -> Dict[str, Any]:
+        """ConfigManager arguments that point every model at the stub server."""
+        kwargs = {
+            'provider': 'deepseek',
+            'deepseek_base_url': self.stub.base_url,
+            'deepseek_api_key': 'benchmark',
+            'deepseek_model': 'stub',
+            'tool_calling_base_url': self.stub.base_url,
+            'tool_calling_model': 'stub',
+            'tool_calling_version': 'turbo',
+            'tool_calling_mode': self.tool_calling_mode,
+            'max_iterations': self.stub.script.tool_rounds + 2,
+        }
+        kwargs.update(overrides)
+        return kwargs
+
+    def _server(self, name: str, tool_count: int) -> str:
+        return write_synthetic_server(self.work_dir, name, tool_count=tool_count)
+
+    def _record(self, scenario: str, params: Dict[str, Any], metrics: Dict[str, Any]) -> None:
+        row = {"scenario": scenario, **params, **{k: round(v, 3) if isinstance(v, float) else v for k, v in metrics.items()}}
+        self.results.append(row)
+        print(json.dumps(row), flush=True)
+
+    async def bench_startup(self, server_counts: List[int], tools_per_server: int = 4) -> None:
+        """Measure how long launching MCP servers takes."""
+        methods = ('spawn', 'zygote') if zygote_supported() else ('spawn',)
+        for count in server_counts:
+            paths = [self._server(f"startup_{i}", tools_per_server) for i in range(count)]
+            for method in methods:
+                for mode in ('sequential', 'concurrent'):
+                    durations = []
+                    for _ in range(self.repeats):
+                        launcher = MCPLauncher(ConfigManager(**self.config_kwargs(
+                            mcp_launch_mode=mode, mcp_launch_method=method)))
+                        for i, path in enumerate(paths):
+                            launcher.register_server(f"startup_{i}", path)
+                        start = time.perf_counter()
+                        await launcher.launch_all()
+                        durations.append(time.perf_counter() - start)
+                        await launcher.shutdown()
+                    # The median hides the one-time zygote startup, which the launch logs report
+                    self._record("startup", {"servers": count, "launch_mode": mode, "launch_method": method}, {
+                        "startup_s": statistics.median(durations),
+                        "rss_mb": _rss_mb()
+                    })
+
+    async def _create_agent(self, tool_configs: Dict[str, str], **config_overrides: Any) -> Agent:
+        agent = Agent(ConfigManager(**self.config_kwargs(**config_overrides)), name='benchmark_agent')
+        for tool_name, path in tool_configs.items():
+            agent.add_tool(path, tool_name)
+        await agent.initialize()
+        return agent
+
+    @staticmethod
+    def _prefill(agent: Agent, history_length: int) -> None:
+        """Reset the agent and add earlier turns to its history."""
+        agent.reset_history()
+        model = agent._orchestrator.get_model()
+        for i in range(history_length):
+            model.add_user_message(f"Earlier question {i}: " + "context " * 40)
+            model.add_assistant_message(f"Earlier answer {i}: " + "details " * 40)
+
+    async def _run_queries(self, agents: List[Agent], history_length: int) -> Dict[str, Any]:
+        """
+        Run the measured queries, spread across the agents.
+
+        Returns:
+            Latency, overhead and memory metrics
+        """
+        latencies: List[float] = []
+        failures = 0
+        iterations_per_query = self.stub.script.tool_rounds + 1
+
+        async def worker(agent: Agent, count: int) -> None:
+            nonlocal failures
+            for i in range(count):
+                self._prefill(agent, history_length)
+                start = time.perf_counter()
+                result = await agent.process_query(f"Benchmark query {i}")
+                latencies.append(time.perf_counter() - start)
+                if self.stub.script.final_text not in result:
+                    failures += 1
+
+        per_agent = max(1, self.queries // len(agents))
+        self.stub.reset_stats()
+        rss_before = _rss_mb()
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(worker(agent, per_agent) for agent in agents))
+        wall = time.perf_counter() - wall_start
+
+        # Time not spent inside the stub model is framework, transport and tool overhead
+        llm_seconds = self.stub.stats["server_seconds"]
+        total_iterations = len(latencies) * iterations_per_query
+        return {
+            "queries": len(latencies),
+            "failures": failures,
+            "llm_requests": self.stub.stats["requests"],
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "overhead_ms_per_iteration": max(0.0, sum(latencies) - llm_seconds) / max(1, total_iterations) * 1000,
+            "throughput_qps": len(latencies) / wall if wall else 0.0,
+            "rss_mb": _rss_mb(),
+            "rss_growth_mb": _rss_mb() - rss_before,
+            "peak_rss_mb": _peak_rss_mb()
+        }
+
+    async def bench_agent_loop(self, tool_counts: List[int], history_lengths: List[int]) -> None:
+        """Measure query latency and overhead at varying tool counts and history lengths."""
+        for tool_count in tool_counts:
+            path = self._server(f"loop_{tool_count}", tool_count)
+            start = time.perf_counter()
+            agent = await self._create_agent({f"loop_{tool_count}": path})
+            startup = time.perf_counter() - start
+            try:
+                for history_length in history_lengths:
+                    metrics = await self._run_queries([agent], history_length)
+                    self._record("agent_loop", {"tools": tool_count, "history": history_length},
+                                 {"startup_s": startup, **metrics})
+            finally:
+                await agent.shutdown()
+
+    async def bench_concurrency(self, levels: List[int], tool_count: int = 8) -> None:
+        """Measure latency and throughput with several agents querying at once."""
+        path = self._server(f"concurrency_{tool_count}", tool_count)
+        for level in levels:
+            start = time.perf_counter()
+            agents = await asyncio.gather(*(
+                self._create_agent({f"concurrency_{tool_count}": path}, mcp_share_servers=True)
+                for _ in range(level)
+            ))
+            startup = time.perf_counter() - start
+            try:
+                metrics = await self._run_queries(list(agents), history_length=0)
+                self._record("concurrency", {"agents": level, "tools": tool_count}, {"startup_s": startup, **metrics})
+            finally:
+                for agent in agents:
+                    await agent.shutdown()
+
+    async def bench_nested(self, tool_count: int = 4) -> None:
+        """Measure an agent whose tool is another agent running as an MCP server."""
+        leaf = self._server(f"nested_leaf_{tool_count}", tool_count)
+        child = write_nested_agent(
+            self.work_dir, "nested_child_agent", [(leaf, f"nested_leaf_{tool_count}")], self.config_kwargs()
+        )
+        start = time.perf_counter()
+        agent = await self._create_agent({"nested_child_agent": child})
+        startup = time.perf_counter() - start
+        try:
+            # The child agent starts its own tools during the first query, which shows in p99
+            metrics = await self._run_queries([agent], history_length=0)
+            self._record("nested", {"tools": tool_count}, {"startup_s": startup, **metrics})
+        finally:
+            await agent.shutdown()
+
+def compare_with_baseline(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    """
+    Find metrics that got worse than the baseline by more than the tolerance.
+
+    Args:
+        results: Rows of the current run
+        baseline: Rows of a previous run
+        tolerance: Accepted relative slowdown, e.g. 0.25 for 25%
+
+    Returns:
+        Descriptions of the regressions
+    """
+    def key(row: Dict[str, Any]) -> tuple:
+        return tuple(sorted((k, v) for k, v in row.items() if k == 'scenario' or k in _PARAMETERS))
+
+    previous = {key(row): row for row in baseline}
+    regressions = []
+    for row in results:
+        old = previous.get(key(row))
+        if old is None:
+            continue
+        for metric in COMPARED_METRICS:
+            if metric not in row or metric not in old:
+                continue
+            if row[metric] > old[metric] * (1 + tolerance) and row[metric] - old[metric] > _NOISE_FLOOR[metric]:
+                regressions.append(f"{dict(key(row))}: {metric} {old[metric]} -> {row[metric]}")
+    return regressions
+
+def _int_list(text: str) -> List[int]:
+    return [int(value) for value in text.split(',') if value.strip()]
+
+async def run_benchmarks(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """
+    Run the selected scenarios.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        Result rows
+    """
+    script = StubScript(
+        tool_rounds=args.tool_rounds,
+        calls_per_round=args.calls_per_round,
+        latency=args.llm_latency,
+        jitter=args.llm_jitter
+    )
+    with StubLLMServer(script) as stub, tempfile.TemporaryDirectory(prefix='fractflow_bench_') as work_dir:
+        runner = BenchmarkRunner(stub, work_dir, queries=args.queries, repeats=args.repeats,
+                                 tool_calling_mode=args.tool_calling_mode)
+        scenarios = set(args.scenarios.split(','))
+        if 'startup' in scenarios:
+            await runner.bench_startup(_int_list(args.server_counts))
+        if 'agent_loop' in scenarios:
+            await runner.bench_agent_loop(_int_list(args.tool_counts), _int_list(args.history_lengths))
+        if 'concurrency' in scenarios:
+            await runner.bench_concurrency(_int_list(args.concurrency))
+        if 'nested' in scenarios:
+            await runner.bench_nested()
+        return runner.results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command line entry point.
+
+    Returns:
+        Exit code, 1 if a regression against the baseline was found
+    """
+    parser = argparse.ArgumentParser(description='Offline FractFlow benchmarks')
+    parser.add_argument('--scenarios', default='startup,agent_loop,concurrency,nested',
+                        help='Comma separated scenarios: startup, agent_loop, concurrency, nested')
+    parser.add_argument('--server-counts', default='1,4,8', help='Server counts for the startup scenario')
+    parser.add_argument('--tool-counts', default='1,8,32', help='Tool counts for the agent loop scenario')
+    parser.add_argument('--history-lengths', default='0,50', help='Earlier turns in the history for the agent loop scenario')
+    parser.add_argument('--concurrency', default='1,4', help='Concurrent agents for the concurrency scenario')
+    parser.add_argument('--queries', type=int, default=20, help='Queries measured per scenario')
+    parser.add_argument('--repeats', type=int, default=3, help='Launches measured per startup scenario')
+    parser.add_argument('--tool-rounds', type=int, default=2, help='Tool calling rounds per query')
+    parser.add_argument('--calls-per-round', type=int, default=1, help='Tool calls requested per round')
+    parser.add_argument('--llm-latency', type=float, default=0.0, help='Seconds the stub model waits per completion')
+    parser.add_argument('--tool-calling-mode', default='auto', choices=['auto', 'native', 'two_stage'],
+                        help='Tool calling mode of the benchmarked agents')
+    parser.add_argument('--llm-jitter', type=float, default=0.0, help='Maximum random extra seconds per completion')
+    parser.add_argument('--output', '-o', help='Write the results to this JSON file')
+    parser.add_argument('--baseline', help='Compare against results saved with --output')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Accepted relative slowdown against the baseline')
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run_benchmarks(args))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare_with_baseline(results, json.load(f), args.tolerance)
+        if regressions:
+            print("Regressions against the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("No regressions against the baseline")
+    return 0
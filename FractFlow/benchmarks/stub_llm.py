@@ -0,0 +1,322 @@
+"""
+Stub LLM server.
+
+An OpenAI-compatible chat completions endpoint with scripted responses and
+configurable latency, served from a background thread.
+"""
+
+import re
+import json
+import time
+import uuid
+import socket
+import random
+import asyncio
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+# Matches a tool in the tool descriptions that history adapters append to user messages
+_TOOL_PATTERN = re.compile(r"\*\*Available Tool\*\*: (\S+)\nDescription: [\s\S]*?\nParameters:\n((?:  .*(?:\n|$))*)")
+_REQUEST_PATTERN = re.compile(r"<tool_request>(.*?)</tool_request>", re.DOTALL)
+_PARAM_PATTERN = re.compile(r"  - (\S+) \((\w+), (required|optional)\)")
+
+# Placeholder values for required arguments, by JSON schema type
+_ARGUMENT_VALUES = {
+    'string': 'benchmark',
+    'integer': 1,
+    'number': 1.0,
+    'boolean': True,
+    'array': [],
+    'object': {},
+}
+
+TOOL_RESULT_PREFIX = "Tool result from"
+
+class StubScript:
+    """
+    Decides what the stub model answers.
+
+    Every user query is answered with ``tool_rounds`` rounds of tool calls,
+    each asking for ``calls_per_round`` tools picked round-robin from the
+    available tools, followed by a final answer. Requests with a ``tools``
+    parameter get native tool calls, otherwise the tools described in the
+    prompt are requested with ``<tool_request>`` tags containing tool call
+    JSON, so the turbo tool calling helper accepts them without another
+    completion.
+    """
+
+    def __init__(self,
+                 tool_rounds: int = 1,
+                 calls_per_round: int = 1,
+                 latency: float = 0.0,
+                 jitter: float = 0.0,
+                 final_text: str = "Benchmark complete.",
+                 padding_chars: int = 0):
+        """
+        Initialize the script.
+
+        Args:
+            tool_rounds: Tool calling rounds before the final answer
+            calls_per_round: Tool calls requested in each round
+            latency: Seconds to wait before responding
+            jitter: Maximum extra seconds added at random to the latency
+            final_text: Text of the final answer
+            padding_chars: Characters of filler text added to every response
+        """
+        self.tool_rounds = tool_rounds
+        self.calls_per_round = calls_per_round
+        self.latency = latency
+        self.jitter = jitter
+        self.final_text = final_text
+        self.padding_chars = padding_chars
+
+    def delay(self) -> float:
+        """Seconds to wait before the next response."""
+        return self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    @staticmethod
+    def _find_tools(messages: List[Dict[str, Any]]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Extract tool names and placeholder arguments from the tool descriptions."""
+        tools = []
+        for message in messages:
+            content = message.get("content") or ""
+            if "**Available Tool**" not in content:
+                continue
+            for name, params in _TOOL_PATTERN.findall(content):
+                arguments = {
+                    param: _ARGUMENT_VALUES.get(param_type, 'benchmark')
+                    for param, param_type, requirement in _PARAM_PATTERN.findall(params)
+                    if requirement == 'required'
+                }
+                tools.append((name, arguments))
+        if tools:
+            return tools
+
+        # Tool descriptions only accompany the first prompt of a turn, later rounds reuse the requested tools
+        for message in messages:
+            if message.get("role") != "assistant":
+                continue
+            for instruction in _REQUEST_PATTERN.findall(message.get("content") or ""):
+                for call in json.loads(instruction).get("tool_calls", []):
+                    tool = (call["function"]["name"], call["function"]["arguments"])
+                    if tool not in tools:
+                        tools.append(tool)
+        return tools
+
+    @staticmethod
+    def _schema_tools(schemas: List[Dict[str, Any]]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Extract tool names and placeholder arguments from tool schemas."""
+        tools = []
+        for schema in schemas:
+            function = schema.get("function", {})
+            parameters = function.get("parameters") or {}
+            properties = parameters.get("properties", {})
+            arguments = {
+                param: _ARGUMENT_VALUES.get(properties.get(param, {}).get("type"), 'benchmark')
+                for param in parameters.get("required", [])
+            }
+            tools.append((function.get("name"), arguments))
+        return tools
+
+    @staticmethod
+    def _completed_rounds(messages: List[Dict[str, Any]]) -> int:
+        """Count the tool calling rounds since the latest user query."""
+        rounds = 0
+        for message in reversed(messages):
+            content = message.get("content") or ""
+            if message.get("role") == "assistant":
+                rounds += 1 if "<tool_request>" in content or message.get("tool_calls") else 0
+            elif message.get("role") == "user" and not content.startswith(TOOL_RESULT_PREFIX):
+                break
+        return rounds
+
+    def _next_calls(self, messages: List[Dict[str, Any]],
+                    tools: List[Tuple[str, Dict[str, Any]]]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Pick the tool calls of the next round, empty when it is time for the final answer."""
+        completed = self._completed_rounds(messages)
+        if not tools or completed >= self.tool_rounds:
+            return []
+        return [tools[(completed * self.calls_per_round + i) % len(tools)] for i in range(self.calls_per_round)]
+
+    def respond(self, messages: List[Dict[str, Any]],
+                tools: Optional[List[Dict[str, Any]]] = None) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Build the response to a conversation.
+
+        Args:
+            messages: Messages of the chat completion request
+            tools: Tool schemas of the request's tools parameter, if any
+
+        Returns:
+            Tuple of (content, native tool calls in OpenAI format)
+        """
+        padding = "." * self.padding_chars
+        if tools:
+            calls = self._next_calls(messages, self._schema_tools(tools))
+            tool_calls = [{
+                "id": f"call_{uuid.uuid4().hex[:8]}",
+                "type": "function",
+                "function": {"name": name, "arguments": json.dumps(arguments)}
+            } for name, arguments in calls]
+            return (padding if tool_calls else f"{padding}{self.final_text}"), tool_calls
+
+        calls = self._next_calls(messages, self._find_tools(messages))
+        if not calls:
+            return f"{padding}{self.final_text}", []
+
+        requests = []
+        for name, arguments in calls:
+            instruction = {"tool_calls": [{"function": {"name": name, "arguments": arguments}}]}
+            requests.append(f"<tool_request>{json.dumps(instruction)}</tool_request>")
+        return f"{padding}Calling tools.\n" + "\n".join(requests), []
+
+class StubLLMServer:
+    """
+    Local OpenAI-compatible server answering from a StubScript.
+
+    The server runs its own event loop in a background thread, so it can be
+    used from synchronous code and from the benchmarked event loop alike.
+    """
+
+    def __init__(self, script: Optional[StubScript] = None, host: str = '127.0.0.1', port: int = 0):
+        """
+        Initialize the server.
+
+        Args:
+            script: Script deciding the responses
+            host: Interface to listen on
+            port: Port to listen on, 0 picks a free port
+        """
+        self.script = script or StubScript()
+        self.host = host
+        self.port = port
+        self.stats = {"requests": 0, "server_seconds": 0.0}
+        self._server: Optional[uvicorn.Server] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        """Base URL to configure as the provider's base_url."""
+        return f"http://{self.host}:{self.port}/v1"
+
+    def reset_stats(self) -> None:
+        """Zero the request counters."""
+        with self._lock:
+            self.stats = {"requests": 0, "server_seconds": 0.0}
+
+    def _record(self, seconds: float) -> None:
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["server_seconds"] += seconds
+
+    async def _chat_completions(self, request: Request):
+        start = time.perf_counter()
+        body = await request.json()
+        messages = body.get("messages", [])
+        content, tool_calls = self.script.respond(messages, body.get("tools"))
+        delay = self.script.delay()
+        if delay:
+            await asyncio.sleep(delay)
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        model = body.get("model", "stub")
+
+        if not body.get("stream"):
+            prompt_chars = sum(len(str(m.get("content") or "")) for m in messages)
+            response = JSONResponse({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content, "tool_calls": tool_calls or None},
+                    "finish_reason": "tool_calls" if tool_calls else "stop"
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_chars // 4,
+                    "completion_tokens": len(content) // 4,
+                    "total_tokens": (prompt_chars + len(content)) // 4
+                }
+            })
+            self._record(time.perf_counter() - start)
+            return response
+
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+            return "data: " + json.dumps({
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            }) + "\n\n"
+
+        async def events():
+            yield chunk({"role": "assistant", "content": ""})
+            for i in range(0, len(content), 16):
+                yield chunk({"content": content[i:i + 16]})
+            for index, tool_call in enumerate(tool_calls):
+                # Name first, then the arguments in pieces, like real providers stream them
+                arguments = tool_call["function"]["arguments"]
+                yield chunk({"tool_calls": [{
+                    "index": index, "id": tool_call["id"], "type": "function",
+                    "function": {"name": tool_call["function"]["name"], "arguments": ""}
+                }]})
+                for i in range(0, len(arguments), 16):
+                    yield chunk({"tool_calls": [{"index": index, "function": {"arguments": arguments[i:i + 16]}}]})
+            yield chunk({}, "tool_calls" if tool_calls else "stop")
+            yield "data: [DONE]\n\n"
+            self._record(time.perf_counter() - start)
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    def start(self) -> str:
+        """
+        Start serving in a background thread.
+
+        Returns:
+            The base URL of the server
+        """
+        app = Starlette(routes=[
+            Route("/v1/chat/completions", self._chat_completions, methods=["POST"]),
+            Route("/chat/completions", self._chat_completions, methods=["POST"]),
+        ])
+        # asyncio only disables Nagle's algorithm on sockets created with an explicit IPPROTO_TCP,
+        # without it every response waits ~40ms for a delayed ACK
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        self.port = sock.getsockname()[1]
+
+        self._server = uvicorn.Server(uvicorn.Config(app, log_level="warning", lifespan="off", access_log=False))
+        self._thread = threading.Thread(target=self._server.run, kwargs={"sockets": [sock]}, daemon=True)
+        self._thread.start()
+        while not self._server.started:
+            if not self._thread.is_alive():
+                raise RuntimeError("Stub LLM server failed to start")
+            time.sleep(0.01)
+        return self.base_url
+
+    def stop(self) -> None:
+        """Stop the server and wait for its thread to exit."""
+        if self._server is not None:
+            self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._server = None
+        self._thread = None
+
+    def __enter__(self) -> 'StubLLMServer':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
@@ -0,0 +1,114 @@
+"""
+Synthetic MCP servers.
+
+Generates FastMCP server scripts with a configurable number of tools,
+latency and payload size, and ToolTemplate agent scripts that wrap them,
+for benchmarking server startup, tool calls and nested agents.
+"""
+
+import os
+from typing import Any, Dict, List, Tuple
+
+# Root of the FractFlow checkout, added to sys.path of generated agents
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_SERVER_TEMPLATE = '''"""Synthetic MCP server generated by FractFlow.benchmarks."""
+
+import asyncio
+from mcp.server.fastmcp import FastMCP
+
+NAME = {name!r}
+TOOL_COUNT = {tool_count!r}
+LATENCY = {latency!r}
+PAYLOAD = "x" * {payload_chars!r}
+
+mcp = FastMCP(NAME)
+
+def _make_tool(index):
+    async def tool(query: str) -> str:
+        if LATENCY:
+            await asyncio.sleep(LATENCY)
+        return f"{{NAME}} tool {{index}} result for {{query}}" + PAYLOAD
+    return tool
+
+for _index in range(TOOL_COUNT):
+    mcp.tool(name=f"{{NAME}}_tool_{{_index}}", description=f"Synthetic benchmark tool {{_index}} of {{NAME}}")(_make_tool(_index))
+
+if __name__ == "__main__":
+    mcp.run(transport="stdio")
+'''
+
+_AGENT_TEMPLATE = '''"""Synthetic ToolTemplate agent generated by FractFlow.benchmarks."""
+
+import sys
+sys.path.insert(0, {project_root!r})
+
+from FractFlow.tool_template import ToolTemplate
+from FractFlow.infra.config import ConfigManager
+
+class {class_name}(ToolTemplate):
+    SYSTEM_PROMPT = "You are a synthetic agent used to benchmark FractFlow."
+    TOOL_DESCRIPTION = "Synthetic nested agent used to benchmark FractFlow. Parameters: query: str"
+    TOOLS = {tools!r}
+
+    @classmethod
+    def create_config(cls):
+        return ConfigManager(custom_system_prompt=cls.SYSTEM_PROMPT, **{config_kwargs!r})
+
+if __name__ == "__main__":
+    # Keep the benchmark output readable
+    sys.argv += ["--log-level", "ERROR"]
+    {class_name}.main()
+'''
+
+def write_synthetic_server(directory: str, name: str, tool_count: int = 4,
+                           latency: float = 0.0, payload_chars: int = 0) -> str:
+    """
+    Write a FastMCP server script with synthetic tools.
+
+    Tools are named ``<name>_tool_<i>``, take a ``query`` string and return
+    a fixed result, so names stay unique when several servers are combined.
+
+    Args:
+        directory: Directory to write the script into
+        name: Server name, also used as the tool name prefix
+        tool_count: Number of tools the server exposes
+        latency: Seconds each tool call waits before returning
+        payload_chars: Characters of filler added to every result
+
+    Returns:
+        Path of the script
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{name}.py")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(_SERVER_TEMPLATE.format(
+            name=name, tool_count=tool_count, latency=latency, payload_chars=payload_chars
+        ))
+    return path
+
+def write_nested_agent(directory: str, name: str, tools: List[Tuple[str, str]],
+                       config_kwargs: Dict[str, Any]) -> str:
+    """
+    Write a ToolTemplate agent script that runs as an MCP server.
+
+    Args:
+        directory: Directory to write the script into
+        name: Agent name, also the module and tool name
+        tools: (script path, tool name) pairs of the agent's own tools
+        config_kwargs: ConfigManager arguments, typically pointing at the stub LLM
+
+    Returns:
+        Path of the script
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{name}.py")
+    class_name = ''.join(part.capitalize() for part in name.split('_'))
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(_AGENT_TEMPLATE.format(
+            project_root=_PROJECT_ROOT,
+            class_name=class_name,
+            tools=[(os.path.abspath(script), tool_name) for script, tool_name in tools],
+            config_kwargs=config_kwargs
+        ))
+    return path
@@ -9,6 +9,7 @@ from typing import List, Dict, Any, Optional
 from abc import ABC, abstractmethod
 import logging
 from ..infra.logging_utils import get_logger
+from .compaction import HistoryCompactor
 
 logger = get_logger(__name__)
 
@@ -119,14 +120,16 @@ class ConversationHistory(BaseConversationHistory):
     formatted history.
     """
     
-    def __init__(self, system_prompt: str = ""):
+    def __init__(self, system_prompt: str = "", compactor: Optional[HistoryCompactor] = None):
         """
         Initialize the conversation history.
         
         Args:
             system_prompt: Initial system prompt to set
+            compactor: Optional compactor keeping the history within a token budget
         """
         self.messages = []
+        self.compactor = compactor
         if system_prompt:
             self.add_system_message(system_prompt)
     
@@ -241,6 +244,40 @@ class ConversationHistory(BaseConversationHistory):
         """Clear the conversation history, except for any system messages."""
         system_messages = [msg for msg in self.messages if msg["role"] == "system"]
         self.messages = system_messages
+        if self.compactor:
+            self.compactor.store.clear()
+    
+    async def compact(self) -> bool:
+        """
+        Compact old tool results if the history exceeds its token budget.
+        
+        The history list is replaced rather than modified in place, so that
+        adapters caching the formatted history notice the change.
+        
+        Returns:
+            True if the history was compacted, False otherwise
+        """
+        if not self.compactor:
+            return False
+        compacted = await self.compactor.compact(self.messages)
+        if compacted is None:
+            return False
+        self.messages = compacted
+        return True
+    
+    def get_full_content(self, ref_id: str) -> Optional[str]:
+        """
+        Get the full content of a compacted tool result.
+        
+        Args:
+            ref_id: Id mentioned in the compacted message
+            
+        Returns:
+            The full tool result, or None if the id is unknown
+        """
+        if not self.compactor:
+            return None
+        return self.compactor.store.get(ref_id)
         
     def format_debug_output(self) -> str:
         """
@@ -0,0 +1,282 @@
+"""
+Conversation history compaction.
+
+Keeps the conversation history within a token budget by shortening old tool
+results, while keeping their full content in a side store addressable by id.
+"""
+
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+from ..infra.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Tokens added by the chat format around every message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Loaded encodings by name, None when an encoding could not be loaded
+_encodings: Dict[str, Any] = {}
+
+def _get_encoding(name: str) -> Optional[Any]:
+    """
+    Load a tiktoken encoding once per process.
+
+    Args:
+        name: Encoding name, e.g. 'cl100k_base'
+
+    Returns:
+        The encoding, or None if tiktoken or the encoding is unavailable
+    """
+    if name not in _encodings:
+        encoding = None
+        if tiktoken is not None:
+            try:
+                encoding = tiktoken.get_encoding(name)
+            except Exception as e:
+                # Encodings are downloaded on first use, which fails offline
+                logger.warning("Tokenizer unavailable, falling back to estimates", {"encoding": name, "error": str(e)})
+        _encodings[name] = encoding
+    return _encodings[name]
+
+class TokenCounter:
+    """
+    Counts tokens with tiktoken when available, and estimates them otherwise.
+
+    The estimate counts about four ASCII characters per token and one token
+    per other character, which is close for both English and CJK text.
+    """
+
+    def __init__(self, encoding_name: str = 'cl100k_base'):
+        """
+        Initialize the counter.
+
+        Args:
+            encoding_name: tiktoken encoding to use
+        """
+        self.encoding_name = encoding_name
+        # Counts of recently seen messages, keyed by id and holding the message so the id stays unique
+        self._message_counts: Dict[int, Tuple[Dict[str, Any], int]] = {}
+
+    def count_text(self, text: str) -> int:
+        """
+        Count the tokens of a text.
+
+        Args:
+            text: Text to count
+
+        Returns:
+            Number of tokens
+        """
+        if not text:
+            return 0
+        encoding = _get_encoding(self.encoding_name)
+        if encoding is not None:
+            return len(encoding.encode(text, disallowed_special=()))
+        ascii_chars = sum(1 for char in text if ord(char) < 128)
+        return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+    def count_message(self, message: Dict[str, Any]) -> int:
+        """
+        Count the tokens of a message, including its tool calls.
+
+        Args:
+            message: Message dictionary
+
+        Returns:
+            Number of tokens
+        """
+        cached = self._message_counts.get(id(message))
+        if cached is not None and cached[0] is message:
+            return cached[1]
+
+        count = MESSAGE_OVERHEAD_TOKENS + self.count_text(str(message.get("content") or ""))
+        for tool_call in message.get("tool_calls") or []:
+            function = tool_call.get("function", {})
+            count += self.count_text(str(function.get("name", ""))) + self.count_text(str(function.get("arguments", "")))
+        self._message_counts[id(message)] = (message, count)
+        return count
+
+    def count_messages(self, messages: List[Dict[str, Any]]) -> int:
+        """
+        Count the tokens of a list of messages.
+
+        Args:
+            messages: Message dictionaries
+
+        Returns:
+            Number of tokens
+        """
+        total = sum(self.count_message(message) for message in messages)
+        if len(self._message_counts) > 2 * len(messages) + 64:
+            # Forget messages that are no longer part of the history
+            live = {id(message) for message in messages}
+            self._message_counts = {key: value for key, value in self._message_counts.items() if key in live}
+        return total
+
+class ToolResultStore:
+    """In-memory store of the full content of compacted tool results."""
+
+    def __init__(self):
+        """Initialize an empty store."""
+        self._contents: Dict[str, str] = {}
+
+    def put(self, content: str) -> str:
+        """
+        Store a tool result.
+
+        Args:
+            content: Full tool result
+
+        Returns:
+            Id under which the content can be retrieved
+        """
+        ref_id = f"result_{uuid.uuid4().hex[:8]}"
+        self._contents[ref_id] = content
+        return ref_id
+
+    def get(self, ref_id: str) -> Optional[str]:
+        """
+        Retrieve a stored tool result.
+
+        Args:
+            ref_id: Id returned by put()
+
+        Returns:
+            The full content, or None if the id is unknown
+        """
+        return self._contents.get(ref_id)
+
+    def remove(self, ref_id: str) -> None:
+        """
+        Forget a stored tool result.
+
+        Args:
+            ref_id: Id returned by put()
+        """
+        self._contents.pop(ref_id, None)
+
+    def clear(self) -> None:
+        """Forget all stored results."""
+        self._contents.clear()
+
+    def __len__(self) -> int:
+        return len(self._contents)
+
+class HistoryCompactor:
+    """
+    Shrinks a conversation history to fit a token budget.
+
+    System and user messages are pinned, as are the most recent messages.
+    Older tool results are replaced, oldest first, by a truncated head or a
+    summary that references the full content in the side store, until the
+    history fits the budget.
+    """
+
+    def __init__(self,
+                 max_tokens: int,
+                 keep_recent_messages: int = 6,
+                 truncated_result_chars: int = 2000,
+                 strategy: str = 'truncate',
+                 token_counter: Optional[TokenCounter] = None,
+                 summarizer: Optional[Callable[[str], Awaitable[Optional[str]]]] = None):
+        """
+        Initialize the compactor.
+
+        Args:
+            max_tokens: Token budget for the whole history
+            keep_recent_messages: Number of most recent messages never compacted
+            truncated_result_chars: Characters of a tool result kept when truncating
+            strategy: 'truncate' or 'summarize'
+            token_counter: Counter used to measure the history
+            summarizer: Coroutine function summarizing a tool result, used by the
+                        'summarize' strategy; truncation is used when it fails
+        """
+        self.max_tokens = max_tokens
+        self.keep_recent_messages = keep_recent_messages
+        self.truncated_result_chars = truncated_result_chars
+        self.strategy = strategy
+        self.token_counter = token_counter or TokenCounter()
+        self.summarizer = summarizer
+        self.store = ToolResultStore()
+
+    async def _shorten(self, content: str, ref_id: str) -> str:
+        """
+        Build the replacement text of a tool result.
+
+        Args:
+            content: Full tool result
+            ref_id: Id of the stored full result
+
+        Returns:
+            Shortened tool result
+        """
+        if self.strategy == 'summarize' and self.summarizer is not None:
+            try:
+                summary = await self.summarizer(content)
+                if summary:
+                    return f"[Summary of tool result {ref_id}, {len(content)} characters]\n{summary}"
+            except Exception as e:
+                logger.warning("Failed to summarize tool result, truncating instead", {"error": str(e)})
+
+        head = content[:self.truncated_result_chars]
+        return f"{head}\n...[truncated {len(content) - len(head)} characters, full tool result stored as {ref_id}]"
+
+    async def compact(self, messages: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Compact a history if it exceeds the token budget.
+
+        Args:
+            messages: Raw conversation history
+
+        Returns:
+            A new list of messages when something was compacted, None otherwise
+        """
+        total = self.token_counter.count_messages(messages)
+        if total <= self.max_tokens:
+            return None
+
+        compacted = list(messages)
+        recent_start = max(0, len(messages) - self.keep_recent_messages)
+        original_total = total
+        count = 0
+
+        for i in range(recent_start):
+            if total <= self.max_tokens:
+                break
+            message = messages[i]
+            content = message.get("content")
+            if message.get("role") != "tool" or "compacted_ref" in message or not isinstance(content, str):
+                continue
+            if len(content) <= self.truncated_result_chars:
+                continue
+
+            ref_id = self.store.put(content)
+            replacement = {**message, "content": await self._shorten(content, ref_id), "compacted_ref": ref_id}
+            saved = self.token_counter.count_message(message) - self.token_counter.count_message(replacement)
+            if saved <= 0:
+                self.store.remove(ref_id)
+                continue
+            compacted[i] = replacement
+            total -= saved
+            count += 1
+
+        if not count:
+            logger.warning("History exceeds the token budget but nothing can be compacted", {
+                "tokens": total,
+                "budget": self.max_tokens
+            })
+            return None
+
+        logger.info("Compacted conversation history", {
+            "compacted_results": count,
+            "tokens_before": original_total,
+            "tokens_after": total,
+            "budget": self.max_tokens
+        })
+        return compacted
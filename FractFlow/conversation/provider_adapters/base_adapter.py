@@ -5,7 +5,7 @@ Defines the interface for provider-specific conversation history adapters.
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 class HistoryAdapter(ABC):
     """
@@ -15,10 +15,53 @@ class HistoryAdapter(ABC):
     standardized way to format conversation history for different AI providers.
     """
     
+    # Whether tool calls and results are sent in the provider's native function calling format
+    native_tool_calls = False
+    
+    def __init__(self):
+        """Initialize the adapter with an empty formatting cache."""
+        self.reset()
+    
+    def reset(self) -> None:
+        """
+        Drop the incremental formatting cache.
+        
+        Call this after rewriting earlier messages of a history in place, the
+        next format_for_model call then formats the whole history again.
+        """
+        self._source: Optional[List[Dict[str, Any]]] = None  # Raw history the cache was built from
+        self._consumed = 0  # Number of raw messages already formatted
+        self._first_raw: Optional[Dict[str, Any]] = None
+        self._last_raw: Optional[Dict[str, Any]] = None
+        self._formatted: List[Dict[str, Any]] = []  # Formatted and merged prefix, without tool descriptions
+        self._desc_before_last = False  # Whether a message before the last one already contains tool descriptions
+        self._last_has_desc = False
+        self._tools_desc_cache: Optional[Tuple[Tuple[int, ...], List[Dict[str, Any]], str]] = None
+    
+    def set_native_tool_calls(self, enabled: bool) -> None:
+        """
+        Switch between native function calling and two-stage tool calling formatting.
+        
+        With native tool calls, assistant messages keep their tool_calls and
+        tool results are sent as tool messages instead of user messages, and
+        no tool descriptions are added to the prompt since the tool schemas
+        are passed in the tools parameter.
+        
+        Args:
+            enabled: Whether to format for native function calling
+        """
+        if enabled != self.native_tool_calls:
+            self.native_tool_calls = enabled
+            self.reset()
+    
     def format_for_model(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
         """
         Format conversation history for a specific model.
         
+        Formatting is incremental: as long as the same history only grows,
+        only the messages added since the previous call are formatted. A
+        history that was cleared or replaced is formatted from scratch.
+        
         Args:
             messages: The raw conversation history
             tools: Optional list of available tools
@@ -26,56 +69,124 @@ class HistoryAdapter(ABC):
         Returns:
             Formatted conversation history appropriate for the model
         """
-        formatted_messages = []
-        tools_desc = None
+        if not hasattr(self, '_formatted'):
+            # Subclasses that define __init__ without calling super()
+            self.reset()
         
-        # Format tool descriptions if provided
-        if tools:
-            tools_desc = self._format_tools_description(tools)
+        if not self._can_extend(messages):
+            self.reset()
+            self._source = messages
+            self._first_raw = messages[0] if messages else None
         
-        for i, message in enumerate(messages):
-            role = message["role"]
-            
-            if role == "system":
-                # System messages are directly supported
-                formatted_messages.append({
-                    "role": "system",
-                    "content": message["content"]
-                })
-                
-            elif role == "user":
-                # For user messages, we might need to append tool descriptions
-                content = message["content"]
-                
-                # Only append tools description to the last user message if needed
-                if i == len(messages) - 1 and tools_desc and not any(self._contains_tool_desc(msg) for msg in formatted_messages):
-                    content = f"{content}\n\nAvailable tools:\n{tools_desc}"
-                    
-                formatted_messages.append({
-                    "role": "user",
-                    "content": content
-                })
-                
-            elif role == "assistant":
-                # Assistant messages are directly supported
-                formatted_messages.append({
-                    "role": "assistant", 
-                    "content": message["content"]
-                })
-                
-            elif role == "tool":
-                # For models, tool results need to be formatted as user messages
-                tool_name = message.get("tool_name", "unknown tool")
-                formatted_messages.append({
-                    "role": "user",
-                    "content": f"Tool result from {tool_name}:\n{message['content']}"
-                })
-        
-        # Check if we have successive user messages and fix them
-        self._ensure_alternating_messages(formatted_messages)
+        for message in messages[self._consumed:]:
+            self._append_formatted(self._format_message(message))
+            self._last_raw = message
+        self._consumed = len(messages)
+        
+        formatted_messages = list(self._formatted)
+        
+        # Only append tools description to the last message if it is a user message
+        tools_desc = self._get_tools_description(tools) if tools and not self.native_tool_calls else None
+        if (tools_desc and self._last_raw is not None and self._last_raw["role"] == "user"
+                and not self._desc_before_last):
+            last = formatted_messages[-1]
+            formatted_messages[-1] = {**last, "content": f"{last['content']}\n\nAvailable tools:\n{tools_desc}"}
                 
         return formatted_messages
     
+    def _can_extend(self, messages: List[Dict[str, Any]]) -> bool:
+        """
+        Check whether the cache holds a prefix of the given history.
+        
+        Args:
+            messages: The raw conversation history
+            
+        Returns:
+            True if only messages appended since the last call need formatting
+        """
+        if messages is not self._source or len(messages) < self._consumed:
+            return False
+        if self._consumed == 0:
+            return True
+        return messages[0] is self._first_raw and messages[self._consumed - 1] is self._last_raw
+    
+    def _format_message(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Format a single raw message.
+        
+        Args:
+            message: Raw message from the conversation history
+            
+        Returns:
+            The formatted message, or None if the role is not supported
+        """
+        role = message["role"]
+        
+        if role == "system":
+            # System messages are directly supported
+            return {"role": "system", "content": message["content"]}
+        elif role == "user":
+            return {"role": "user", "content": message["content"]}
+        elif role == "assistant":
+            # Assistant messages are directly supported
+            formatted = {"role": "assistant", "content": message["content"]}
+            if self.native_tool_calls and message.get("tool_calls"):
+                formatted["tool_calls"] = message["tool_calls"]
+            return formatted
+        elif role == "tool":
+            if self.native_tool_calls:
+                # Tool results may be lists of MCP content items, send them as text like the two-stage format does
+                content = message["content"] if isinstance(message["content"], str) else str(message["content"])
+                return {"role": "tool", "tool_call_id": message.get("tool_call_id"), "content": content}
+            # For models, tool results need to be formatted as user messages
+            tool_name = message.get("tool_name", "unknown tool")
+            return {"role": "user", "content": f"Tool result from {tool_name}:\n{message['content']}"}
+        return None
+    
+    def _append_formatted(self, message: Optional[Dict[str, Any]]) -> None:
+        """
+        Append a formatted message to the cache, merging it with the previous one
+        when both have the same role so that user and assistant messages alternate.
+        
+        Args:
+            message: The formatted message
+        """
+        if message is None:
+            return
+        
+        self._desc_before_last = self._desc_before_last or self._last_has_desc
+        self._last_has_desc = self._contains_tool_desc(message)
+        
+        if self._formatted:
+            previous = self._formatted[-1]
+            # Each tool message answers its own tool call and must stay separate
+            if previous["role"] == message["role"] and message["role"] not in ("system", "tool"):
+                # Replace rather than mutate, lists returned earlier may still hold the previous dict
+                merged = {**previous, "content": f"{previous['content']}\n\n{message['content']}"}
+                if "tool_calls" in message:
+                    merged["tool_calls"] = previous.get("tool_calls", []) + message["tool_calls"]
+                self._formatted[-1] = merged
+                return
+        
+        self._formatted.append(message)
+    
+    def _get_tools_description(self, tools: List[Dict[str, Any]]) -> str:
+        """
+        Get the tool description text, reusing it while the tool set is unchanged.
+        
+        Args:
+            tools: List of available tools
+            
+        Returns:
+            Formatted string describing available tools
+        """
+        # Tool schemas are shared objects owned by the tool registry, so identity tells whether they changed.
+        # The cache keeps references to them, so their ids cannot be reused while cached.
+        key = tuple(map(id, tools))
+        if self._tools_desc_cache is None or self._tools_desc_cache[0] != key:
+            self._tools_desc_cache = (key, list(tools), self._format_tools_description(tools))
+        return self._tools_desc_cache[2]
+    
     def _format_tools_description(self, tools: List[Dict[str, Any]]) -> str:
         """
         Format tool descriptions for inclusion in prompts.
@@ -22,6 +22,7 @@ from FractFlow.models.base_model import BaseModel
 from FractFlow.infra.config import ConfigManager
 from FractFlow.infra.error_handling import AgentError, handle_error, ConfigurationError
 from FractFlow.infra.logging_utils import get_logger
+from FractFlow.mcpcore.connection import is_remote_server
 
 class Orchestrator:
     """
@@ -39,7 +40,7 @@ class Orchestrator:
         Initialize the orchestrator.
         
         Args:
-            tool_configs: Dictionary mapping tool names to their provider scripts
+            tool_configs: Dictionary mapping tool names to their provider scripts or server URLs
                           Example: {'weather': '/path/to/weather_agent.py',
                                    'search': '/path/to/search_tool.py'}
             provider: The AI provider to use (e.g., 'openai', 'deepseek')
@@ -99,7 +100,7 @@ class Orchestrator:
                                    'search': '/path/to/search_tool.py'}
         """
         for tool_name, script_path in tools_config.items():
-            if os.path.exists(script_path):
+            if is_remote_server(script_path) or os.path.exists(script_path):
                 self.register_tool_provider(tool_name, script_path)
                 self.logger.debug(f"Registered tool provider", {"name": tool_name, "path": script_path})
             else:
@@ -146,8 +147,8 @@ class Orchestrator:
         self.logger.debug("Starting orchestrator")
         
         # Initialize MCP components
-        self.launcher = MCPLauncher()
-        self.tool_loader = MCPToolLoader()
+        self.launcher = MCPLauncher(config=self.config.create_copy())
+        self.tool_loader = MCPToolLoader(config=self.config.create_copy())
         
         # Register tools from config
         if self.tool_configs:
@@ -165,10 +166,31 @@ class Orchestrator:
             await self.launcher.shutdown()
             self.logger.debug("Orchestrator shut down")
         
+    @property
+    def tool_registry(self):
+        """
+        Get the registry caching the tool schemas of the launched tool providers.
+        
+        Returns:
+            The ToolRegistry of the launcher's client pool
+        """
+        if not self.launcher:
+            raise ConfigurationError("Orchestrator not started")
+        return self.launcher.client_pool.tool_registry
+        
+    async def refresh_tools(self) -> None:
+        """Fetch the tool lists of all tool providers again, discarding cached schemas."""
+        if not self.launcher:
+            raise ConfigurationError("Orchestrator not started")
+        await self.launcher.client_pool.refresh_tools(force=True)
+        
     async def get_available_tools(self) -> List[Dict[str, Any]]:
         """
         Get available tools from the registered providers.
         
+        Tool schemas are served from the client pool's registry, which only
+        contacts a provider again after its tool list has changed.
+        
         Returns:
             List of available tools
         """
@@ -176,15 +198,9 @@ class Orchestrator:
             raise ConfigurationError("Orchestrator not started")
             
         try:
-            # Get tools from all clients, not just the first one
-            all_tools = []
-            for client_name, session in self.launcher.client_pool.clients.items():
-                try:
-                    client_tools = await self.tool_loader.load_tools(session)
-                    all_tools.extend(client_tools)
-                    self.logger.debug(f"Loaded tools from client", {"client": client_name, "count": len(client_tools)})
-                except Exception as e:
-                    self.logger.error(f"Error loading tools from client", {"client": client_name, "error": str(e)})
+            # Only re-list providers whose tools were invalidated
+            await self.launcher.client_pool.refresh_tools()
+            all_tools = self.tool_registry.get_standard_tools()
             
             self.logger.debug(f"Total tools loaded", {"count": len(all_tools)})
             return all_tools
@@ -205,30 +221,34 @@ class Orchestrator:
             self.logger.warning("Orchestrator not started, returning empty mapping")
             return {}
             
-        mapping = {}
-        
         try:
-            # For each configured tool, get the functions it provides
-            for tool_name, tool_path in self.tool_configs.items():
-                # Find the client for this tool
-                if tool_name in self.launcher.client_pool.clients:
-                    session = self.launcher.client_pool.clients[tool_name]
-                    try:
-                        response = await session.list_tools()
-                        function_names = [tool.name for tool in response.tools]
-                        mapping[tool_name] = function_names
-                        self.logger.debug(f"Mapped tool", {"tool_name": tool_name, "functions": function_names})
-                    except Exception as e:
-                        self.logger.error(f"Error getting functions for tool", {"tool_name": tool_name, "error": str(e)})
-                        mapping[tool_name] = []
-                else:
-                    self.logger.warning(f"No client found for tool", {"tool_name": tool_name})
-                    mapping[tool_name] = []
-                    
+            await self.launcher.client_pool.refresh_tools()
+            return dict(self.tool_registry.memoize("tool_name_mapping", self._build_tool_name_mapping))
         except Exception as e:
             error = handle_error(e)
             self.logger.error(f"Error creating tool name mapping", {"error": str(error)})
+            return {}
             
+    def _build_tool_name_mapping(self) -> Dict[str, List[str]]:
+        """
+        Build the tool name mapping from the cached tool lists.
+        
+        Returns:
+            Dictionary mapping tool names to lists of function names
+        """
+        mapping = {}
+        
+        # For each configured tool, get the functions it provides
+        for tool_name, tool_path in self.tool_configs.items():
+            # Find the client for this tool
+            if tool_name in self.launcher.client_pool.clients:
+                function_names = self.tool_registry.get_function_names(tool_name)
+                mapping[tool_name] = function_names
+                self.logger.debug(f"Mapped tool", {"tool_name": tool_name, "functions": function_names})
+            else:
+                self.logger.warning(f"No client found for tool", {"tool_name": tool_name})
+                mapping[tool_name] = []
+                
         return mapping
 
     def get_model(self) -> BaseModel:
@@ -14,12 +14,14 @@ and processes model responses with tool calls.
 """
 
 import json
-from typing import Dict, Any, Optional, List
+import asyncio
+from typing import AsyncIterator, Dict, Any, Optional, List, Tuple
 from .orchestrator import Orchestrator
 from .tool_executor import ToolExecutor
 from ..infra.config import ConfigManager
 from ..infra.error_handling import AgentError, handle_error
 from ..infra.logging_utils import get_logger
+from ..infra import tracing, usage
 
 class QueryProcessor:
     """
@@ -52,7 +54,11 @@ class QueryProcessor:
         self.logger = get_logger(self.config.get_call_path())
         
         self.max_iterations = self.config.get('agent.max_iterations', 10)
-        self.logger.debug("Query processor initialized", {"max_iterations": self.max_iterations})
+        self.tool_execution_mode = self.config.get('tool_execution.mode', 'sequential')
+        self.logger.debug("Query processor initialized", {
+            "max_iterations": self.max_iterations,
+            "tool_execution_mode": self.tool_execution_mode
+        })
     
     async def process_query(self, user_query: str) -> str:
         """
@@ -64,6 +70,11 @@ class QueryProcessor:
         Returns:
             The final response to the user
         """
+        with tracing.span("agent_turn", "agent", call_path=self.config.get_call_path()):
+            return await self._process_query(user_query)
+    
+    async def _process_query(self, user_query: str) -> str:
+        """Run the loop for process_query()."""
         try:
             model = self.orchestrator.get_model()
             
@@ -74,20 +85,8 @@ class QueryProcessor:
             # Get the tools schema
             tools = await self.orchestrator.get_available_tools()
             
-            # Get tool name mapping and inject it into the model context if there are mappings
-            tool_mapping = await self.orchestrator.get_tool_name_mapping()
-            if tool_mapping:
-                # Create a mapping description for the model
-                mapping_description = self._create_tool_mapping_description(tool_mapping)
-                
-                # Add this as a system-level context injection
-                # We'll add it as a user message that provides context, then immediately add the actual query
-                # This ensures the mapping is fresh for each query without modifying the permanent system prompt
-                model.add_user_message(f"[TOOL MAPPING CONTEXT]\n{mapping_description}\n[USER QUERY FOLLOWS]")
-                # Re-add the actual user query
-                model.add_user_message(user_query)
-                
-                self.logger.debug("Injected tool mapping context", {"mapping": tool_mapping})
+            # Inject the tool name mapping, if any, ahead of the query
+            await self._inject_tool_mapping(model, user_query)
             
             # Initial content placeholder
             content = ""
@@ -95,6 +94,7 @@ class QueryProcessor:
             # Main agent loop
             for iteration in range(self.max_iterations):
                 # self.logger.debug("Starting iteration", {"current": iteration+1, "max": self.max_iterations})
+                usage.set_iteration(iteration+1)
                 
                 # Get response from model
                 response = await model.execute(tools)
@@ -123,46 +123,18 @@ class QueryProcessor:
                     model.add_assistant_message(content, tool_calls)
                     self.logger.debug(f"Processing tool calls", {"count": len(tool_calls)})
                     
-                    # Process each tool call
+                    # Prepare each tool call, dropping malformed ones
+                    prepared_calls = []
                     for tool_call in tool_calls:
-                        # Skip None values
-                        if tool_call is None:
-                            self.logger.warning("Received empty tool call")
-                            continue
-                            
-                        # Extract tool information in OpenAI format
-                        function_info = tool_call["function"]
-                        tool_name = function_info.get("name")
-                        
-                        # Arguments might be a JSON string, so parse it if needed
-                        function_args = function_info.get("arguments", "{}")
-                        if isinstance(function_args, str):
-                            try:
-                                function_args = json.loads(function_args)
-                            except json.JSONDecodeError:
-                                function_args = {}
-                        
-                        tool_call_id = tool_call.get("id", "unknown")
-                        
-                        if not tool_name:
-                            self.logger.warning("Tool call missing 'name' field")
-                            continue
-                        
-                        self.logger.info("Calling tool", {"name": tool_name, "args": function_args})
-                        
-                        # Call the tool
-                        try:
-                            result = await self.tool_executor.execute_tool(tool_name, function_args)
-                            # Add tool execution result log
-                            self.logger.info("Tool execution result", {"tool": tool_name, "result": result})
-                            # Add result to conversation history
-                            model.add_tool_result(tool_name, result, tool_call_id)
-                                
-                        except Exception as e:
-                            error = handle_error(e, {"tool_name": tool_name, "args": function_args})
-                            error_message = f"Error calling tool {tool_name}: {str(error)}"
-                            self.logger.error(error_message, {"tool": tool_name, "error": str(error)})
-                            model.add_tool_result(tool_name, error_message, tool_call_id)
+                        prepared = self._prepare_tool_call(tool_call)
+                        if prepared:
+                            prepared_calls.append(prepared)
+                    
+                    results = await self._execute_prepared_calls(prepared_calls)
+                    
+                    # Add results to conversation history in the original tool call order
+                    for (tool_name, _, tool_call_id), result in zip(prepared_calls, results):
+                        model.add_tool_result(tool_name, result, tool_call_id)
             
             # If we reached the maximum iterations, return a fallback response
             self.logger.warning("Reached maximum iterations", {"max": self.max_iterations})
@@ -179,6 +151,283 @@ class QueryProcessor:
                 self.logger.error("Error occurred while processing query", {"history_length": len(model.history.get_messages())})
             return f"Sorry, there was a technical problem processing your request. Error: {str(error)}"
     
+    async def stream_query(self, user_query: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process a user query through the loop, streaming progress events.
+        
+        Tool requests are resolved and executed as soon as the model closes
+        each <tool_request> tag, or finishes each native tool call, overlapping
+        tool execution with the rest of the generation. In sequential mode tool calls still run one at a time,
+        in the order they were requested.
+        
+        Args:
+            user_query: The user's input query
+            
+        Yields:
+            Event dictionaries with a "type" key:
+            - "token": {"content": str} a piece of the model response
+            - "reasoning": {"content": str} a piece of the model reasoning
+            - "tool_request": {"instruction": str} the model asked for a tool
+            - "tool_result": {"name", "arguments", "tool_call_id", "result"} a tool finished
+            - "final": {"content": str, "iterations": int} the final answer, always the last event
+        """
+        events = self._stream_query(user_query)
+        with tracing.span("agent_turn", "agent", call_path=self.config.get_call_path(), stream=True):
+            try:
+                async for event in events:
+                    yield event
+            finally:
+                # Cancel pending tool work right away if the consumer stopped early
+                await events.aclose()
+    
+    async def _stream_query(self, user_query: str) -> AsyncIterator[Dict[str, Any]]:
+        """Run the loop for stream_query()."""
+        pending: List[asyncio.Task] = []
+        try:
+            model = self.orchestrator.get_model()
+            
+            self.logger.debug("Streaming user query", {"query": user_query})
+            model.add_user_message(user_query)
+            
+            tools = await self.orchestrator.get_available_tools()
+            await self._inject_tool_mapping(model, user_query)
+            
+            content = ""
+            
+            for iteration in range(self.max_iterations):
+                usage.set_iteration(iteration+1)
+                pending = []
+                content = None
+                error = None
+                
+                async for event in model.execute_stream(tools):
+                    event_type = event["type"]
+                    if event_type == "content":
+                        yield {"type": "token", "content": event["delta"]}
+                    elif event_type == "reasoning":
+                        yield {"type": "reasoning", "content": event["delta"]}
+                    elif event_type == "tool_request":
+                        # Start working on the request while the model keeps generating
+                        previous = pending[-1] if pending else None
+                        pending.append(asyncio.create_task(self._handle_tool_request(
+                            model, event["instruction"], tools, event["index"], previous
+                        )))
+                        yield {"type": "tool_request", "instruction": event["instruction"].strip()}
+                    elif event_type == "tool_call":
+                        # Native tool calls need no resolving, start executing right away
+                        previous = pending[-1] if pending else None
+                        pending.append(asyncio.create_task(self._execute_tool_calls(
+                            [event["tool_call"]], previous
+                        )))
+                        yield {"type": "tool_request", "instruction": json.dumps(event["tool_call"]["function"], ensure_ascii=False)}
+                    elif event_type == "done":
+                        content = event["content"]
+                        if event.get("reasoning_content"):
+                            self.logger.info("Reasoning content", {"reasoning": event["reasoning_content"]})
+                    elif event_type == "error":
+                        error = event["error"]
+                
+                if content is None:
+                    raise AgentError(error or "Model stream ended without a response")
+                
+                # Collect the tool calls in the order they were requested
+                tool_calls = []
+                executed = []
+                for task in pending:
+                    request_calls, prepared_calls, results = await task
+                    tool_calls.extend(request_calls)
+                    for (tool_name, function_args, tool_call_id), result in zip(prepared_calls, results):
+                        executed.append((tool_name, tool_call_id, result))
+                        yield {
+                            "type": "tool_result",
+                            "name": tool_name,
+                            "arguments": function_args,
+                            "tool_call_id": tool_call_id,
+                            "result": result
+                        }
+                pending = []
+                
+                if not tool_calls:
+                    model.add_assistant_message(content)
+                    self.logger.info(content, {"iterations": iteration+1})
+                    yield {"type": "final", "content": content, "iterations": iteration+1}
+                    return
+                
+                model.add_assistant_message(content, tool_calls)
+                for tool_name, tool_call_id, result in executed:
+                    model.add_tool_result(tool_name, result, tool_call_id)
+            
+            self.logger.warning("Reached maximum iterations", {"max": self.max_iterations})
+            final_content = "I spent too much time processing your request. Here's what I've gathered so far: " + (content or "")
+            model.add_assistant_message(final_content)
+            yield {"type": "final", "content": final_content, "iterations": self.max_iterations}
+        
+        except Exception as e:
+            error = handle_error(e, {"user_query": user_query})
+            self.logger.error("Error in stream_query", {"error": str(error)})
+            yield {
+                "type": "final",
+                "content": f"Sorry, there was a technical problem processing your request. Error: {str(error)}",
+                "iterations": None
+            }
+        finally:
+            # Don't leave tool work running if the consumer stopped early
+            for task in pending:
+                task.cancel()
+    
+    async def _handle_tool_request(self,
+                                   model: Any,
+                                   instruction: str,
+                                   tools: List[Dict[str, Any]],
+                                   index: int,
+                                   previous: Optional[asyncio.Task]) -> Tuple[List[Dict[str, Any]], List[Tuple[str, Dict[str, Any], str]], List[str]]:
+        """
+        Resolve a streamed tool request into tool calls and execute them.
+        
+        Args:
+            model: The model that produced the request
+            instruction: Text found inside the <tool_request> tag
+            tools: List of tools available to the model
+            index: Position of the request in the response
+            previous: Task handling the preceding request, waited for before
+                      executing in sequential mode
+            
+        Returns:
+            Tuple of (tool_calls, prepared_calls, results)
+        """
+        tool_calls = await model.resolve_tool_request(instruction, tools, index)
+        return await self._execute_tool_calls(tool_calls, previous)
+    
+    async def _execute_tool_calls(self,
+                                  tool_calls: List[Dict[str, Any]],
+                                  previous: Optional[asyncio.Task]) -> Tuple[List[Dict[str, Any]], List[Tuple[str, Dict[str, Any], str]], List[str]]:
+        """
+        Execute the tool calls of a streamed tool request.
+        
+        Args:
+            tool_calls: Tool calls in OpenAI format
+            previous: Task handling the preceding request, waited for before
+                      executing in sequential mode
+            
+        Returns:
+            Tuple of (tool_calls, prepared_calls, results)
+        """
+        prepared_calls = [call for call in map(self._prepare_tool_call, tool_calls) if call]
+        
+        if self.tool_execution_mode != 'concurrent' and previous is not None:
+            # Keep tool side effects in request order
+            await asyncio.wait([previous])
+        
+        results = await self._execute_prepared_calls(prepared_calls)
+        return tool_calls, prepared_calls, results
+    
+    async def _execute_prepared_calls(self, prepared_calls: List[Tuple[str, Dict[str, Any], str]]) -> List[str]:
+        """
+        Execute prepared tool calls, fanning them out when concurrent mode is enabled.
+        
+        Args:
+            prepared_calls: Tuples of (tool_name, arguments, tool_call_id)
+            
+        Returns:
+            Results in the same order as the calls
+        """
+        if self.tool_execution_mode == 'concurrent' and len(prepared_calls) > 1:
+            self.logger.debug("Executing tool calls concurrently", {"count": len(prepared_calls)})
+            return list(await asyncio.gather(*(self._run_tool_call(*call) for call in prepared_calls)))
+        
+        results = []
+        for call in prepared_calls:
+            results.append(await self._run_tool_call(*call))
+        return results
+    
+    async def _inject_tool_mapping(self, model: Any, user_query: str) -> None:
+        """
+        Add the tool name mapping context to the history when there are mappings.
+        
+        Args:
+            model: The model whose history receives the context
+            user_query: The user's query, repeated after the mapping context
+        """
+        tool_mapping = await self.orchestrator.get_tool_name_mapping()
+        if not tool_mapping:
+            return
+        
+        # Create a mapping description for the model, reused until the tool list changes
+        mapping_description = self.orchestrator.tool_registry.memoize(
+            "tool_mapping_description",
+            lambda: self._create_tool_mapping_description(tool_mapping)
+        )
+        
+        # Add this as a system-level context injection
+        # We'll add it as a user message that provides context, then immediately add the actual query
+        # This ensures the mapping is fresh for each query without modifying the permanent system prompt
+        model.add_user_message(f"[TOOL MAPPING CONTEXT]\n{mapping_description}\n[USER QUERY FOLLOWS]")
+        # Re-add the actual user query
+        model.add_user_message(user_query)
+        
+        self.logger.debug("Injected tool mapping context", {"mapping": tool_mapping})
+    
+    def _prepare_tool_call(self, tool_call: Optional[Dict[str, Any]]) -> Optional[Tuple[str, Dict[str, Any], str]]:
+        """
+        Extract the tool name, arguments and call ID from a tool call.
+        
+        Args:
+            tool_call: Tool call in OpenAI format
+            
+        Returns:
+            Tuple of (tool_name, arguments, tool_call_id), or None if the call is unusable
+        """
+        # Skip None values
+        if tool_call is None:
+            self.logger.warning("Received empty tool call")
+            return None
+            
+        # Extract tool information in OpenAI format
+        function_info = tool_call["function"]
+        tool_name = function_info.get("name")
+        
+        # Arguments might be a JSON string, so parse it if needed
+        function_args = function_info.get("arguments", "{}")
+        if isinstance(function_args, str):
+            try:
+                function_args = json.loads(function_args)
+            except json.JSONDecodeError:
+                function_args = {}
+        
+        tool_call_id = tool_call.get("id", "unknown")
+        
+        if not tool_name:
+            self.logger.warning("Tool call missing 'name' field")
+            return None
+            
+        return tool_name, function_args, tool_call_id
+    
+    async def _run_tool_call(self, tool_name: str, function_args: Dict[str, Any], tool_call_id: str) -> str:
+        """
+        Execute a single tool call and turn failures into an error message.
+        
+        Args:
+            tool_name: Name of the tool to call
+            function_args: Arguments for the tool
+            tool_call_id: ID of the tool call, used for logging
+            
+        Returns:
+            The tool result, or an error message if the call failed
+        """
+        self.logger.info("Calling tool", {"name": tool_name, "args": function_args, "tool_call_id": tool_call_id})
+        
+        try:
+            result = await self.tool_executor.execute_tool(tool_name, function_args)
+            # Add tool execution result log
+            self.logger.info("Tool execution result", {"tool": tool_name, "result": result})
+            return result
+                
+        except Exception as e:
+            error = handle_error(e, {"tool_name": tool_name, "args": function_args})
+            error_message = f"Error calling tool {tool_name}: {str(error)}"
+            self.logger.error(error_message, {"tool": tool_name, "error": str(error)})
+            return error_message
+    
     def _create_tool_mapping_description(self, tool_mapping: Dict[str, List[str]]) -> str:
         """
         Create a human-readable description of tool name mappings.
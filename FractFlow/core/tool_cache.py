@@ -0,0 +1,262 @@
+"""
+Tool result cache.
+
+Memoizes the results of read-only tool calls within an agent session, and
+invalidates them when a tool that may change the same state runs.
+"""
+
+import os
+import re
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Set
+
+# Argument names treated as file system paths for invalidation
+PATH_ARGUMENT_MARKERS = ('path', 'dir', 'file', 'folder')
+
+# Bare file names in other arguments, e.g. output="result.png"
+FILE_NAME_PATTERN = re.compile(r'^[\w.-]+\.[A-Za-z][A-Za-z0-9]{0,7}$')
+
+class ToolCachePolicy:
+    """How the results of one tool may be cached."""
+
+    def __init__(self, cacheable: bool, read_only: bool, ttl: Optional[float] = None):
+        """
+        Initialize the policy.
+
+        Args:
+            cacheable: Whether results of the tool may be reused
+            read_only: Whether the tool leaves all state unchanged, tools that
+                       are not read-only invalidate related cached results
+            ttl: Optional TTL overriding the cache default
+        """
+        self.cacheable = cacheable
+        self.read_only = read_only
+        self.ttl = ttl
+
+class _CacheEntry:
+    """A cached tool result and what it depends on."""
+
+    def __init__(self, result: Any, client_name: str, paths: FrozenSet[str], expires_at: Optional[float]):
+        self.result = result
+        self.client_name = client_name
+        self.paths = paths
+        self.expires_at = expires_at
+
+def _looks_like_path(value: str) -> bool:
+    """Whether a string names an existing file system path, or one that could be created."""
+    if len(value) > 4096 or '\n' in value:
+        return False
+    expanded = os.path.expanduser(value)
+    if os.path.exists(expanded):
+        return True
+    if os.sep not in expanded and not FILE_NAME_PATTERN.match(expanded):
+        return False
+    return os.path.isdir(os.path.dirname(os.path.abspath(expanded)))
+
+def _extract_paths(arguments: Dict[str, Any]) -> FrozenSet[str]:
+    """
+    Collect the normalized file system paths passed to a tool.
+
+    Arguments named like paths always count. Other string arguments count
+    when they name an existing path or one that could be created, since
+    tools also take their targets as e.g. ``output`` or ``dest``.
+
+    Args:
+        arguments: Tool call arguments
+
+    Returns:
+        Set of absolute paths
+    """
+    paths = set()
+    for name, value in arguments.items():
+        if not isinstance(value, str) or not value:
+            continue
+        if any(marker in name.lower() for marker in PATH_ARGUMENT_MARKERS) or _looks_like_path(value):
+            paths.add(os.path.realpath(os.path.expanduser(value)))
+    return frozenset(paths)
+
+def _paths_overlap(a: str, b: str) -> bool:
+    """Whether one path is the same as, or contains, the other."""
+    return a == b or a.startswith(b.rstrip(os.sep) + os.sep) or b.startswith(a.rstrip(os.sep) + os.sep)
+
+class ToolResultCache:
+    """
+    Bounded, TTL-limited cache of tool results.
+
+    A tool is cacheable when its server marks it with the MCP annotations
+    ``readOnlyHint=True`` and ``openWorldHint=False``, or when it is
+    registered with register(). Any other tool is assumed to change state:
+
+    - If it takes path arguments, it drops cached results whose path
+      arguments overlap with them, e.g. a file write drops reads of the same
+      file and listings of its directory. Any string argument naming an
+      existing or creatable path counts, whatever the argument is called.
+    - Otherwise it drops every cached result, since a tool without path
+      arguments, such as a nested agent taking only a query, may change any
+      state, including files read through other servers.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: Optional[float] = 300.0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached results
+            ttl: Seconds a result stays valid, None for the lifetime of the session
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: 'OrderedDict[str, _CacheEntry]' = OrderedDict()
+        self._policies: Dict[str, ToolCachePolicy] = {}
+        # Bumped by every state-changing call, so results computed across one are not cached
+        self.generation = 0
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "invalidations": 0,
+            "evictions": 0
+        }
+
+    def register(self, tool_name: str, cacheable: bool = True, read_only: Optional[bool] = None, ttl: Optional[float] = None) -> None:
+        """
+        Declare the caching policy of a tool, overriding its annotations.
+
+        Args:
+            tool_name: Name of the tool
+            cacheable: Whether results of the tool may be reused
+            read_only: Whether the tool leaves all state unchanged, defaults to cacheable
+            ttl: Optional TTL overriding the cache default
+        """
+        self._policies[tool_name] = ToolCachePolicy(cacheable, cacheable if read_only is None else read_only, ttl)
+
+    def get_policy(self, tool_name: str, tool: Optional[Any] = None) -> ToolCachePolicy:
+        """
+        Get the caching policy of a tool.
+
+        Args:
+            tool_name: Name of the tool
+            tool: MCP tool object carrying the server's annotations, if known
+
+        Returns:
+            The registered policy, or one derived from the annotations
+        """
+        if tool_name in self._policies:
+            return self._policies[tool_name]
+        annotations = getattr(tool, 'annotations', None)
+        read_only = bool(annotations and annotations.readOnlyHint)
+        # MCP tools are open-world unless they say otherwise
+        closed_world = bool(annotations and annotations.openWorldHint is False)
+        return ToolCachePolicy(cacheable=read_only and closed_world, read_only=read_only)
+
+    @staticmethod
+    def make_key(tool_name: str, arguments: Dict[str, Any]) -> str:
+        """
+        Build the cache key of a tool call.
+
+        Args:
+            tool_name: Name of the tool
+            arguments: Tool call arguments
+
+        Returns:
+            Key identifying the call
+        """
+        return f"{tool_name}:{json.dumps(arguments, sort_keys=True, ensure_ascii=False, default=str)}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a cached result.
+
+        Args:
+            key: Key from make_key()
+
+        Returns:
+            The cached result, or None on a miss
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at is not None and time.monotonic() > entry.expires_at:
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry.result
+
+    def put(self, key: str, result: Any, client_name: str, arguments: Dict[str, Any],
+            policy: ToolCachePolicy, generation: Optional[int] = None) -> None:
+        """
+        Cache the result of a cacheable tool call.
+
+        Args:
+            key: Key from make_key()
+            result: Tool result
+            client_name: Name of the MCP client that served the call
+            arguments: Tool call arguments
+            policy: Policy of the tool
+            generation: Value of ``generation`` when the call started; the result
+                        is not cached if a state-changing call ran meanwhile
+        """
+        if generation is not None and generation != self.generation:
+            return
+        ttl = policy.ttl if policy.ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        self._entries[key] = _CacheEntry(result, client_name, _extract_paths(arguments), expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def invalidate_for_call(self, client_name: str, arguments: Dict[str, Any]) -> int:
+        """
+        Drop cached results that a state-changing tool call may have made stale.
+
+        Args:
+            client_name: Name of the MCP client serving the call
+            arguments: Tool call arguments
+
+        Returns:
+            Number of results dropped
+        """
+        self.generation += 1
+        paths = _extract_paths(arguments)
+        if paths:
+            stale = [key for key, entry in self._entries.items()
+                     if any(_paths_overlap(a, b) for a in entry.paths for b in paths)]
+        else:
+            stale = list(self._entries)
+        return self._drop(stale)
+
+    def invalidate(self, tool_names: Optional[Iterable[str]] = None, paths: Optional[Iterable[str]] = None) -> int:
+        """
+        Drop cached results explicitly.
+
+        Args:
+            tool_names: Drop results of these tools
+            paths: Drop results that depend on these paths
+
+        Returns:
+            Number of results dropped, everything is dropped when no filter is given
+        """
+        if tool_names is None and paths is None:
+            return self._drop(list(self._entries.keys()))
+
+        names: Set[str] = set(tool_names or [])
+        normalized = {os.path.realpath(os.path.expanduser(p)) for p in (paths or [])}
+        stale = [key for key, entry in self._entries.items()
+                 if key.split(':', 1)[0] in names
+                 or any(_paths_overlap(a, b) for a in entry.paths for b in normalized)]
+        return self._drop(stale)
+
+    def _drop(self, keys: Iterable[str]) -> int:
+        count = 0
+        for key in keys:
+            if self._entries.pop(key, None) is not None:
+                count += 1
+        self.stats["invalidations"] += count
+        return count
+
+    def __len__(self) -> int:
+        return len(self._entries)
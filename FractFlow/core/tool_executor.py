@@ -12,10 +12,13 @@ Tool executor.
 Handles the execution of tools based on model requests.
 """
 
+import asyncio
 from typing import Dict, Any, Optional
 from ..infra.config import ConfigManager
 from ..infra.error_handling import ToolExecutionError, handle_error
 from ..infra.logging_utils import get_logger
+from ..infra import tracing
+from .tool_cache import ToolResultCache
 
 class ToolExecutor:
     """
@@ -25,50 +28,143 @@ class ToolExecutor:
     handling errors and formatting results.
     """
     
-    def __init__(self, config: Optional[ConfigManager] = None):
+    def __init__(self, config: Optional[ConfigManager] = None, client_pool: Optional[Any] = None):
         """
         Initialize the tool executor.
         
         Args:
             config: Configuration manager instance to use
+            client_pool: MCP client pool serving the tools, can also be bound later
         """
         self.config = config or ConfigManager()
+        self.client_pool = client_pool
         
         # Push component name to call path
         self.config.push_to_call_path("tool_executor")
         
         # Initialize logger
         self.logger = get_logger(self.config.get_call_path())
-        self.logger.debug("Tool executor initialized")
         
-    async def execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> str:
+        # Execution limits
+        self.timeout = self.config.get('tool_execution.timeout')
+        self.max_concurrency = self.config.get('tool_execution.max_concurrency', 4)
+        
+        # One semaphore per MCP client, created lazily on first use
+        self._client_semaphores: Dict[str, asyncio.Semaphore] = {}
+        
+        # Results of read-only tools, reused within the session
+        self.result_cache: Optional[ToolResultCache] = None
+        if self.config.get('tool_execution.cache_enabled', True):
+            self.result_cache = ToolResultCache(
+                max_entries=self.config.get('tool_execution.cache_max_entries', 256),
+                ttl=self.config.get('tool_execution.cache_ttl', 300.0)
+            )
+            for tool_name in self.config.get('tool_execution.cacheable_tools') or []:
+                self.result_cache.register(tool_name)
+        
+        self.logger.debug("Tool executor initialized", {"timeout": self.timeout, "max_concurrency": self.max_concurrency})
+    
+    def set_client_pool(self, client_pool: Any) -> None:
+        """
+        Bind the MCP client pool that serves the tools.
+        
+        Args:
+            client_pool: The agent's MCPClientPool
+        """
+        self.client_pool = client_pool
+        
+    def _get_client_semaphore(self, client_name: str) -> asyncio.Semaphore:
+        """
+        Get the semaphore limiting concurrent calls to a single MCP client.
+        
+        Args:
+            client_name: Name of the MCP client serving the tool
+            
+        Returns:
+            The semaphore for this client
+        """
+        if client_name not in self._client_semaphores:
+            self._client_semaphores[client_name] = asyncio.Semaphore(max(1, self.max_concurrency))
+        return self._client_semaphores[client_name]
+        
+    async def execute_tool(self, tool_name: str, arguments: Dict[str, Any], timeout: Optional[float] = None) -> str:
         """
         Execute a tool with the given arguments.
         
+        Calls routed to the same MCP client are limited to
+        ``tool_execution.max_concurrency`` in flight at once, so this method
+        can safely be fanned out with ``asyncio.gather``.
+        
         Args:
             tool_name: Name of the tool to execute
             arguments: Dictionary of arguments to pass to the tool
+            timeout: Optional timeout in seconds, overrides ``tool_execution.timeout``
             
         Returns:
             The result of the tool execution as a string
             
         Raises:
-            ToolExecutionError: If the tool execution fails
+            ToolExecutionError: If the tool execution fails or times out
         """
+        with tracing.span("tool_call", "tool", tool=tool_name):
+            return await self._execute_tool(tool_name, arguments, timeout)
+    
+    async def _execute_tool(self, tool_name: str, arguments: Dict[str, Any], timeout: Optional[float]) -> str:
+        """Run a tool call for execute_tool()."""
+        if timeout is None:
+            timeout = self.timeout
+            
         try:
             self.logger.debug(f"Executing tool", {"tool": tool_name, "args": arguments})
             
-            # Get the client pool from the MCP module
-            # This is imported here to avoid circular imports
-            from ..mcpcore import get_client_pool
+            # Call the tool using the bound MCP client pool, falling back to the
+            # process-wide default pool when none was bound
+            client_pool = self.client_pool
+            if client_pool is None:
+                # This is imported here to avoid circular imports
+                from ..mcpcore import get_client_pool
+                client_pool = get_client_pool()
+            client_name = client_pool.tool_to_client.get(tool_name, tool_name)
+            tracing.annotate(client=client_name)
+            
+            # Serve repeated read-only calls from the cache, and let other calls invalidate it
+            cache_key = policy = generation = None
+            if self.result_cache is not None:
+                registry = getattr(client_pool, 'tool_registry', None)
+                policy = self.result_cache.get_policy(tool_name, registry.get_tool(tool_name) if registry else None)
+                if policy.cacheable:
+                    cache_key = self.result_cache.make_key(tool_name, arguments)
+                    cached = self.result_cache.get(cache_key)
+                    if cached is not None:
+                        tracing.annotate(cache_hit=True)
+                        self.logger.debug(f"Tool result served from cache", {"tool": tool_name, "stats": self.result_cache.stats})
+                        return cached
+                    generation = self.result_cache.generation
+                elif not policy.read_only:
+                    dropped = self.result_cache.invalidate_for_call(client_name, arguments)
+                    if dropped:
+                        self.logger.debug(f"Invalidated cached tool results", {"tool": tool_name, "count": dropped})
+            
+            try:
+                async with self._get_client_semaphore(client_name):
+                    if timeout:
+                        result = await asyncio.wait_for(client_pool.call(tool_name, arguments), timeout)
+                    else:
+                        result = await client_pool.call(tool_name, arguments)
+            finally:
+                if policy is not None and not policy.read_only:
+                    # Also drop reads that ran while the call was changing state
+                    self.result_cache.invalidate_for_call(client_name, arguments)
             
-            # Call the tool using the MCP client pool
-            client_pool = get_client_pool()
-            result = await client_pool.call(tool_name, arguments)
+            if cache_key is not None:
+                self.result_cache.put(cache_key, result, client_name, arguments, policy, generation)
             
             self.logger.debug(f"Tool execution successful", {"tool": tool_name, "result_length": len(result) if result else 0})
             return result
             
+        except asyncio.TimeoutError as e:
+            self.logger.error(f"Tool execution timed out", {"tool": tool_name, "timeout": timeout})
+            raise ToolExecutionError(f"Tool {tool_name} timed out after {timeout} seconds", e)
         except Exception as e:
             error = handle_error(e, {"tool_name": tool_name, "arguments": arguments})
             self.logger.error(f"Error executing tool {tool_name}: {error}")
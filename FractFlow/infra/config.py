@@ -8,7 +8,7 @@ from various sources, including environment variables and config files.
 import os
 import json
 import copy
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 class ConfigManager:
     """
@@ -63,6 +63,71 @@ class ConfigManager:
         tool_calling_model: str = 'deepseek-chat',
         tool_calling_version: str = 'turbo',
         tool_calling_temperature: float = 0,
+        tool_calling_mode: str = 'auto',
+        tool_calling_dispatch: str = 'sequential',
+        tool_calling_max_concurrency: int = 4,
+        
+        # 工具执行配置
+        tool_execution_mode: str = 'sequential',
+        tool_execution_max_concurrency: int = 4,
+        tool_execution_timeout: Optional[float] = None,
+        tool_execution_cache_enabled: bool = True,
+        tool_execution_cache_ttl: Optional[float] = 300.0,
+        tool_execution_cache_max_entries: int = 256,
+        tool_execution_cacheable_tools: Optional[List[str]] = None,
+        
+        # MCP服务器启动配置
+        mcp_launch_mode: str = 'sequential',
+        mcp_max_concurrent_launches: int = 4,
+        mcp_startup_timeout: Optional[float] = None,
+        mcp_share_servers: bool = False,
+        mcp_launch_method: str = 'spawn',
+        mcp_zygote_preload: Optional[List[str]] = None,
+        mcp_supervise: bool = False,
+        mcp_call_timeout: Optional[float] = None,
+        mcp_tool_timeouts: Optional[Dict[str, float]] = None,
+        mcp_ping_interval: Optional[float] = 30.0,
+        mcp_ping_timeout: float = 10.0,
+        mcp_failure_threshold: int = 5,
+        mcp_circuit_reset_timeout: float = 30.0,
+        mcp_restart_backoff_base: float = 1.0,
+        mcp_restart_backoff_max: float = 60.0,
+        mcp_max_restarts: Optional[int] = None,
+        
+        # 对话历史压缩配置
+        history_max_tokens: Optional[int] = None,
+        history_keep_recent_messages: int = 6,
+        history_truncated_result_chars: int = 2000,
+        history_compaction_strategy: str = 'truncate',
+        history_tokenizer_encoding: str = 'cl100k_base',
+        
+        # LLM响应缓存配置
+        llm_cache_mode: str = 'off',
+        llm_cache_path: Optional[str] = None,
+        llm_cache_ttl: Optional[float] = 86400.0,
+        llm_cache_max_memory_entries: int = 256,
+        llm_cache_max_disk_entries: int = 10000,
+        
+        # LLM限流配置
+        llm_rate_limits: Optional[Dict[str, Dict[str, float]]] = None,
+        llm_rate_limit_state_dir: Optional[str] = None,
+        llm_rate_limit_reserve: float = 0.2,
+        llm_rate_limit_max_retries: int = 5,
+        
+        # 多提供商路由配置
+        routing_providers: Optional[List[str]] = None,
+        routing_hedge_percentile: float = 0.95,
+        routing_initial_hedge_delay: float = 30.0,
+        routing_min_hedge_delay: float = 0.5,
+        routing_max_hedges: int = 1,
+        routing_ewma_alpha: float = 0.2,
+        routing_probe_interval: Optional[float] = 60.0,
+        
+        # 用量统计配置
+        usage_prices: Optional[Dict[str, Dict[str, float]]] = None,
+        
+        # 追踪配置
+        tracing_file: Optional[str] = None,
     ):
         """
         Initialize the config manager with configuration parameters.
@@ -98,6 +163,55 @@ class ConfigManager:
             tool_calling_model: 工具调用使用的模型
             tool_calling_version: 工具调用版本，'stable'更稳定，'turbo'更快
             tool_calling_temperature: 工具调用温度参数
+            tool_calling_mode: 工具调用方式，'native'使用模型原生的function calling，'two_stage'使用<tool_request>标签加工具调用助手，'auto'对支持原生调用的提供商（DeepSeek、OpenRouter、Qwen）使用native，被拒绝时自动回退到two_stage
+            tool_calling_dispatch: 同一回复中多个<tool_request>的转换方式，'sequential'逐个转换，'concurrent'并发转换，'batched'用一次工具调用助手请求批量转换（仅stable版本，turbo版本按concurrent处理）
+            tool_calling_max_concurrency: concurrent模式下同时转换的<tool_request>数量上限
+            tool_execution_mode: 工具执行模式，'sequential'逐个执行，'concurrent'并发执行同一轮中的多个工具调用
+            tool_execution_max_concurrency: 每个MCP客户端允许同时执行的最大工具调用数
+            tool_execution_timeout: 单次工具调用的超时时间（秒），None表示不限制
+            tool_execution_cache_enabled: 是否缓存只读工具（MCP注解readOnlyHint=True且openWorldHint=False）的调用结果
+            tool_execution_cache_ttl: 工具结果缓存的有效期（秒），None表示在会话内一直有效
+            tool_execution_cache_max_entries: 最多缓存的工具结果数
+            tool_execution_cacheable_tools: 额外声明为可缓存的工具名列表，用于无法添加注解的工具
+            mcp_launch_mode: MCP服务器启动模式，'sequential'逐个启动，'concurrent'并发启动且允许部分失败
+            mcp_max_concurrent_launches: 并发启动模式下同时启动的最大服务器数
+            mcp_startup_timeout: 单个MCP服务器的启动超时时间（秒），None表示不限制
+            mcp_share_servers: 是否在同一进程的多个Agent之间共享相同脚本的MCP服务器进程
+            mcp_launch_method: MCP服务器脚本的启动方式，'spawn'每次启动新解释器，'zygote'从预加载常用模块的常驻进程fork（仅限Unix）
+            mcp_zygote_preload: zygote进程预加载的模块列表，None表示使用默认列表
+            mcp_supervise: 是否监管MCP服务器：调用截止时间、定期ping健康检查、崩溃或卡死时自动重启、连续失败时熔断
+            mcp_call_timeout: 监管模式下单次MCP工具调用的默认截止时间（秒），None表示不限制
+            mcp_tool_timeouts: 监管模式下按工具名设置的调用截止时间（秒），覆盖mcp_call_timeout
+            mcp_ping_interval: 监管模式下健康检查ping的间隔（秒），None表示只在调用失败后检查
+            mcp_ping_timeout: ping的超时时间（秒），空闲服务器超时未响应视为卡死并重启
+            mcp_failure_threshold: 连续失败多少次后熔断，熔断期间调用立即失败
+            mcp_circuit_reset_timeout: 熔断后经过多少秒允许一次试探调用
+            mcp_restart_backoff_base: 连续重启时第二次重启前的等待时间（秒），之后每次翻倍
+            mcp_restart_backoff_max: 重启等待时间的上限（秒）
+            mcp_max_restarts: 两次成功调用之间最多连续重启的次数，超过后放弃该服务器，None表示不限制
+            history_max_tokens: 对话历史的token预算，超出时压缩较早的工具结果，None表示不压缩
+            history_keep_recent_messages: 压缩时始终保持完整的最近消息数
+            history_truncated_result_chars: 截断工具结果时保留的开头字符数
+            history_compaction_strategy: 压缩策略，'truncate'截断，'summarize'用模型总结（失败时回退为截断）
+            history_tokenizer_encoding: 计算token数使用的tiktoken编码，不可用时回退为估算
+            llm_cache_mode: LLM响应缓存模式，'off'关闭，'tool_calling'只缓存工具调用请求，'all'同时缓存主模型请求
+            llm_cache_path: 缓存的SQLite文件路径，None表示只缓存在内存中
+            llm_cache_ttl: 缓存条目的有效期（秒），None表示不过期
+            llm_cache_max_memory_entries: 内存中最多缓存的条目数
+            llm_cache_max_disk_entries: 磁盘上最多缓存的条目数，超出时淘汰最久未使用的条目
+            llm_rate_limits: 按base_url、主机名或'*'设置的限流，如{'api.deepseek.com': {'requests_per_minute': 60, 'tokens_per_minute': 100000}}，None表示不限流
+            llm_rate_limit_state_dir: 跨进程共享令牌桶状态的目录（基于文件锁），子Agent服务器自动继承，None表示只在本进程内限流
+            llm_rate_limit_reserve: 跨进程共享令牌桶时为顶层请求保留的比例，后台辅助请求需保留该比例，子Agent保留一半
+            llm_rate_limit_max_retries: 收到HTTP 429后重新排队的最大次数
+            routing_providers: 按优先顺序排列的提供商列表，如['deepseek', 'qwen']，多于一个时请求在它们之间对冲和故障转移，第一个保存对话历史
+            routing_hedge_percentile: 等待当前提供商的时间达到其该分位延迟后，向下一个提供商发送对冲请求
+            routing_initial_hedge_delay: 提供商延迟样本不足时的对冲等待时间（秒）
+            routing_min_hedge_delay: 对冲等待时间的下限（秒）
+            routing_max_hedges: 每个请求最多额外发送的对冲请求数，0表示只做故障转移
+            routing_ewma_alpha: 延迟和错误率指数移动平均中最新样本的权重
+            routing_probe_interval: 被降级的提供商超过该时间（秒）没有请求时，下一个请求先发给它以探测是否恢复，None表示不探测
+            usage_prices: 按模型名设置的每百万token价格，如{'deepseek-chat': {'prompt': 0.27, 'completion': 1.1, 'cached_prompt': 0.07}}，用于计算process_query(return_usage=True)返回的费用
+            tracing_file: 追踪记录的JSONL文件路径，子Agent进程写入同一文件，None表示不追踪（也可通过环境变量FRACTFLOW_TRACE_FILE开启）
         """
         # 自动从环境变量读取API密钥
         if deepseek_api_key is None:
@@ -152,6 +266,71 @@ class ConfigManager:
                 'model': tool_calling_model,
                 'version': tool_calling_version,
                 'temperature': tool_calling_temperature,
+                'mode': tool_calling_mode,
+                'dispatch': tool_calling_dispatch,
+                'max_concurrency': tool_calling_max_concurrency,
+            },
+            'tool_execution': {
+                'mode': tool_execution_mode,
+                'max_concurrency': tool_execution_max_concurrency,
+                'timeout': tool_execution_timeout,
+                'cache_enabled': tool_execution_cache_enabled,
+                'cache_ttl': tool_execution_cache_ttl,
+                'cache_max_entries': tool_execution_cache_max_entries,
+                'cacheable_tools': tool_execution_cacheable_tools,
+            },
+            'mcp': {
+                'launch_mode': mcp_launch_mode,
+                'max_concurrent_launches': mcp_max_concurrent_launches,
+                'startup_timeout': mcp_startup_timeout,
+                'share_servers': mcp_share_servers,
+                'launch_method': mcp_launch_method,
+                'zygote_preload': mcp_zygote_preload,
+                'supervise': mcp_supervise,
+                'call_timeout': mcp_call_timeout,
+                'tool_timeouts': mcp_tool_timeouts,
+                'ping_interval': mcp_ping_interval,
+                'ping_timeout': mcp_ping_timeout,
+                'failure_threshold': mcp_failure_threshold,
+                'circuit_reset_timeout': mcp_circuit_reset_timeout,
+                'restart_backoff_base': mcp_restart_backoff_base,
+                'restart_backoff_max': mcp_restart_backoff_max,
+                'max_restarts': mcp_max_restarts,
+            },
+            'history': {
+                'max_tokens': history_max_tokens,
+                'keep_recent_messages': history_keep_recent_messages,
+                'truncated_result_chars': history_truncated_result_chars,
+                'compaction_strategy': history_compaction_strategy,
+                'tokenizer_encoding': history_tokenizer_encoding,
+            },
+            'llm_cache': {
+                'mode': llm_cache_mode,
+                'path': llm_cache_path,
+                'ttl': llm_cache_ttl,
+                'max_memory_entries': llm_cache_max_memory_entries,
+                'max_disk_entries': llm_cache_max_disk_entries,
+            },
+            'llm_rate_limit': {
+                'limits': llm_rate_limits,
+                'state_dir': llm_rate_limit_state_dir,
+                'reserve': llm_rate_limit_reserve,
+                'max_retries': llm_rate_limit_max_retries,
+            },
+            'routing': {
+                'providers': routing_providers,
+                'hedge_percentile': routing_hedge_percentile,
+                'initial_hedge_delay': routing_initial_hedge_delay,
+                'min_hedge_delay': routing_min_hedge_delay,
+                'max_hedges': routing_max_hedges,
+                'ewma_alpha': routing_ewma_alpha,
+                'probe_interval': routing_probe_interval,
+            },
+            'usage': {
+                'prices': usage_prices,
+            },
+            'tracing': {
+                'file': tracing_file,
             }
         }
     
@@ -0,0 +1,163 @@
+"""
+Lazy imports for tool servers.
+
+A tool server has to answer ``initialize`` and ``list_tools`` before the
+agent that started it can go on, but its heavy libraries (moviepy, cv2,
+trimesh, ...) are only needed once a tool is called. Modules imported with
+lazy_import() are loaded on first attribute access instead, so tool schemas
+are advertised right away.
+
+Convention for tool server scripts:
+
+    from FractFlow.infra.lazy_import import lazy_import
+
+    cv2 = lazy_import('cv2')          # instead of `import cv2`
+    editor = lazy_import('moviepy.editor')
+
+    @mcp.tool()
+    def blur(path: str) -> str:
+        image = cv2.imread(path)      # cv2 is imported here, on the first call
+        ...
+
+Lazy modules must not be used at module level, including in annotations
+that are evaluated at definition time; add ``from __future__ import
+annotations`` to scripts that annotate with lazy modules. A missing module
+raises ImportError on first use, inside the tool call.
+
+This module only depends on the standard library, so importing it does not
+slow down the server it is meant to speed up.
+"""
+
+import sys
+import time
+import types
+import logging
+import threading
+import importlib
+import importlib.util
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_registry: Dict[str, 'LazyModule'] = {}
+_registry_lock = threading.Lock()
+
+class LazyModule(types.ModuleType):
+    """
+    Stand-in for a module that is imported on first attribute access.
+
+    Attributes that the module does not define are looked up as submodules,
+    like ``from package import submodule`` does.
+    """
+
+    def __init__(self, name: str):
+        """
+        Initialize the proxy.
+
+        Args:
+            name: Full name of the module to import
+        """
+        super().__init__(name)
+        self.__dict__['_lazy_module'] = None
+        self.__dict__['_lazy_load_time'] = None
+        self.__dict__['_lazy_lock'] = threading.Lock()
+
+    def _lazy_load(self) -> types.ModuleType:
+        """Import the real module once and return it."""
+        module = self.__dict__['_lazy_module']
+        if module is not None:
+            return module
+        with self.__dict__['_lazy_lock']:
+            module = self.__dict__['_lazy_module']
+            if module is None:
+                start_time = time.perf_counter()
+                module = importlib.import_module(self.__name__)
+                load_time = time.perf_counter() - start_time
+                self.__dict__['_lazy_load_time'] = load_time
+                self.__dict__['_lazy_module'] = module
+                logger.debug(f"Lazily imported {self.__name__} in {load_time:.3f}s")
+        return module
+
+    def __getattr__(self, attribute: str):
+        module = self._lazy_load()
+        try:
+            return getattr(module, attribute)
+        except AttributeError:
+            if attribute.startswith('__'):
+                raise
+            try:
+                return importlib.import_module(f"{self.__name__}.{attribute}")
+            except ModuleNotFoundError:
+                raise AttributeError(f"module '{self.__name__}' has no attribute '{attribute}'") from None
+
+    def __setattr__(self, attribute: str, value) -> None:
+        setattr(self._lazy_load(), attribute, value)
+
+    def __dir__(self) -> List[str]:
+        return dir(self._lazy_load())
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self.__dict__['_lazy_module'] is not None else 'not loaded'
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+def lazy_import(name: str) -> types.ModuleType:
+    """
+    Get a module that is imported on first use.
+
+    Modules that are already imported are returned as they are.
+
+    Args:
+        name: Full module name, e.g. 'moviepy.editor'
+
+    Returns:
+        The module, or a proxy that imports it on first attribute access
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    with _registry_lock:
+        proxy = _registry.get(name)
+        if proxy is None:
+            proxy = _registry[name] = LazyModule(name)
+        return proxy
+
+def is_available(name: str) -> bool:
+    """
+    Check whether a module can be imported, without importing it.
+
+    Useful for optional dependencies, in place of a try/except ImportError
+    around a top-level import.
+
+    Args:
+        name: Full module name
+
+    Returns:
+        True if the module is installed
+    """
+    if name in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        # Raised when a parent package is missing
+        return False
+
+def pending_imports() -> List[str]:
+    """
+    Get the lazily imported modules that have not been loaded yet.
+
+    Returns:
+        Module names
+    """
+    with _registry_lock:
+        return [name for name, proxy in _registry.items() if proxy.__dict__['_lazy_module'] is None]
+
+def import_times() -> Dict[str, Optional[float]]:
+    """
+    Get how long each lazily imported module took to load.
+
+    Returns:
+        Seconds by module name, None for modules not loaded yet
+    """
+    with _registry_lock:
+        return {name: proxy.__dict__['_lazy_load_time'] for name, proxy in _registry.items()}
@@ -8,13 +8,20 @@ consistent logging across the entire system.
 import inspect
 import sys
 import yaml
-from typing import Any, Dict, Optional, Union, List
+from typing import Any, Callable, Dict, Optional, Union, List
 
 from loguru import logger
 
 # Remove default handler
 logger.remove()
 
+# The C dumper is much faster and produces the same output, when libyaml is available
+_YamlDumper = getattr(yaml, 'CDumper', yaml.Dumper)
+
+# A message or its data may be passed as a function, only called if the record is emitted
+LazyMessage = Union[str, Callable[[], str]]
+LazyData = Union[Dict[str, Any], Callable[[], Optional[Dict[str, Any]]], None]
+
 # Custom formatter for YAML output of extras
 def format_extra_as_yaml(record):
     """Format the extra data as YAML for better readability."""
@@ -34,7 +41,7 @@ def format_extra_as_yaml(record):
     # If there are any extra fields, format them as YAML
     if extras:
         # Convert to YAML, remove the document start marker
-        yaml_str = yaml.dump(extras, default_flow_style=False, sort_keys=False, allow_unicode=True).strip()
+        yaml_str = yaml.dump(extras, Dumper=_YamlDumper, default_flow_style=False, sort_keys=False, allow_unicode=True).strip()
         if yaml_str.startswith('---'):
             yaml_str = yaml_str[3:].strip()
         # Indent each line for better visual separation
@@ -46,7 +53,8 @@ def format_extra_as_yaml(record):
     
     return record
 
-def setup_logging(level: int = 20, use_colors: bool = True, namespace_levels: Optional[Dict[str, int]] = None):
+def setup_logging(level: int = 20, use_colors: bool = True, namespace_levels: Optional[Dict[str, int]] = None,
+                  json_log_file: Optional[str] = None):
     """
     Configure logging with standard formatting.
     
@@ -54,6 +62,9 @@ def setup_logging(level: int = 20, use_colors: bool = True, namespace_levels: Op
         level: The logging level to use for root logger
         use_colors: Whether to enable colored output
         namespace_levels: Dictionary mapping logger namespaces to their log levels
+        json_log_file: Optional file receiving every record as one JSON object per
+                       line, written from a background queue so logging calls don't
+                       wait for the disk
     """
     # Remove any existing handlers
     logger.remove()
@@ -70,6 +81,15 @@ def setup_logging(level: int = 20, use_colors: bool = True, namespace_levels: Op
         filter=format_extra_as_yaml
     )
     
+    # Add the structured sink; records are serialized with their extra data
+    if json_log_file:
+        logger.add(
+            json_log_file,
+            level=level,
+            serialize=True,
+            enqueue=True
+        )
+    
     # Set namespace-specific log levels
     if namespace_levels:
         for namespace, ns_level in namespace_levels.items():
@@ -118,9 +138,32 @@ class LoggerWrapper:
             if k not in {"logger_name", "message"} and not k.startswith("_")
         }
 
-    def _log(self, level: str, message: str, data: Optional[Dict[str, Any]] = None):
+    def is_enabled_for(self, level: str) -> bool:
+        """
+        Check whether any handler would emit records of a level.
+        
+        Use it to skip building expensive log data in hot paths.
+        
+        Args:
+            level: Level name, e.g. "DEBUG"
+            
+        Returns:
+            True if records of this level are emitted
+        """
+        levels = logger._core.levels
+        return level in levels and levels[level].no >= logger._core.min_level
+
+    def _log(self, level: str, message: LazyMessage, data: LazyData = None):
+        # Skip all frame and formatting work for records no handler would emit
+        if not self.is_enabled_for(level):
+            return
+        if callable(message):
+            message = message()
+        if callable(data):
+            data = data()
+        
         # Get caller's frame (2 levels up in the stack to skip this method and the calling log method)
-        frame = inspect.currentframe().f_back.f_back
+        frame = sys._getframe(2)
         file_path = frame.f_code.co_filename
         line_no = frame.f_lineno
         
@@ -142,27 +185,27 @@ class LoggerWrapper:
         # Log with context bound
         logger.bind(**context).log(level, message)
 
-    def debug(self, message: str, data: Optional[Dict[str, Any]] = None):
+    def debug(self, message: LazyMessage, data: LazyData = None):
         self._log("DEBUG", message, data)
 
-    def info(self, message: str, data: Optional[Dict[str, Any]] = None):
+    def info(self, message: LazyMessage, data: LazyData = None):
         self._log("INFO", message, data)
 
-    def warning(self, message: str, data: Optional[Dict[str, Any]] = None):
+    def warning(self, message: LazyMessage, data: LazyData = None):
         self._log("WARNING", message, data)
 
-    def error(self, message: str, data: Optional[Dict[str, Any]] = None):
+    def error(self, message: LazyMessage, data: LazyData = None):
         self._log("ERROR", message, data)
 
-    def critical(self, message: str, data: Optional[Dict[str, Any]] = None):
+    def critical(self, message: LazyMessage, data: LazyData = None):
         self._log("CRITICAL", message, data)
 
-    def highlight(self, message: str, data: Optional[Dict[str, Any]] = None):
+    def highlight(self, message: LazyMessage, data: LazyData = None):
         if "HIGHLIGHT" not in logger._core.levels:
             logger.level("HIGHLIGHT", no=25, color="<bold><white>")
         self._log("HIGHLIGHT", message, data)
         
-    def result(self, message: str, data: Optional[Dict[str, Any]] = None):
+    def result(self, message: LazyMessage, data: LazyData = None):
         """
         Log final results in a highlighted format.
         This is an alias for the highlight method.
@@ -171,4 +214,6 @@ class LoggerWrapper:
             message: Result message
             data: Optional structured data
         """
-        self.highlight(message, data) 
\ No newline at end of file
+        if "HIGHLIGHT" not in logger._core.levels:
+            logger.level("HIGHLIGHT", no=25, color="<bold><white>")
+        self._log("HIGHLIGHT", message, data) 
\ No newline at end of file
@@ -0,0 +1,323 @@
+"""
+Span tracing for the fractal agent call tree.
+
+Records spans for agent turns, model calls, tool calls and server launches
+as Chrome trace events, one JSON object per line. The trace context travels
+with MCP tool calls into child agent servers, which inherit the trace file
+through their environment and append to it, so the whole call tree can be
+loaded as a single flame graph in chrome://tracing or Perfetto after
+export_chrome_trace().
+
+Tracing is off unless configure() is called, ConfigManager(tracing_file=...)
+is set, or the FRACTFLOW_TRACE_FILE environment variable names a file.
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import itertools
+import threading
+import contextvars
+import weakref
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+# Environment variable naming the trace file, inherited by child servers
+TRACE_FILE_ENV = 'FRACTFLOW_TRACE_FILE'
+
+# Key of the trace context in the _meta field of MCP requests
+META_KEY = 'fractflow_trace'
+
+class Span:
+    """A unit of traced work."""
+
+    __slots__ = ('name', 'category', 'trace_id', 'span_id', 'parent_id', 'args', 'remote')
+
+    def __init__(self, name: str, category: str, trace_id: str, span_id: str,
+                 parent_id: Optional[str] = None, args: Optional[Dict[str, Any]] = None,
+                 remote: bool = False):
+        self.name = name
+        self.category = category
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.args = args or {}
+        # Remote spans stand for a parent in another process and are never recorded
+        self.remote = remote
+
+    def set(self, **args: Any) -> None:
+        """
+        Attach attributes to the span, shown as event args in the trace.
+
+        Args:
+            **args: Attribute values, converted to strings if not JSON serializable
+        """
+        self.args.update(args)
+
+class _TraceWriter:
+    """Appends trace events to a file shared with other processes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        # O_APPEND keeps lines written by several processes from interleaving
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._tids: 'weakref.WeakKeyDictionary[Any, int]' = weakref.WeakKeyDictionary()
+        self._tid_counter = itertools.count(1)
+        self.write({
+            "name": "process_name", "ph": "M", "pid": self._pid, "tid": 0,
+            "args": {"name": f"{os.path.basename(sys.argv[0]) or 'python'} ({self._pid})"}
+        })
+
+    def current_tid(self) -> int:
+        """
+        Get the trace thread id of the running asyncio task.
+
+        Every task gets its own row in the trace, so concurrent tool calls
+        do not overlap each other.
+        """
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        if task is None:
+            return threading.get_ident() % 100000
+        tid = self._tids.get(task)
+        if tid is None:
+            tid = self._tids[task] = next(self._tid_counter)
+            self.write({
+                "name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid,
+                "args": {"name": task.get_name()}
+            })
+        return tid
+
+    def write(self, event: Dict[str, Any]) -> None:
+        line = json.dumps(event, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            os.write(self._fd, line.encode('utf-8'))
+
+    def close(self) -> None:
+        with self._lock:
+            os.close(self._fd)
+
+_writer: Optional[_TraceWriter] = None
+_writer_lock = threading.Lock()
+_env_checked = False
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar('fractflow_span', default=None)
+
+def configure(path: Optional[str]) -> None:
+    """
+    Start writing spans to a trace file, or stop tracing.
+
+    Child MCP servers started afterwards write to the same file.
+
+    Args:
+        path: JSONL trace file, appended to if it exists; None disables tracing
+    """
+    global _writer, _env_checked
+    with _writer_lock:
+        _env_checked = True
+        if _writer is not None:
+            if path and os.path.abspath(path) == _writer.path:
+                return
+            _writer.close()
+            _writer = None
+        if path:
+            path = os.path.abspath(os.path.expanduser(path))
+            directory = os.path.dirname(path)
+            os.makedirs(directory, exist_ok=True)
+            _writer = _TraceWriter(path)
+            os.environ[TRACE_FILE_ENV] = path
+        else:
+            os.environ.pop(TRACE_FILE_ENV, None)
+
+def _get_writer() -> Optional[_TraceWriter]:
+    """Get the trace writer, enabling tracing from the environment on first use."""
+    if not _env_checked and os.environ.get(TRACE_FILE_ENV):
+        configure(os.environ[TRACE_FILE_ENV])
+    return _writer
+
+def is_enabled() -> bool:
+    """Whether spans are being recorded."""
+    return _get_writer() is not None
+
+def child_environment() -> Dict[str, str]:
+    """
+    Environment variables that let a child process join the trace.
+
+    Returns:
+        Variables to add to the child's environment, empty when tracing is off
+    """
+    writer = _get_writer()
+    return {TRACE_FILE_ENV: writer.path} if writer is not None else {}
+
+def current_span() -> Optional[Span]:
+    """Get the innermost active span of the running task."""
+    return _current_span.get()
+
+def annotate(**args: Any) -> None:
+    """
+    Attach attributes to the innermost active span, if any.
+
+    Args:
+        **args: Attribute values
+    """
+    current = _current_span.get()
+    if current is not None and not current.remote:
+        current.set(**args)
+
+def _new_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+@contextmanager
+def span(name: str, category: str = 'fractflow', **args: Any) -> Iterator[Optional[Span]]:
+    """
+    Record the enclosed block as a span.
+
+    Works in both synchronous and asynchronous code. Spans started inside the
+    block, including in tasks created from it, become its children.
+
+    Args:
+        name: Span name, e.g. the operation
+        category: Kind of work, e.g. 'agent', 'llm', 'tool', 'mcp'
+        **args: Attributes shown with the span
+
+    Yields:
+        The span, or None when tracing is disabled
+    """
+    writer = _get_writer()
+    if writer is None:
+        yield None
+        return
+
+    parent = _current_span.get()
+    current = Span(
+        name, category,
+        trace_id=parent.trace_id if parent else uuid.uuid4().hex,
+        span_id=_new_id(),
+        parent_id=parent.span_id if parent else None,
+        args=args
+    )
+    token = _current_span.set(current)
+    tid = writer.current_tid()
+    start_us = time.time_ns() // 1000
+    start = time.perf_counter()
+
+    if parent is not None and parent.remote:
+        # Draw an arrow from the tool call in the parent process to this span
+        writer.write({
+            "name": "mcp_call", "cat": "flow", "ph": "f", "bp": "e", "id": parent.span_id,
+            "ts": start_us, "pid": os.getpid(), "tid": tid
+        })
+
+    try:
+        yield current
+    except GeneratorExit:
+        # A streaming consumer stopped early, which is not an error
+        raise
+    except BaseException as e:
+        current.args["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # An async generator resumed from another context
+            _current_span.set(parent)
+        writer.write({
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": start_us,
+            "dur": max(1, int((time.perf_counter() - start) * 1_000_000)),
+            "pid": os.getpid(),
+            "tid": tid,
+            "args": {
+                **current.args,
+                "trace_id": current.trace_id,
+                "span_id": current.span_id,
+                "parent_id": current.parent_id
+            }
+        })
+
+def inject() -> Optional[Dict[str, str]]:
+    """
+    Export the current trace context for an outgoing MCP call.
+
+    Returns:
+        Context to send in the request's _meta, or None when there is nothing to propagate
+    """
+    writer = _get_writer()
+    current = _current_span.get()
+    if writer is None or current is None:
+        return None
+    writer.write({
+        "name": "mcp_call", "cat": "flow", "ph": "s", "id": current.span_id,
+        "ts": time.time_ns() // 1000, "pid": os.getpid(), "tid": writer.current_tid()
+    })
+    return {"trace_id": current.trace_id, "span_id": current.span_id}
+
+@contextmanager
+def remote_parent(context: Optional[Dict[str, Any]]) -> Iterator[None]:
+    """
+    Make spans in the block children of a span from another process.
+
+    Args:
+        context: Trace context produced by inject() in the calling process
+    """
+    if not context or not context.get("trace_id") or not context.get("span_id"):
+        yield
+        return
+    token = _current_span.set(Span(
+        "remote", "remote", trace_id=str(context["trace_id"]), span_id=str(context["span_id"]), remote=True
+    ))
+    try:
+        yield
+    finally:
+        _current_span.reset(token)
+
+def export_chrome_trace(input_paths: List[str], output_path: str) -> int:
+    """
+    Stitch JSONL trace files into one Chrome trace file.
+
+    Args:
+        input_paths: JSONL files written by one or more traced processes
+        output_path: JSON file to write, loadable in chrome://tracing or Perfetto
+
+    Returns:
+        Number of events written
+    """
+    events = []
+    for input_path in input_paths:
+        with open(input_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    events.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A process killed mid-write can leave a partial line
+                    continue
+    events.sort(key=lambda event: event.get("ts", 0))
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+    return len(events)
+
+def main() -> None:
+    """Command line entry point: python -m FractFlow.infra.tracing trace.jsonl -o trace.json"""
+    parser = argparse.ArgumentParser(description='Convert FractFlow JSONL traces to a Chrome trace file')
+    parser.add_argument('inputs', nargs='+', help='JSONL trace files')
+    parser.add_argument('--output', '-o', default='trace.json', help='Chrome trace JSON file to write')
+    args = parser.parse_args()
+    count = export_chrome_trace(args.inputs, args.output)
+    print(f"Wrote {count} events to {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,297 @@
+"""
+Token usage accounting for the fractal agent call tree.
+
+Every chat completion sent to a provider records the usage it reports under
+the call path of the component that sent it, the model and the agent loop
+iteration, in the ledger of the running query. Agents serving another agent
+over MCP send their ledger back with the tool result, so the ledger of the
+top-level query covers the whole call tree. summarize() aggregates the
+records by call path, including everything below each path, and by model,
+and prices them if token prices are configured.
+
+Streamed requests ask for a final usage chunk with stream_options and are
+recorded when that chunk arrives. Providers that do not send one leave
+their streamed requests out of the totals.
+
+Responses served from the completion cache cost nothing and are not recorded.
+"""
+
+import json
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Key of the usage request in the _meta field of MCP requests
+META_KEY = 'fractflow_usage'
+
+# URI of the resource carrying a child agent's usage records in tool results
+RESOURCE_URI = 'fractflow://usage'
+
+# Counters kept per record
+COUNTERS = ('requests', 'prompt_tokens', 'completion_tokens', 'total_tokens', 'cached_prompt_tokens')
+
+class UsageLedger:
+    """Token counters by call path, model and iteration."""
+
+    def __init__(self, root: str = '', parent: Optional['UsageLedger'] = None):
+        """
+        Initialize an empty ledger.
+
+        Args:
+            root: Call path of the agent collecting the ledger, prefixed to
+                  the call paths of records merged from child agent servers
+            parent: Ledger of an enclosing query in this process, which
+                    receives every record as well
+        """
+        self.root = root
+        self.parent = parent
+        self.entries: Dict[Tuple[str, str, Optional[int]], Dict[str, int]] = {}
+
+    def add(self, call_path: str, model: str, iteration: Optional[int], counters: Dict[str, int]) -> None:
+        """
+        Add counters to a record.
+
+        Args:
+            call_path: Call path of the component that sent the requests
+            model: Model name
+            iteration: Agent loop iteration, None outside the loop
+            counters: Values by counter name, see COUNTERS
+        """
+        entry = self.entries.setdefault((call_path, model, iteration), dict.fromkeys(COUNTERS, 0))
+        for name in COUNTERS:
+            entry[name] += int(counters.get(name) or 0)
+        if self.parent is not None:
+            self.parent.add(call_path, model, iteration, counters)
+
+    def merge(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Add the records of a child agent server, under this ledger's root.
+
+        Args:
+            records: Output of records() in the child process
+        """
+        for record in records:
+            call_path = record.get('call_path', '')
+            if self.root:
+                call_path = f"{self.root}->{call_path}" if call_path else self.root
+            self.add(call_path, record.get('model', ''), record.get('iteration'), record)
+
+    def records(self) -> List[Dict[str, Any]]:
+        """
+        Get the records.
+
+        Returns:
+            One dictionary per call path, model and iteration with its counters
+        """
+        return [
+            {'call_path': call_path, 'model': model, 'iteration': iteration, **counters}
+            for (call_path, model, iteration), counters in self.entries.items()
+        ]
+
+    def summarize(self, prices: Optional[Dict[str, Dict[str, float]]] = None) -> Dict[str, Any]:
+        """
+        Aggregate the records.
+
+        Args:
+            prices: Prices per million tokens by model name, with 'prompt',
+                    'completion' and optionally 'cached_prompt' keys
+
+        Returns:
+            Dictionary with:
+            - total: counters of all records
+            - by_call_path: counters by call path, each including all paths below it
+            - by_model: counters by model
+            - records: see records()
+            Counters include 'cost' when prices are given for every model used
+        """
+        records = self.records()
+        total = dict.fromkeys(COUNTERS, 0)
+        by_call_path: Dict[str, Dict[str, Any]] = {}
+        by_model: Dict[str, Dict[str, Any]] = {}
+        priced = bool(prices)
+        for record in records:
+            cost = _cost(record, prices.get(record['model'])) if prices else None
+            if cost is None:
+                priced = False
+            else:
+                record['cost'] = cost
+            parts = record['call_path'].split('->')
+            groups = [total, by_model.setdefault(record['model'], dict.fromkeys(COUNTERS, 0))]
+            groups += [by_call_path.setdefault('->'.join(parts[:depth]), dict.fromkeys(COUNTERS, 0))
+                       for depth in range(1, len(parts) + 1)]
+            for group in groups:
+                for name in COUNTERS:
+                    group[name] += record[name]
+                if cost is not None:
+                    group['cost'] = group.get('cost', 0.0) + cost
+        if not priced:
+            for group in [total, *by_call_path.values(), *by_model.values()]:
+                group.pop('cost', None)
+        return {'total': total, 'by_call_path': by_call_path, 'by_model': by_model, 'records': records}
+
+def _cost(record: Dict[str, Any], price: Optional[Dict[str, float]]) -> Optional[float]:
+    """Price a record, None if the model has no price."""
+    if not price:
+        return None
+    cached = record['cached_prompt_tokens']
+    cached_price = price.get('cached_prompt', price.get('prompt', 0.0))
+    return ((record['prompt_tokens'] - cached) * price.get('prompt', 0.0) + cached * cached_price
+            + record['completion_tokens'] * price.get('completion', 0.0)) / 1e6
+
+_ledger: contextvars.ContextVar[Optional[UsageLedger]] = contextvars.ContextVar('fractflow_usage_ledger', default=None)
+_iteration: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar('fractflow_usage_iteration', default=None)
+
+@contextmanager
+def collect(root: str = '') -> Iterator[UsageLedger]:
+    """
+    Collect the usage of the requests made in the block.
+
+    Args:
+        root: Call path of the collecting agent, see UsageLedger
+
+    Yields:
+        The ledger, also fed by any enclosing collect() block
+    """
+    ledger = UsageLedger(root, parent=_ledger.get())
+    token = _ledger.set(ledger)
+    iteration_token = _iteration.set(None)
+    try:
+        yield ledger
+    finally:
+        _iteration.reset(iteration_token)
+        _ledger.reset(token)
+
+def is_collecting() -> bool:
+    """Whether requests are being recorded."""
+    return _ledger.get() is not None
+
+def set_iteration(iteration: Optional[int]) -> None:
+    """
+    Attribute the following requests of the running task to an agent loop iteration.
+
+    Args:
+        iteration: Iteration number, starting at 1
+    """
+    _iteration.set(iteration)
+
+def response_counters(response: Any) -> Optional[Dict[str, int]]:
+    """
+    Read the usage reported in a chat completion response.
+
+    Args:
+        response: Chat completion, or a streamed chunk
+
+    Returns:
+        Counters, None if the response reports no usage
+    """
+    usage = getattr(response, 'usage', None)
+    if usage is None:
+        return None
+    details = getattr(usage, 'prompt_tokens_details', None)
+    # DeepSeek reports its context cache hits separately
+    cached = getattr(details, 'cached_tokens', None) or getattr(usage, 'prompt_cache_hit_tokens', None) or 0
+    prompt_tokens = getattr(usage, 'prompt_tokens', None) or 0
+    completion_tokens = getattr(usage, 'completion_tokens', None) or 0
+    return {
+        'requests': 1,
+        'prompt_tokens': prompt_tokens,
+        'completion_tokens': completion_tokens,
+        'total_tokens': getattr(usage, 'total_tokens', None) or prompt_tokens + completion_tokens,
+        'cached_prompt_tokens': cached
+    }
+
+def record(call_path: str, model: Optional[str], response: Any) -> None:
+    """
+    Record the usage of a chat completion in the ledger of the running query.
+
+    Args:
+        call_path: Call path of the component that sent the request
+        model: Requested model
+        response: Chat completion response
+    """
+    ledger = _ledger.get()
+    if ledger is None:
+        return
+    counters = response_counters(response)
+    if counters is not None:
+        ledger.add(call_path, getattr(response, 'model', None) or model or '', _iteration.get(), counters)
+
+class _RecordingStream:
+    """Streamed chat completion that records the usage reported in its final chunk."""
+
+    def __init__(self, stream: Any, ledger: UsageLedger, call_path: str, model: str, iteration: Optional[int]):
+        self._stream = stream
+        self._ledger = ledger
+        self._call_path = call_path
+        self._model = model
+        self._iteration = iteration
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._stream, name)
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            counters = response_counters(chunk)
+            if counters is not None:
+                self._ledger.add(self._call_path, getattr(chunk, 'model', None) or self._model,
+                                 self._iteration, counters)
+            yield chunk
+
+def record_stream(call_path: str, model: Optional[str], stream: Any) -> Any:
+    """
+    Record the usage of a streamed chat completion once its usage chunk arrives.
+
+    The request needs stream_options={'include_usage': True} for the
+    provider to send one.
+
+    Args:
+        call_path: Call path of the component that sent the request
+        model: Requested model
+        stream: Streamed chat completion response
+
+    Returns:
+        The stream, wrapped when a query is collecting usage
+    """
+    ledger = _ledger.get()
+    if ledger is None:
+        return stream
+    return _RecordingStream(stream, ledger, call_path, model or '', _iteration.get())
+
+def to_resource(records: List[Dict[str, Any]]) -> Any:
+    """
+    Pack usage records into an MCP resource for a tool result.
+
+    Args:
+        records: Output of UsageLedger.records()
+
+    Returns:
+        An EmbeddedResource holding the records as JSON
+    """
+    from mcp import types
+    return types.EmbeddedResource(type='resource', resource=types.TextResourceContents(
+        uri=RESOURCE_URI, mimeType='application/json', text=json.dumps(records)
+    ))
+
+def extract(content: List[Any]) -> List[Any]:
+    """
+    Take the usage records out of a tool result, merging them into the running query's ledger.
+
+    Args:
+        content: Content items of an MCP tool result
+
+    Returns:
+        The remaining content items
+    """
+    remaining = []
+    for item in content:
+        resource = getattr(item, 'resource', None)
+        if resource is not None and str(getattr(resource, 'uri', '')) == RESOURCE_URI:
+            ledger = _ledger.get()
+            if ledger is not None:
+                try:
+                    ledger.merge(json.loads(resource.text))
+                except (TypeError, ValueError):
+                    pass
+            continue
+        remaining.append(item)
+    return remaining
@@ -7,12 +7,23 @@ and managing tool providers.
 
 # 导出主要的类和函数
 from .client_pool import MCPClientPool, get_client_pool
+from .connection import MCPConnection
+from .server_pool import SharedServerPool, get_shared_server_pool
 from .launcher import MCPLauncher
+from .supervisor import ServerSupervisor, CircuitBreaker, CircuitOpenError
 from .tool_loader import MCPToolLoader
+from .tool_registry import ToolRegistry
 
 __all__ = [
     'MCPClientPool',
     'get_client_pool',
+    'MCPConnection',
+    'SharedServerPool',
+    'get_shared_server_pool',
     'MCPLauncher',
+    'ServerSupervisor',
+    'CircuitBreaker',
+    'CircuitOpenError',
     'MCPToolLoader',
+    'ToolRegistry',
 ] 
\ No newline at end of file
@@ -7,14 +7,18 @@ and coordinating tool calls.
 
 import asyncio
 import logging
-from typing import Dict, Any, Optional, Tuple
-from contextlib import AsyncExitStack
-import sys
+from typing import Dict, Any, List, Optional
 
 # 导入外部MCP库
 import mcp  
+from mcp import types
 from mcp.client.session import ClientSession
-from mcp.client.stdio import StdioServerParameters, stdio_client
+
+from .connection import MCPConnection
+from .server_pool import SharedServerPool
+from .supervisor import ServerSupervisor
+from .tool_registry import ToolRegistry
+from ..infra import tracing, usage
 
 logger = logging.getLogger(__name__)
 
@@ -26,51 +30,154 @@ class MCPClientPool:
     Maintains a pool of MCP clients for different tools.
     
     Provides methods to add clients, call tools, and manage the lifecycle
-    of the client connections.
+    of the client connections. Each agent owns its own pool, so tool names
+    and connections are isolated between agents. Pools created with a
+    SharedServerPool reuse one server process per script path across agents.
     """
     
-    def __init__(self):
-        """Initialize the MCP client pool."""
+    def __init__(self, shared_servers: Optional[SharedServerPool] = None, zygote: Optional[Any] = None,
+                 supervision: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the MCP client pool.
+        
+        Args:
+            shared_servers: Optional shared server pool; when given, servers are
+                            borrowed from it instead of being spawned privately
+            zygote: Optional Zygote that server scripts are forked from instead
+                    of starting a new interpreter for each
+            supervision: Optional ServerSupervisor keyword arguments; when given,
+                         every client is supervised with call deadlines, health
+                         checks, automatic restarts and a circuit breaker
+        """
         self.clients: Dict[str, ClientSession] = {}
-        self.exit_stack = AsyncExitStack()
         self.tool_to_client: Dict[str, str] = {}  # Maps tool_name to client_name
+        self.startup_times: Dict[str, float] = {}  # Maps client_name to startup seconds
+        self.tool_registry = ToolRegistry()  # Cached tool schemas per client
+        self.shared_servers = shared_servers
+        self.zygote = zygote
+        self.supervision = supervision
+        self.supervisors: Dict[str, ServerSupervisor] = {}
+        
+        self._connections: Dict[str, MCPConnection] = {}
+        self._listeners: Dict[str, Any] = {}
         
-    async def add_client(self, client_name: str, server_script_path: str) -> None:
+    async def add_client(self, client_name: str, server_script_path: str, timeout: Optional[float] = None) -> None:
         """
         Initialize a new MCP client and add it to the pool.
         
+        Each connection is owned by a dedicated task, so several clients can be
+        added concurrently and each one can later be closed independently.
+        
         Args:
             client_name: Name to identify this client
-            server_script_path: Path to the server script
+            server_script_path: Path to the server script, or URL of a running
+                                server (see MCPConnection for the transports)
+            timeout: Optional startup timeout in seconds
             
         Raises:
             Exception: If the client cannot be added
         """
+        if client_name in self._connections:
+            raise ValueError(f"Client '{client_name}' already exists in this pool")
+            
+        start_time = asyncio.get_running_loop().time()
         try:
-            # Connect to the MCP server using stdio
-            server_params = StdioServerParameters(
-                command=sys.executable,
-                args=[server_script_path],
-                env=None
-            )
+            if self.shared_servers is not None:
+                connection = await self.shared_servers.acquire(server_script_path, timeout=timeout, zygote=self.zygote)
+            else:
+                connection = MCPConnection(client_name, server_script_path, zygote=self.zygote)
+                await connection.open(timeout)
+        except Exception as e:
+            logger.error(f"Error adding client '{client_name}': {e}")
+            raise
             
-            stdio_transport = await self.exit_stack.enter_async_context(stdio_client(server_params))
-            stdio, write = stdio_transport
-            session = await self.exit_stack.enter_async_context(ClientSession(stdio, write))
+        def listener() -> None:
+            # Also called after a restart, which replaces the session
+            self.clients[client_name] = connection.session
+            self.tool_registry.invalidate(client_name)
+        connection.add_tools_changed_listener(listener)
+        
+        self._connections[client_name] = connection
+        self._listeners[client_name] = listener
+        self.clients[client_name] = connection.session
+        self.startup_times[client_name] = asyncio.get_running_loop().time() - start_time
+        if self.supervision is not None:
+            supervisor = ServerSupervisor(connection, **self.supervision)
+            supervisor.start()
+            self.supervisors[client_name] = supervisor
+        
+        # Map tools to this client
+        self._register_tools(client_name, connection.tools)
             
-            await session.initialize()
-            self.clients[client_name] = session
+        logger.info(f"Added client '{client_name}' with {len(connection.tools)} tools in {self.startup_times[client_name]:.2f}s")
+        
+    async def remove_client(self, client_name: str) -> None:
+        """
+        Close a client and remove its tools from the pool.
+        
+        Args:
+            client_name: Name of the client
+        """
+        connection = self._connections.pop(client_name, None)
+        listener = self._listeners.pop(client_name, None)
+        supervisor = self.supervisors.pop(client_name, None)
+        self.clients.pop(client_name, None)
+        for tool_name in [name for name, owner in self.tool_to_client.items() if owner == client_name]:
+            del self.tool_to_client[tool_name]
+        self.tool_registry.remove_client(client_name)
+        
+        if supervisor is not None:
+            await supervisor.stop()
+        if connection is None:
+            return
+        if listener is not None:
+            connection.remove_tools_changed_listener(listener)
+        if self.shared_servers is not None:
+            await self.shared_servers.release(connection)
+        else:
+            await connection.close()
             
-            # Map tools to this client
-            response = await session.list_tools()
-            for tool in response.tools:
-                self.tool_to_client[tool.name] = client_name
-                
-            logger.info(f"Added client '{client_name}' with {len(response.tools)} tools")
+    def _register_tools(self, client_name: str, tools: List[Any]) -> None:
+        """
+        Record the tools of a client in the registry and the tool mapping.
+        
+        Args:
+            client_name: Name of the client
+            tools: MCP tool objects advertised by the client
+        """
+        for tool_name in [name for name, owner in self.tool_to_client.items() if owner == client_name]:
+            del self.tool_to_client[tool_name]
+        for tool in tools:
+            self.tool_to_client[tool.name] = client_name
+        self.tool_registry.set_tools(client_name, tools)
+        
+    async def refresh_tools(self, client_name: Optional[str] = None, force: bool = False) -> None:
+        """
+        Fetch the tool lists of out-of-date clients again.
+        
+        Args:
+            client_name: Only refresh this client, or None for all clients
+            force: Refresh even if the cached tools are not marked out of date
+        """
+        if force:
+            self.tool_registry.invalidate(client_name)
             
-        except Exception as e:
-            logger.error(f"Error adding client '{client_name}': {e}")
-            raise
+        stale_clients = self.tool_registry.get_stale_clients()
+        if client_name is not None:
+            stale_clients = [name for name in stale_clients if name == client_name]
+            
+        for name in stale_clients:
+            session = self.clients.get(name)
+            if session is None:
+                self.tool_registry.remove_client(name)
+                continue
+            try:
+                response = await session.list_tools()
+                self._connections[name].tools = response.tools
+                self._register_tools(name, response.tools)
+                logger.info(f"Refreshed tools for client '{name}': {len(response.tools)} tools")
+            except Exception as e:
+                logger.error(f"Error refreshing tools for client '{name}': {e}")
             
     async def call(self, tool_name: str, arguments: Dict[str, Any]) -> str:
         """
@@ -84,38 +191,85 @@ class MCPClientPool:
             The result from the tool call
             
         Raises:
-            Exception: If the tool call fails
+            Exception: If the tool call fails, or for supervised clients also
+                       if it misses its deadline or the server is unavailable
         """
         if tool_name not in self.tool_to_client:
             raise ValueError(f"Unknown tool: {tool_name}")
             
         client_name = self.tool_to_client[tool_name]
-        client = self.clients[client_name]
+        meta = {}
+        trace_context = tracing.inject()
+        if trace_context is not None:
+            meta[tracing.META_KEY] = trace_context
+        if usage.is_collecting():
+            # Agent servers send their token usage back along with the result
+            meta[usage.META_KEY] = True
+        
+        async def send(client: ClientSession) -> types.CallToolResult:
+            if not meta:
+                return await client.call_tool(tool_name, arguments)
+            # ClientSession.call_tool cannot set _meta, so send the request directly
+            return await client.send_request(
+                types.ClientRequest(types.CallToolRequest(
+                    method="tools/call",
+                    params=types.CallToolRequestParams(
+                        name=tool_name,
+                        arguments=arguments,
+                        _meta=types.RequestParams.Meta(**meta)
+                    )
+                )),
+                types.CallToolResult
+            )
         
         try:
-            result = await client.call_tool(tool_name, arguments)
-            return result.content
+            supervisor = self.supervisors.get(client_name)
+            if supervisor is not None:
+                result = await supervisor.call(tool_name, send)
+            else:
+                result = await send(self.clients[client_name])
+            return usage.extract(result.content)
         except Exception as e:
             logger.error(f"Error calling tool {tool_name}: {e}")
             raise
             
+    def get_health(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the supervision counters of every supervised client.
+        
+        Returns:
+            ServerSupervisor.stats() by client name, empty without supervision
+        """
+        return {name: supervisor.stats() for name, supervisor in self.supervisors.items()}
+        
     async def cleanup(self) -> None:
         """
         Clean up all resources.
         
         Closes all client connections and releases resources.
         """
-        try:
-            await self.exit_stack.aclose()
-            logger.info("All MCP clients cleaned up")
-        except Exception as e:
-            logger.error(f"Error during cleanup: {e}")
-            raise
+        client_names = list(self._connections.keys())
+        results = await asyncio.gather(*(self.remove_client(name) for name in client_names), return_exceptions=True)
+        
+        self.clients.clear()
+        self.tool_to_client.clear()
+        self.tool_registry.clear()
+        
+        errors = [(name, result) for name, result in zip(client_names, results) if isinstance(result, Exception)]
+        for name, error in errors:
+            logger.error(f"Error during cleanup of client '{name}': {error}")
+            
+        if errors:
+            raise errors[0][1]
+        logger.info("All MCP clients cleaned up")
 
 # 获取单例实例的函数
 def get_client_pool() -> MCPClientPool:
     """
-    Get the singleton client pool instance.
+    Get the process-wide default client pool instance.
+    
+    Agents no longer use this pool; each MCPLauncher owns its own. It is kept
+    for code that manages MCP clients without an agent.
     
     Returns:
         The global client pool instance
@@ -0,0 +1,248 @@
+"""
+MCP connection implementation.
+
+Provides a single connection to an MCP server whose lifetime is owned by a
+dedicated task. Servers are either scripts spawned over stdio or running
+network services reached by URL.
+"""
+
+import asyncio
+import logging
+import sys
+import time
+from typing import Any, Callable, List, Optional
+
+from mcp import types
+from mcp.client.session import ClientSession
+from mcp.client.sse import sse_client
+from mcp.client.stdio import StdioServerParameters, stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+
+from ..infra import tracing
+
+logger = logging.getLogger(__name__)
+
+def is_remote_server(location: str) -> bool:
+    """
+    Check whether a server location is a network endpoint rather than a script.
+
+    Args:
+        location: Server script path or URL
+
+    Returns:
+        True for http:// and https:// URLs
+    """
+    return location.startswith(('http://', 'https://'))
+
+def get_transport(location: str) -> str:
+    """
+    Get the MCP transport used to reach a server.
+
+    URLs whose path ends with /sse use the SSE transport, other URLs the
+    streamable HTTP transport, and script paths are spawned over stdio.
+
+    Args:
+        location: Server script path or URL
+
+    Returns:
+        'stdio', 'sse' or 'streamable-http'
+    """
+    if not is_remote_server(location):
+        return 'stdio'
+    path = location.split('?', 1)[0].rstrip('/')
+    return 'sse' if path.endswith('/sse') else 'streamable-http'
+
+class MCPConnection:
+    """
+    A connection to one MCP server.
+
+    The transport and client session are entered and exited inside a
+    dedicated task. MCP connections must be closed from the task that
+    opened them, so owning them here lets connections be opened concurrently
+    and closed independently, from any task.
+    """
+
+    def __init__(self, name: str, server_script_path: str, zygote: Optional[Any] = None):
+        """
+        Initialize the connection.
+
+        Args:
+            name: Name used for logging
+            server_script_path: Path to the server script, or URL of a running server
+            zygote: Optional Zygote to fork stdio servers from instead of spawning them
+        """
+        self.name = name
+        self.server_script_path = server_script_path
+        self.transport = get_transport(server_script_path)
+        self.zygote = zygote if self.transport == 'stdio' else None
+
+        self.session: Optional[ClientSession] = None
+        self.tools: List[Any] = []
+        self.startup_time: Optional[float] = None
+        # Incremented every time the connection is (re)opened
+        self.generation = 0
+
+        self._tools_changed_listeners: List[Callable[[], None]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._restart_lock: Optional[asyncio.Lock] = None
+
+    def create_server_params(self) -> StdioServerParameters:
+        """
+        Create the parameters used to spawn the server process.
+
+        Returns:
+            Stdio server parameters
+        """
+        # Imported here so that mcpcore does not load the model stack
+        from ..models import rate_limiter
+        return StdioServerParameters(
+            command=sys.executable,
+            args=[self.server_script_path],
+            # Let the server join the trace and share the LLM rate limits; None keeps the default environment
+            env={**tracing.child_environment(), **rate_limiter.child_environment()} or None
+        )
+
+    def add_tools_changed_listener(self, listener: Callable[[], None]) -> None:
+        """
+        Register a callback run when the server reports that its tool list changed.
+
+        Args:
+            listener: Callback without arguments
+        """
+        self._tools_changed_listeners.append(listener)
+
+    def remove_tools_changed_listener(self, listener: Callable[[], None]) -> None:
+        """
+        Unregister a tool list change callback.
+
+        Args:
+            listener: Callback previously passed to add_tools_changed_listener
+        """
+        if listener in self._tools_changed_listeners:
+            self._tools_changed_listeners.remove(listener)
+
+    async def _handle_message(self, message: Any) -> None:
+        """Dispatch messages sent by the server to interested listeners."""
+        if isinstance(message, types.ServerNotification) and \
+                isinstance(message.root, types.ToolListChangedNotification):
+            logger.info(f"Tool list changed for client '{self.name}'")
+            for listener in list(self._tools_changed_listeners):
+                listener()
+
+    def _transport_client(self):
+        """Create the transport context manager for the server location."""
+        if self.transport == 'sse':
+            return sse_client(self.server_script_path)
+        if self.transport == 'streamable-http':
+            return streamablehttp_client(self.server_script_path)
+        if self.zygote is not None:
+            from .zygote import zygote_client
+            return zygote_client(self.zygote, self.create_server_params())
+        return stdio_client(self.create_server_params())
+
+    async def open(self, timeout: Optional[float] = None) -> None:
+        """
+        Start or connect to the server and initialize the session.
+
+        Args:
+            timeout: Optional startup timeout in seconds
+
+        Raises:
+            TimeoutError: If the server does not start in time
+            Exception: If the server cannot be started
+        """
+        ready = asyncio.get_running_loop().create_future()
+        self._stop_event = asyncio.Event()
+        start_time = time.perf_counter()
+        self._task = asyncio.create_task(self._run(ready, self._stop_event))
+
+        try:
+            self.session, self.tools = await asyncio.wait_for(ready, timeout)
+        except BaseException as e:
+            # Tear down the half-started server before reporting the failure
+            await self.close()
+            if isinstance(e, asyncio.TimeoutError):
+                raise TimeoutError(f"MCP server '{self.name}' did not start within {timeout} seconds") from e
+            raise
+
+        self.startup_time = time.perf_counter() - start_time
+        self.generation += 1
+
+    async def _run(self, ready: asyncio.Future, stop_event: asyncio.Event) -> None:
+        """
+        Open the connection and keep it alive until asked to stop.
+
+        Args:
+            ready: Future resolved with (session, tools) once the session is initialized
+            stop_event: Event that closes the connection when set
+        """
+        try:
+            async with self._transport_client() as streams:
+                # The streamable HTTP client also yields a session id getter
+                read, write = streams[0], streams[1]
+                async with ClientSession(read, write, message_handler=self._handle_message) as session:
+                    await session.initialize()
+                    response = await session.list_tools()
+
+                    if ready.done():
+                        # open() gave up waiting
+                        return
+                    ready.set_result((session, response.tools))
+
+                    await stop_event.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            elif not ready.cancelled():
+                logger.error(f"Client '{self.name}' connection closed with error: {e}")
+
+    async def close(self) -> None:
+        """Close the session and stop the server, if it was spawned by this connection."""
+        task, self._task = self._task, None
+        if task is None:
+            return
+        self._stop_event.set()
+        if not self.session:
+            # Still starting up, nothing to shut down gracefully
+            task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        self.session = None
+
+    async def restart(self, timeout: Optional[float] = None, generation: Optional[int] = None) -> bool:
+        """
+        Close the connection and open it again, respawning a stdio server.
+
+        Tools changed listeners are notified afterwards, since the new
+        server may advertise different tools and uses a new session.
+
+        Args:
+            timeout: Optional startup timeout in seconds
+            generation: Only restart if the connection is still at this
+                        generation, so that callers noticing the same failure
+                        restart it once
+
+        Returns:
+            False if the connection was already restarted by someone else
+
+        Raises:
+            TimeoutError: If the server does not start in time
+            Exception: If the server cannot be started
+        """
+        if self._restart_lock is None:
+            self._restart_lock = asyncio.Lock()
+        async with self._restart_lock:
+            if generation is not None and generation != self.generation:
+                return False
+            await self.close()
+            await self.open(timeout)
+
+        logger.info(f"Restarted client '{self.name}' in {self.startup_time:.2f}s")
+        for listener in list(self._tools_changed_listeners):
+            listener()
+        return True
+
+    @property
+    def is_open(self) -> bool:
+        """Whether the connection is open and its owner task still running."""
+        return self.session is not None and self._task is not None and not self._task.done()
@@ -0,0 +1,180 @@
+"""
+Import-time profiler for MCP tool servers.
+
+Reports, per server script, how long loading the script takes before it can
+register its tools, which imports dominate that time, and which modules
+were deferred with FractFlow.infra.lazy_import together with what loading
+them on the first tool call costs.
+
+Usage:
+    python -m FractFlow.mcpcore.import_profile tools/core/*/*_mcp.py
+    python -m FractFlow.mcpcore.import_profile server.py --ready --json
+
+Each script is loaded in a fresh interpreter under ``python -X importtime``
+with a module name other than ``__main__``, so the server does not start.
+With --ready, the server is also started over stdio and the time until it
+answers initialize and list_tools is measured, which is what
+MCPClientPool.add_client waits for.
+"""
+
+import os
+import sys
+import json
+import asyncio
+import argparse
+import subprocess
+from typing import Any, Dict, List, Optional
+
+# Project root, so the probe can import FractFlow
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Separates the script's imports from the deferred ones in the importtime output
+_MARKER = '--- fractflow import profile: deferred ---'
+
+_PROBE = '''
+import os, sys, json, time, runpy
+script = sys.argv[1]
+sys.argv = [script]
+sys.path[0] = os.path.dirname(os.path.abspath(script))
+result = {"error": None, "deferred": {}}
+start = time.perf_counter()
+try:
+    runpy.run_path(script, run_name="__import_profile__")
+except BaseException as e:
+    result["error"] = f"{type(e).__name__}: {e}"
+result["load_s"] = time.perf_counter() - start
+sys.stderr.write(MARKER + "\\n")
+sys.stderr.flush()
+lazy = sys.modules.get("FractFlow.infra.lazy_import")
+for name in (lazy.pending_imports() if lazy else []):
+    start = time.perf_counter()
+    try:
+        __import__(name)
+        result["deferred"][name] = time.perf_counter() - start
+    except BaseException as e:
+        result["deferred"][name] = f"{type(e).__name__}: {e}"
+sys.stdout.write("\\n" + json.dumps(result) + "\\n")
+'''.replace('MARKER', repr(_MARKER))
+
+def parse_importtime(output: str) -> List[Dict[str, Any]]:
+    """
+    Parse the stderr of ``python -X importtime``.
+
+    Args:
+        output: Lines of ``import time: self [us] | cumulative | imported package``
+
+    Returns:
+        Entries with the module name, nesting depth and cumulative seconds
+    """
+    entries = []
+    for line in output.splitlines():
+        if line == _MARKER:
+            break
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        try:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            entries.append({
+                'module': name.strip(),
+                'depth': (len(name) - len(name.lstrip()) - 1) // 2,
+                'seconds': int(cumulative) / 1e6
+            })
+        except ValueError:
+            continue
+    return entries
+
+def profile_imports(script_path: str, top: int = 5) -> Dict[str, Any]:
+    """
+    Measure how long a server script takes to load.
+
+    Args:
+        script_path: Path to the server script
+        top: Number of heaviest top-level imports to report
+
+    Returns:
+        Load seconds, heaviest imports, deferred modules with their load
+        seconds (or the import error), and the load error if any
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [_PROJECT_ROOT, env.get('PYTHONPATH')]))
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _PROBE, os.path.abspath(script_path)],
+        capture_output=True, text=True, env=env
+    )
+    lines = completed.stdout.strip().splitlines()
+    if not lines:
+        raise RuntimeError(f"Profiling {script_path} failed: {completed.stderr.strip().splitlines()[-1:]}")
+    result = json.loads(lines[-1])
+
+    entries = parse_importtime(completed.stderr)
+    heaviest = sorted((entry for entry in entries if entry['depth'] == 0), key=lambda entry: entry['seconds'], reverse=True)
+    return {
+        'script': script_path,
+        'load_s': round(result['load_s'], 3),
+        'import_s': round(sum(entry['seconds'] for entry in entries if entry['depth'] == 0), 3),
+        'heaviest_imports': {entry['module']: round(entry['seconds'], 3) for entry in heaviest[:top]},
+        'deferred': {name: round(value, 3) if isinstance(value, float) else value
+                     for name, value in result['deferred'].items()},
+        'error': result['error']
+    }
+
+async def measure_ready(script_path: str, timeout: Optional[float] = 60.0) -> Dict[str, Any]:
+    """
+    Start a server over stdio and measure how long it takes to list its tools.
+
+    Args:
+        script_path: Path to the server script
+        timeout: Startup timeout in seconds
+
+    Returns:
+        Ready seconds and tool count, or the startup error
+    """
+    from .connection import MCPConnection
+
+    connection = MCPConnection(os.path.basename(script_path), os.path.abspath(script_path))
+    try:
+        await connection.open(timeout)
+        return {'ready_s': round(connection.startup_time, 3), 'tools': len(connection.tools)}
+    except Exception as e:
+        return {'ready_s': None, 'ready_error': str(e) or type(e).__name__}
+    finally:
+        await connection.close()
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Format one script's profile for the terminal."""
+    lines = [f"{report['script']}"]
+    status = f"  load {report['load_s']:.3f}s, top-level imports {report['import_s']:.3f}s"
+    if report.get('ready_s') is not None:
+        status += f", ready {report['ready_s']:.3f}s ({report['tools']} tools)"
+    lines.append(status)
+    if report['error']:
+        lines.append(f"  load failed: {report['error']}")
+    if report.get('ready_error'):
+        lines.append(f"  start failed: {report['ready_error']}")
+    if report['heaviest_imports']:
+        lines.append("  heaviest imports: " + ", ".join(
+            f"{name} {seconds:.3f}s" for name, seconds in report['heaviest_imports'].items()))
+    if report['deferred']:
+        lines.append("  deferred to first call: " + ", ".join(
+            f"{name} {value:.3f}s" if isinstance(value, float) else f"{name} (import failed)"
+            for name, value in report['deferred'].items()))
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description='Profile MCP tool server import times')
+    parser.add_argument('scripts', nargs='+', help='Tool server scripts to profile')
+    parser.add_argument('--top', type=int, default=5, help='Heaviest top-level imports to list')
+    parser.add_argument('--ready', action='store_true', help='Also start each server and time initialize and list_tools')
+    parser.add_argument('--json', action='store_true', help='Print JSON lines instead of a report')
+    args = parser.parse_args(argv)
+
+    for script_path in args.scripts:
+        report = profile_imports(script_path, top=args.top)
+        # A server that cannot even be loaded would only run into the startup timeout
+        if args.ready and not report['error']:
+            report.update(asyncio.run(measure_ready(script_path)))
+        print(json.dumps(report, ensure_ascii=False) if args.json else format_report(report), flush=True)
+
+if __name__ == '__main__':
+    main()
@@ -5,11 +5,16 @@ Provides functionality to manage and launch multiple MCP tool servers.
 """
 
 import os
-from typing import Dict, List, Optional
+import time
+import asyncio
+from typing import Any, Dict, List, Optional
 
-from .client_pool import get_client_pool
+from .client_pool import MCPClientPool
+from .connection import is_remote_server
+from .server_pool import get_shared_server_pool
 from ..infra.config import ConfigManager
 from ..infra.logging_utils import get_logger
+from ..infra import tracing
 
 class MCPLauncher:
     """
@@ -33,10 +38,64 @@ class MCPLauncher:
         # Initialize logger
         self.logger = get_logger(self.config.get_call_path())
         
-        self.client_pool = get_client_pool()
+        # Server scripts are either spawned as new interpreters or forked from a warm zygote
+        self.launch_method = self.config.get('mcp.launch_method', 'spawn')
+        zygote = None
+        if self.launch_method == 'zygote':
+            from .zygote import get_zygote, zygote_supported
+            if zygote_supported():
+                zygote = get_zygote(self.config.get('mcp.zygote_preload'))
+            else:
+                self.logger.warning("Zygote launch is not supported on this platform, spawning servers instead")
+                self.launch_method = 'spawn'
+        
+        # Each launcher owns its client pool, optionally backed by shared server processes
+        self.share_servers = self.config.get('mcp.share_servers', False)
+        self.supervise = self.config.get('mcp.supervise', False)
+        self.client_pool = MCPClientPool(
+            shared_servers=get_shared_server_pool() if self.share_servers else None,
+            zygote=zygote,
+            supervision=self._get_supervision_options() if self.supervise else None
+        )
         self.server_paths: Dict[str, str] = {}
         
-        self.logger.debug("Launcher initialized")
+        # Launch settings
+        self.launch_mode = self.config.get('mcp.launch_mode', 'sequential')
+        self.max_concurrent_launches = self.config.get('mcp.max_concurrent_launches', 4)
+        self.startup_timeout = self.config.get('mcp.startup_timeout')
+        
+        # Outcome of the last launch_all call
+        self.startup_times: Dict[str, float] = {}
+        self.failed_servers: Dict[str, str] = {}
+        
+        self.logger.debug("Launcher initialized", {
+            "launch_mode": self.launch_mode,
+            "max_concurrent_launches": self.max_concurrent_launches,
+            "startup_timeout": self.startup_timeout,
+            "share_servers": self.share_servers,
+            "launch_method": self.launch_method,
+            "supervise": self.supervise
+        })
+        
+    def _get_supervision_options(self) -> Dict[str, Any]:
+        """
+        Get the ServerSupervisor settings from the configuration.
+        
+        Returns:
+            Keyword arguments for ServerSupervisor
+        """
+        return {
+            "ping_interval": self.config.get('mcp.ping_interval', 30.0),
+            "ping_timeout": self.config.get('mcp.ping_timeout', 10.0),
+            "call_timeout": self.config.get('mcp.call_timeout'),
+            "tool_timeouts": self.config.get('mcp.tool_timeouts'),
+            "failure_threshold": self.config.get('mcp.failure_threshold', 5),
+            "reset_timeout": self.config.get('mcp.circuit_reset_timeout', 30.0),
+            "backoff_base": self.config.get('mcp.restart_backoff_base', 1.0),
+            "backoff_max": self.config.get('mcp.restart_backoff_max', 60.0),
+            "max_restarts": self.config.get('mcp.max_restarts'),
+            "startup_timeout": self.config.get('mcp.startup_timeout') or 60.0
+        }
         
     def register_server(self, server_name: str, script_path: str) -> None:
         """
@@ -44,12 +103,12 @@ class MCPLauncher:
         
         Args:
             server_name: A unique name for this server
-            script_path: Path to the server script
+            script_path: Path to the server script, or URL of a running server
             
         Raises:
             FileNotFoundError: If the server script doesn't exist
         """
-        if not os.path.exists(script_path):
+        if not is_remote_server(script_path) and not os.path.exists(script_path):
             error_msg = f"Server script not found: {script_path}"
             self.logger.error(error_msg, {"server": server_name, "path": script_path})
             raise FileNotFoundError(error_msg)
@@ -61,20 +120,91 @@ class MCPLauncher:
         """
         Launch all registered MCP servers and connect clients.
         
+        In 'sequential' mode servers are started one after another and the
+        first failure aborts the launch. In 'concurrent' mode up to
+        ``mcp.max_concurrent_launches`` servers start at once and a failing
+        or slow server is recorded in ``failed_servers`` without stopping the
+        others; an error is only raised if no server could be started.
+        
         Raises:
-            Exception: If any server fails to launch
+            Exception: If a server fails to launch (sequential mode) or all servers fail (concurrent mode)
         """
-        self.logger.debug(f"Launching servers", {"count": len(self.server_paths)})
+        self.logger.debug(f"Launching servers", {"count": len(self.server_paths), "mode": self.launch_mode, "method": self.launch_method})
+        
+        self.startup_times = {}
+        self.failed_servers = {}
+        launch_start = time.perf_counter()
+        
+        if self.launch_mode == 'concurrent':
+            await self._launch_concurrently()
+        else:
+            await self._launch_sequentially()
+            
+        zygote = self.client_pool.zygote
+        self.logger.info("Server startup times", {
+            "launch_method": self.launch_method,
+            "zygote_startup_seconds": round(zygote.startup_time, 3) if zygote and zygote.startup_time else None,
+            "total_seconds": round(time.perf_counter() - launch_start, 3),
+            "servers": {name: round(seconds, 3) for name, seconds in sorted(
+                self.startup_times.items(), key=lambda item: item[1], reverse=True)}
+        })
         
+    async def _launch_sequentially(self) -> None:
+        """Launch servers one at a time, aborting on the first failure."""
         try:
             for server_name, script_path in self.server_paths.items():
-                self.logger.debug(f"Launching server", {"name": server_name})
-                await self.client_pool.add_client(server_name, script_path)
+                await self._launch_server(server_name, script_path)
                 
             self.logger.info("All servers launched successfully")
         except Exception as e:
             self.logger.error(f"Error launching servers", {"error": str(e)})
             raise
+            
+    async def _launch_concurrently(self) -> None:
+        """Launch servers in parallel with bounded concurrency and partial success."""
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrent_launches))
+        
+        async def launch(server_name: str, script_path: str) -> None:
+            async with semaphore:
+                try:
+                    await self._launch_server(server_name, script_path)
+                except Exception as e:
+                    self.failed_servers[server_name] = str(e) or type(e).__name__
+                    self.logger.error(f"Error launching server", {"name": server_name, "error": self.failed_servers[server_name]})
+        
+        await asyncio.gather(*(launch(name, path) for name, path in self.server_paths.items()))
+        
+        if self.failed_servers and len(self.failed_servers) == len(self.server_paths):
+            raise RuntimeError(f"All MCP servers failed to launch: {self.failed_servers}")
+        if self.failed_servers:
+            self.logger.warning("Some servers failed to launch", {"failed": self.failed_servers})
+        else:
+            self.logger.info("All servers launched successfully")
+            
+    async def _launch_server(self, server_name: str, script_path: str) -> None:
+        """
+        Launch a single server and record how long it took to become ready.
+        
+        Args:
+            server_name: Name of the server
+            script_path: Path to the server script, or URL of a running server
+        """
+        self.logger.debug(f"Launching server", {"name": server_name})
+        start_time = time.perf_counter()
+        with tracing.span("server_launch", "mcp", server=server_name, script=os.path.basename(script_path)):
+            await self.client_pool.add_client(server_name, script_path, timeout=self.startup_timeout)
+        self.startup_times[server_name] = time.perf_counter() - start_time
+        self.logger.debug(f"Server ready", {"name": server_name, "seconds": round(self.startup_times[server_name], 3)})
+        
+    def get_server_health(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the supervision counters of the launched servers.
+        
+        Returns:
+            Restart, call, timeout and latency counters by server name,
+            empty unless ``mcp.supervise`` is enabled
+        """
+        return self.client_pool.get_health()
         
     async def shutdown(self) -> None:
         """
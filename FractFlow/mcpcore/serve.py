@@ -0,0 +1,157 @@
+"""
+MCP network server launcher.
+
+Runs tool server scripts as long-lived network services, so that many
+agents connect to one server process per tool instead of each spawning
+its own copy over stdio.
+
+Usage:
+    python -m FractFlow.mcpcore.serve tools/core/file_io/file_io_mcp.py --port 9001
+    python -m FractFlow.mcpcore.serve a_mcp.py b_mcp.py --port 9001 --transport sse
+
+With several scripts each one runs in its own process on consecutive
+ports. The printed URLs can be used in place of script paths in
+Agent.add_tool() and ToolTemplate.TOOLS.
+"""
+
+import os
+import sys
+import time
+import importlib.util
+import signal
+import argparse
+import subprocess
+from typing import List, Tuple
+
+from mcp.server.fastmcp import FastMCP
+
+TRANSPORTS = ('streamable-http', 'sse')
+
+# Module name the script is executed under, so its `__main__` block does not start a stdio server
+_RUN_NAME = '__mcp_serve__'
+
+def load_server(script_path: str) -> FastMCP:
+    """
+    Execute a tool server script and find its MCP server.
+
+    Scripts creating a FastMCP instance at module level and ToolTemplate
+    subclasses are both supported.
+
+    Args:
+        script_path: Path to the server script
+
+    Returns:
+        The script's MCP server
+
+    Raises:
+        ValueError: If the script defines no MCP server
+    """
+    script_path = os.path.abspath(script_path)
+    # Like `python script.py`, let the script import modules next to it
+    sys.path.insert(0, os.path.dirname(script_path))
+    # Registered in sys.modules, ToolTemplate looks up its script's __file__ there
+    spec = importlib.util.spec_from_file_location(_RUN_NAME, script_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[_RUN_NAME] = module
+    spec.loader.exec_module(module)
+    namespace = vars(module)
+
+    for value in namespace.values():
+        if isinstance(value, FastMCP):
+            return value
+
+    from ..tool_template import ToolTemplate
+    for value in namespace.values():
+        if isinstance(value, type) and issubclass(value, ToolTemplate) \
+                and value is not ToolTemplate and value.__module__ == _RUN_NAME:
+            value._validate_configuration()
+            return value._get_mcp_server()
+
+    raise ValueError(f"No FastMCP server or ToolTemplate subclass found in {script_path}")
+
+def server_url(server: FastMCP, transport: str) -> str:
+    """
+    Get the URL agents use to reach a server.
+
+    Args:
+        server: The configured MCP server
+        transport: 'streamable-http' or 'sse'
+
+    Returns:
+        Endpoint URL
+    """
+    path = server.settings.sse_path if transport == 'sse' else server.settings.streamable_http_path
+    return f"http://{server.settings.host}:{server.settings.port}{path}"
+
+def serve(script_path: str, transport: str = 'streamable-http', host: str = '127.0.0.1', port: int = 8000) -> None:
+    """
+    Serve one tool server script until interrupted.
+
+    Args:
+        script_path: Path to the server script
+        transport: 'streamable-http' or 'sse'
+        host: Interface to listen on
+        port: Port to listen on
+    """
+    server = load_server(script_path)
+    server.settings.host = host
+    server.settings.port = port
+    print(f"{os.path.basename(script_path)}: {server_url(server, transport)}", flush=True)
+    server.run(transport=transport)
+
+def serve_all(script_paths: List[str], transport: str = 'streamable-http',
+              host: str = '127.0.0.1', port: int = 8000) -> None:
+    """
+    Serve several tool server scripts, each in its own process on consecutive ports.
+
+    The servers are stopped together when one of them exits, on interrupt
+    or on SIGTERM.
+
+    Args:
+        script_paths: Paths to the server scripts
+        transport: 'streamable-http' or 'sse'
+        host: Interface to listen on
+        port: Port of the first server
+    """
+    processes: List[Tuple[str, subprocess.Popen]] = []
+    # Turn SIGTERM into SystemExit so the servers are stopped instead of orphaned
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        for offset, script_path in enumerate(script_paths):
+            command = [sys.executable, '-m', 'FractFlow.mcpcore.serve', script_path,
+                       '--transport', transport, '--host', host, '--port', str(port + offset)]
+            processes.append((script_path, subprocess.Popen(command)))
+
+        while all(process.poll() is None for _, process in processes):
+            time.sleep(0.5)
+        for script_path, process in processes:
+            if process.poll() is not None:
+                print(f"{script_path} exited with code {process.returncode}", file=sys.stderr)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for _, process in processes:
+            if process.poll() is None:
+                process.terminate()
+        for _, process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description='Run MCP tool server scripts as shared network services')
+    parser.add_argument('scripts', nargs='+', help='Tool server scripts to serve')
+    parser.add_argument('--transport', choices=TRANSPORTS, default='streamable-http', help='MCP network transport')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Interface to listen on')
+    parser.add_argument('--port', type=int, default=8000, help='Port of the first server')
+    args = parser.parse_args()
+
+    if len(args.scripts) == 1:
+        serve(args.scripts[0], args.transport, args.host, args.port)
+    else:
+        serve_all(args.scripts, args.transport, args.host, args.port)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Shared MCP server pool implementation.
+
+Lets several client pools in one process share a single server process per
+server script instead of each spawning its own copy, and a single session per
+network server URL.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from .connection import MCPConnection, is_remote_server
+
+logger = logging.getLogger(__name__)
+
+# 进程级共享实例
+_shared_instance = None
+
+class SharedServerPool:
+    """
+    Reference-counted pool of MCP server connections keyed by script path or URL.
+
+    The first client pool that needs a server starts it; later ones reuse
+    the same session, which multiplexes their requests. The server is
+    stopped when the last client pool releases it.
+    """
+
+    def __init__(self):
+        """Initialize the shared server pool."""
+        self._connections: Dict[str, MCPConnection] = {}
+        self._ref_counts: Dict[str, int] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    @staticmethod
+    def _key(server_script_path: str) -> str:
+        """Normalize a script path so that equivalent paths share a server."""
+        if is_remote_server(server_script_path):
+            return server_script_path
+        return os.path.realpath(server_script_path)
+
+    async def acquire(self, server_script_path: str, timeout: Optional[float] = None,
+                      zygote: Optional[Any] = None) -> MCPConnection:
+        """
+        Get a connection to the server, starting it if it is not running yet.
+
+        Args:
+            server_script_path: Path to the server script, or URL of a running server
+            timeout: Optional startup timeout in seconds
+            zygote: Optional Zygote to fork the server from if it has to be started
+
+        Returns:
+            The shared connection
+
+        Raises:
+            Exception: If the server cannot be started
+        """
+        key = self._key(server_script_path)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+
+        async with lock:
+            connection = self._connections.get(key)
+            if connection is None or not connection.is_open:
+                connection = MCPConnection(key if is_remote_server(key) else os.path.basename(key), key, zygote=zygote)
+                await connection.open(timeout)
+                self._connections[key] = connection
+                self._ref_counts[key] = 0
+                logger.info(f"Started shared server '{key}' in {connection.startup_time:.2f}s")
+
+            self._ref_counts[key] += 1
+            return connection
+
+    async def release(self, connection: MCPConnection) -> None:
+        """
+        Release a connection obtained from acquire().
+
+        Args:
+            connection: The shared connection
+        """
+        key = self._key(connection.server_script_path)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+
+        async with lock:
+            if self._connections.get(key) is not connection:
+                # The connection was already replaced, just make sure it is closed
+                await connection.close()
+                return
+
+            self._ref_counts[key] -= 1
+            if self._ref_counts[key] <= 0:
+                del self._connections[key]
+                del self._ref_counts[key]
+                await connection.close()
+                logger.info(f"Stopped shared server '{key}'")
+
+    def get_ref_count(self, server_script_path: str) -> int:
+        """
+        Get the number of client pools using a server.
+
+        Args:
+            server_script_path: Path to the server script
+
+        Returns:
+            Number of active references
+        """
+        return self._ref_counts.get(self._key(server_script_path), 0)
+
+    async def close_all(self) -> None:
+        """Stop every shared server regardless of outstanding references."""
+        connections = list(self._connections.values())
+        self._connections.clear()
+        self._ref_counts.clear()
+        await asyncio.gather(*(connection.close() for connection in connections), return_exceptions=True)
+
+def get_shared_server_pool() -> SharedServerPool:
+    """
+    Get the process-wide shared server pool.
+
+    Returns:
+        The global shared server pool instance
+    """
+    global _shared_instance
+    if _shared_instance is None:
+        _shared_instance = SharedServerPool()
+    return _shared_instance
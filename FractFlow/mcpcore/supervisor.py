@@ -0,0 +1,422 @@
+"""
+MCP server supervision.
+
+Keeps tool servers usable when they crash or stop responding. A crashed
+stdio server does not fail the requests sent to it, they wait forever, so
+every supervised call gets a deadline, servers are pinged periodically and
+after failures, dead or wedged servers are respawned with exponential
+backoff, and a circuit breaker fails calls fast while a server keeps
+failing.
+"""
+
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set, TypeVar
+
+from mcp.client.session import ClientSession
+
+from .connection import MCPConnection
+from ..infra.error_handling import ClientError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+class CircuitOpenError(ClientError):
+    """Exception raised when a call is rejected because the server's circuit is open."""
+    pass
+
+class CircuitBreaker:
+    """
+    Fails calls fast after repeated consecutive failures.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls are rejected. Once ``reset_timeout`` seconds have passed it is
+    half-open and lets a single trial call through: success closes the
+    circuit, failure opens it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a trial call
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.open_count = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        """Current state: 'closed', 'open' or 'half_open'."""
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        """
+        Check whether a call may go through, reserving the trial call when half-open.
+
+        Returns:
+            True if the call may be made
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        """Record a successful call, closing the circuit."""
+        self.consecutive_failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Record a failed call, opening the circuit at the threshold or after a failed trial."""
+        self.consecutive_failures += 1
+        if self._trial_in_flight or (self._opened_at is None and self.consecutive_failures >= self.failure_threshold):
+            self._opened_at = time.monotonic()
+            self.open_count += 1
+        self._trial_in_flight = False
+
+    def release(self) -> None:
+        """Give back the trial call reservation of a call that was cancelled."""
+        self._trial_in_flight = False
+
+class LatencyStats:
+    """Call count and latency percentiles over the most recent calls."""
+
+    def __init__(self, window: int = 256):
+        """
+        Initialize the statistics.
+
+        Args:
+            window: Number of recent latencies the percentiles are computed from
+        """
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        """
+        Record the latency of one call.
+
+        Args:
+            seconds: Call duration
+        """
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self._recent.append(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the current statistics.
+
+        Returns:
+            Count, mean, p50, p95 and max in seconds
+        """
+        if not self.count:
+            return {'count': 0}
+        recent = sorted(self._recent)
+        percentile = lambda q: recent[min(len(recent) - 1, int(q * len(recent)))]
+        return {
+            'count': self.count,
+            'mean_s': round(self.total / self.count, 4),
+            'p50_s': round(percentile(0.5), 4),
+            'p95_s': round(percentile(0.95), 4),
+            'max_s': round(self.max, 4)
+        }
+
+class ServerSupervisor:
+    """
+    Supervises one MCP connection.
+
+    Calls made through call() get a deadline and feed the circuit breaker
+    and the latency statistics. A background task pings the server every
+    ``ping_interval`` seconds and right after a failed call, and restarts
+    the connection when the server is gone or does not answer. Restarts
+    back off exponentially while the server keeps failing.
+    """
+
+    def __init__(self, connection: MCPConnection,
+                 ping_interval: Optional[float] = 30.0,
+                 ping_timeout: float = 10.0,
+                 call_timeout: Optional[float] = None,
+                 tool_timeouts: Optional[Dict[str, float]] = None,
+                 failure_threshold: int = 5,
+                 reset_timeout: float = 30.0,
+                 backoff_base: float = 1.0,
+                 backoff_max: float = 60.0,
+                 max_restarts: Optional[int] = None,
+                 startup_timeout: Optional[float] = 60.0):
+        """
+        Initialize the supervisor.
+
+        Args:
+            connection: The open connection to supervise
+            ping_interval: Seconds between health checks, None to only check after failures
+            ping_timeout: Seconds a ping may take before the server counts as wedged
+            call_timeout: Default deadline of a tool call in seconds, None for no deadline
+            tool_timeouts: Deadlines of individual tools, overriding call_timeout
+            failure_threshold: Consecutive failed calls that open the circuit
+            reset_timeout: Seconds the circuit stays open before a trial call
+            backoff_base: Delay before the second consecutive restart, doubled for each further one
+            backoff_max: Upper bound of the restart delay
+            max_restarts: Consecutive restarts without a successful call after
+                          which the server is given up, None for no limit
+            startup_timeout: Startup timeout of a restarted server in seconds; a
+                             server exiting during startup is only noticed through it
+        """
+        self.connection = connection
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.call_timeout = call_timeout
+        self.tool_timeouts = dict(tool_timeouts or {})
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_restarts = max_restarts
+        self.startup_timeout = startup_timeout
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+        self.counters: Dict[str, int] = {
+            'calls': 0, 'failures': 0, 'timeouts': 0, 'rejected': 0,
+            'pings': 0, 'ping_failures': 0, 'restarts': 0, 'restart_failures': 0
+        }
+        self.latency = LatencyStats()
+        self.tool_latency: Dict[str, LatencyStats] = {}
+        self.gave_up = False
+
+        # Restarts since the last successful call, drives the backoff
+        self._consecutive_restarts = 0
+        # Requests in flight, failed when their server is found dead
+        self._in_flight: Set[asyncio.Task] = set()
+        self._lost: Set[asyncio.Task] = set()
+        self._restarting = False
+        self._wake_event: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def name(self) -> str:
+        """Name of the supervised connection."""
+        return self.connection.name
+
+    def start(self) -> None:
+        """Start the health check task."""
+        if self._task is None:
+            self._wake_event = asyncio.Event()
+            self._task = asyncio.create_task(self._monitor())
+
+    async def stop(self) -> None:
+        """Stop the health check task, leaving the connection as it is."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    def get_timeout(self, tool_name: str) -> Optional[float]:
+        """
+        Get the deadline of a tool call.
+
+        Args:
+            tool_name: Name of the tool
+
+        Returns:
+            Seconds, or None for no deadline
+        """
+        return self.tool_timeouts.get(tool_name, self.call_timeout)
+
+    async def call(self, tool_name: str, request: Callable[[ClientSession], Awaitable[T]]) -> T:
+        """
+        Send a request to the server under supervision.
+
+        Args:
+            tool_name: Name of the tool, for its deadline and statistics
+            request: Coroutine function sending the request on a session
+
+        Returns:
+            The request's result
+
+        Raises:
+            CircuitOpenError: If the server's circuit is open
+            ClientError: If the server is being restarted or was given up
+            TimeoutError: If the call misses its deadline
+            Exception: If the call fails
+        """
+        session = self.connection.session
+        if session is None or self.gave_up:
+            self.counters['rejected'] += 1
+            if self.gave_up:
+                raise ClientError(f"MCP server '{self.name}' was given up after {self._consecutive_restarts} failed restarts")
+            raise ClientError(f"MCP server '{self.name}' is restarting")
+        if not self.breaker.allow():
+            self.counters['rejected'] += 1
+            raise CircuitOpenError(f"Circuit for MCP server '{self.name}' is open after "
+                                   f"{self.breaker.consecutive_failures} consecutive failures")
+
+        self.counters['calls'] += 1
+        timeout = self.get_timeout(tool_name)
+        task = asyncio.ensure_future(request(session))
+        self._in_flight.add(task)
+        start_time = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(task, timeout or None)
+        except asyncio.TimeoutError:
+            self.counters['timeouts'] += 1
+            self._record_failure()
+            raise TimeoutError(f"Tool {tool_name} on MCP server '{self.name}' did not answer within {timeout} seconds") from None
+        except asyncio.CancelledError:
+            if task not in self._lost:
+                self.breaker.release()
+                raise
+            self.counters['failures'] += 1
+            self.breaker.record_failure()
+            raise ClientError(f"MCP server '{self.name}' was lost during a call to {tool_name}") from None
+        except Exception:
+            self.counters['failures'] += 1
+            self._record_failure()
+            raise
+        finally:
+            self._in_flight.discard(task)
+            self._lost.discard(task)
+
+        # Tool errors are reported in the result, so any response means the server is healthy
+        elapsed = time.perf_counter() - start_time
+        self.breaker.record_success()
+        self._consecutive_restarts = 0
+        self.latency.record(elapsed)
+        self.tool_latency.setdefault(tool_name, LatencyStats()).record(elapsed)
+        return result
+
+    def _record_failure(self) -> None:
+        """Count a failed call and check the server's health right away."""
+        self.breaker.record_failure()
+        if self._wake_event is not None:
+            self._wake_event.set()
+
+    async def check(self) -> bool:
+        """
+        Ping the server.
+
+        Servers run synchronous tools on their event loop, so a server busy
+        with a call cannot answer pings either. While calls are in flight a
+        ping timeout is therefore not taken as a sign of a wedged server;
+        those calls are covered by their own deadlines instead.
+
+        Returns:
+            True if the connection is open and the server answered in time or is busy
+        """
+        session = self.connection.session
+        if session is None or not self.connection.is_open:
+            return False
+        self.counters['pings'] += 1
+        try:
+            await asyncio.wait_for(session.send_ping(), self.ping_timeout)
+            return True
+        except asyncio.TimeoutError:
+            if self._in_flight:
+                return True
+            self.counters['ping_failures'] += 1
+            logger.warning(f"MCP server '{self.name}' did not answer a ping within {self.ping_timeout} seconds")
+            return False
+        except Exception as e:
+            self.counters['ping_failures'] += 1
+            logger.warning(f"Ping to MCP server '{self.name}' failed: {e!r}")
+            return False
+
+    async def _monitor(self) -> None:
+        """Check the server periodically and after failures, restarting it when unhealthy."""
+        while True:
+            try:
+                await asyncio.wait_for(self._wake_event.wait(), self.ping_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake_event.clear()
+            if self.gave_up or await self.check():
+                continue
+            # A dead server never answers the requests it was sent
+            for task in self._in_flight:
+                self._lost.add(task)
+                task.cancel()
+            try:
+                await self.restart()
+            except Exception as e:
+                logger.error(f"Error restarting MCP server '{self.name}': {e}")
+
+    async def restart(self) -> None:
+        """
+        Restart the server, retrying with exponential backoff until it starts.
+
+        Gives up after ``max_restarts`` consecutive restarts without a
+        successful call in between; calling restart() directly afterwards
+        starts counting again.
+        """
+        if self._restarting:
+            return
+        if self.gave_up:
+            self.gave_up = False
+            self._consecutive_restarts = 0
+
+        self._restarting = True
+        try:
+            while True:
+                if self.max_restarts is not None and self._consecutive_restarts >= self.max_restarts:
+                    self.gave_up = True
+                    logger.error(f"Giving up on MCP server '{self.name}' after {self._consecutive_restarts} restarts")
+                    return
+                if self._consecutive_restarts:
+                    delay = min(self.backoff_max, self.backoff_base * 2 ** (self._consecutive_restarts - 1))
+                    logger.info(f"Restarting MCP server '{self.name}' in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                self._consecutive_restarts += 1
+
+                generation = self.connection.generation
+                try:
+                    if await self.connection.restart(self.startup_timeout, generation):
+                        self.counters['restarts'] += 1
+                    return
+                except Exception as e:
+                    self.counters['restart_failures'] += 1
+                    logger.error(f"Restart of MCP server '{self.name}' failed: {e}")
+        finally:
+            self._restarting = False
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the supervision counters.
+
+        Returns:
+            Server state, circuit state, call, ping and restart counters, and
+            latency statistics overall and per tool
+        """
+        if self.gave_up:
+            state = 'given_up'
+        elif self._restarting or self.connection.session is None:
+            state = 'restarting'
+        else:
+            state = 'running'
+        return {
+            'state': state,
+            'circuit': self.breaker.state,
+            'circuit_opened': self.breaker.open_count,
+            **self.counters,
+            'latency': self.latency.snapshot(),
+            'tools': {name: stats.snapshot() for name, stats in self.tool_latency.items()}
+        }
@@ -0,0 +1,152 @@
+"""
+MCP tool registry implementation.
+
+Caches the tool schemas advertised by each MCP client so that they are
+fetched once at launch instead of on every query.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from .tool_loader import MCPToolLoader
+
+class ToolRegistry:
+    """
+    In-memory registry of the tools provided by each MCP client.
+
+    Tools are recorded when a client is added and only fetched again after
+    the client is invalidated, either by a ``tools/list_changed``
+    notification from the server or by an explicit refresh. Values derived
+    from the tool list, such as the standard tool schemas or the tool name
+    mapping text, are memoized until the next change.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._tools: Dict[str, List[Any]] = {}  # Maps client_name to MCP tool objects
+        self._stale: Set[str] = set()
+        self._memo: Dict[str, Any] = {}
+        self.version = 0
+
+    def set_tools(self, client_name: str, tools: List[Any]) -> None:
+        """
+        Record the tools advertised by a client.
+
+        Args:
+            client_name: Name of the client
+            tools: MCP tool objects returned by list_tools
+        """
+        self._tools[client_name] = list(tools)
+        self._stale.discard(client_name)
+        self._changed()
+
+    def remove_client(self, client_name: str) -> None:
+        """
+        Forget the tools of a client.
+
+        Args:
+            client_name: Name of the client
+        """
+        self._tools.pop(client_name, None)
+        self._stale.discard(client_name)
+        self._changed()
+
+    def clear(self) -> None:
+        """Forget all clients and their tools."""
+        self._tools.clear()
+        self._stale.clear()
+        self._changed()
+
+    def invalidate(self, client_name: Optional[str] = None) -> None:
+        """
+        Mark the tools of a client, or of every client, as out of date.
+
+        Args:
+            client_name: Name of the client, or None for all clients
+        """
+        if client_name is None:
+            self._stale.update(self._tools.keys())
+        elif client_name in self._tools:
+            self._stale.add(client_name)
+        self._changed()
+
+    def get_stale_clients(self) -> List[str]:
+        """
+        Get the clients whose tools need to be fetched again.
+
+        Returns:
+            List of client names
+        """
+        return [name for name in self._tools if name in self._stale]
+
+    def get_client_tools(self, client_name: str) -> List[Any]:
+        """
+        Get the MCP tool objects of a client.
+
+        Args:
+            client_name: Name of the client
+
+        Returns:
+            List of MCP tool objects, empty if the client is unknown
+        """
+        return self._tools.get(client_name, [])
+
+    def get_tool(self, tool_name: str) -> Optional[Any]:
+        """
+        Find the MCP tool object with the given name.
+
+        Args:
+            tool_name: Name of the tool
+
+        Returns:
+            The MCP tool object, or None if no client provides it
+        """
+        return self.memoize("tools_by_name", lambda: {
+            tool.name: tool for tools in self._tools.values() for tool in tools
+        }).get(tool_name)
+
+    def get_standard_tools(self) -> List[Dict[str, Any]]:
+        """
+        Get the tools of all clients in the standardized format.
+
+        Returns:
+            List of tool schemas in the format produced by MCPToolLoader
+        """
+        tools = self.memoize("standard_tools", lambda: [
+            schema for client_tools in self._tools.values()
+            for schema in MCPToolLoader.convert_to_standard_format(client_tools)
+        ])
+        return list(tools)
+
+    def get_function_names(self, client_name: str) -> List[str]:
+        """
+        Get the function names provided by a client.
+
+        Args:
+            client_name: Name of the client
+
+        Returns:
+            List of function names
+        """
+        return [tool.name for tool in self.get_client_tools(client_name)]
+
+    def memoize(self, key: str, builder: Callable[[], Any]) -> Any:
+        """
+        Get a value derived from the tool list, building it if needed.
+
+        Memoized values are dropped whenever the registry changes.
+
+        Args:
+            key: Cache key for the value
+            builder: Function that builds the value
+
+        Returns:
+            The memoized value
+        """
+        if key not in self._memo:
+            self._memo[key] = builder()
+        return self._memo[key]
+
+    def _changed(self) -> None:
+        """Drop memoized values after the tool list changed."""
+        self._memo.clear()
+        self.version += 1
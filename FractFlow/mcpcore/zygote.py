@@ -0,0 +1,444 @@
+"""
+Zygote fork-server for MCP tool servers.
+
+Starting a tool server script normally means a fresh interpreter that
+imports FractFlow, mcp, openai and friends before it can answer
+``initialize``. The zygote is a long-lived helper process that imports
+those modules once and then forks a child per tool server. The child gets
+the client's pipe ends as its stdin, stdout and stderr, passed over a Unix
+socket with SCM_RIGHTS, and runs the script as ``__main__``, so the server
+speaks the same stdio protocol as a spawned one.
+
+The zygote only works on platforms with fork() and fd passing; callers
+should check zygote_supported() and fall back to spawning.
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import random
+import select
+import signal
+import socket
+import asyncio
+import logging
+import tempfile
+import threading
+import importlib
+import subprocess
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Modules most tool server scripts import before serving
+DEFAULT_PRELOAD = [
+    'mcp.server.fastmcp',
+    'mcp.client.stdio',
+    'openai',
+    'loguru',
+    'dotenv',
+    'FractFlow.tool_template',
+]
+
+# Largest spawn request, mostly the child environment
+_MAX_REQUEST_BYTES = 1 << 20
+
+def _stream_fd(stream: Any, default: int) -> int:
+    """Get the file descriptor of a stream, or a default for streams without one."""
+    try:
+        return stream.fileno()
+    except (AttributeError, OSError, ValueError):
+        # e.g. io.UnsupportedOperation for captured output
+        return default
+
+def zygote_supported() -> bool:
+    """
+    Check whether tool servers can be forked from a zygote on this platform.
+
+    Returns:
+        True if fork(), Unix sockets and fd passing are available
+    """
+    return hasattr(os, 'fork') and hasattr(socket, 'AF_UNIX') and hasattr(socket, 'send_fds')
+
+class Zygote:
+    """
+    Client side of a zygote process.
+
+    The zygote is started on first use and stops when this process exits;
+    it also exits by itself when its parent goes away. If it dies, the next
+    spawn starts a new one.
+    """
+
+    def __init__(self, preload: Optional[Sequence[str]] = None):
+        """
+        Initialize the zygote client.
+
+        Args:
+            preload: Modules the zygote imports before forking, None uses DEFAULT_PRELOAD
+        """
+        self.preload = list(DEFAULT_PRELOAD if preload is None else preload)
+        self.startup_time: Optional[float] = None
+        self.preload_times: Dict[str, float] = {}
+
+        self._process: Optional[subprocess.Popen] = None
+        self._socket_dir: Optional[str] = None
+        self._socket_path: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the zygote process is alive and accepting requests."""
+        return self._socket_path is not None and self._process is not None and self._process.poll() is None
+
+    def start(self) -> str:
+        """
+        Start the zygote process, if needed, and wait until its modules are loaded.
+
+        Blocks the calling thread; spawn() runs it in a worker thread.
+
+        Returns:
+            Path of the zygote's socket
+
+        Raises:
+            RuntimeError: If the zygote exits before it is ready
+        """
+        with self._lock:
+            if self.is_running:
+                return self._socket_path
+            if self._process is not None:
+                logger.warning(f"MCP zygote exited with code {self._process.returncode}, restarting it")
+            self._cleanup()
+
+            self._socket_dir = tempfile.mkdtemp(prefix='fractflow-zygote-')
+            socket_path = os.path.join(self._socket_dir, 'zygote.sock')
+            start_time = time.perf_counter()
+            # stdin stays open as a lifeline: the zygote exits when it reads EOF
+            self._process = subprocess.Popen(
+                [sys.executable, '-m', __name__, '--socket', socket_path, '--preload', ','.join(self.preload)],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE
+            )
+            line = self._process.stdout.readline()
+            if not line:
+                code = self._process.wait()
+                self._process = None
+                raise RuntimeError(f"MCP zygote exited with code {code} before it was ready")
+
+            ready = json.loads(line)
+            self._socket_path = socket_path
+            self.startup_time = time.perf_counter() - start_time
+            self.preload_times = ready.get('preload_times', {})
+            logger.info(f"Started MCP zygote (pid {self._process.pid}) in {self.startup_time:.2f}s, "
+                        f"preloaded {len(self.preload_times)} modules")
+            if ready.get('failed'):
+                logger.warning(f"MCP zygote could not preload: {ready['failed']}")
+            return socket_path
+
+    def _spawn_blocking(self, request: Dict[str, Any], fds: List[int]) -> int:
+        """Send a spawn request with the child's stdio fds and wait for its pid."""
+        socket_path = self.start()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET) as conn:
+            conn.connect(socket_path)
+            socket.send_fds(conn, [json.dumps(request).encode('utf-8')], fds)
+            reply = json.loads(conn.recv(65536) or b'{"error": "zygote closed the connection"}')
+        if 'error' in reply:
+            raise RuntimeError(f"MCP zygote failed to start {request['argv'][0]}: {reply['error']}")
+        return reply['pid']
+
+    async def spawn(self, argv: List[str], env: Dict[str, str], cwd: Optional[str],
+                    stdin_fd: int, stdout_fd: int, stderr_fd: int) -> int:
+        """
+        Fork a child running a Python script.
+
+        Args:
+            argv: Script path followed by its arguments
+            env: Complete environment of the child
+            cwd: Working directory of the child, None keeps the zygote's
+            stdin_fd: File descriptor the child reads as stdin
+            stdout_fd: File descriptor the child writes as stdout
+            stderr_fd: File descriptor the child writes as stderr
+
+        Returns:
+            Process id of the child
+
+        Raises:
+            RuntimeError: If the zygote cannot be started or fails to fork
+        """
+        request = {'argv': argv, 'env': env, 'cwd': cwd}
+        return await asyncio.to_thread(self._spawn_blocking, request, [stdin_fd, stdout_fd, stderr_fd])
+
+    def _cleanup(self) -> None:
+        """Remove the socket of a previous zygote."""
+        if self._socket_dir is not None:
+            try:
+                for name in os.listdir(self._socket_dir):
+                    os.unlink(os.path.join(self._socket_dir, name))
+                os.rmdir(self._socket_dir)
+            except OSError:
+                pass
+        self._socket_dir = None
+        self._socket_path = None
+
+    def close(self) -> None:
+        """Stop the zygote. Children that are already running are not affected."""
+        with self._lock:
+            process, self._process = self._process, None
+            if process is not None and process.poll() is None:
+                # Closing the lifeline lets the zygote exit on its own
+                process.stdin.close()
+                try:
+                    process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
+            self._cleanup()
+
+_zygotes: Dict[Tuple[str, ...], Zygote] = {}
+_zygotes_lock = threading.Lock()
+
+def get_zygote(preload: Optional[Sequence[str]] = None) -> Zygote:
+    """
+    Get the process-wide zygote for a preload list.
+
+    The zygote process itself is only started by the first spawn.
+
+    Args:
+        preload: Modules to preload, None uses DEFAULT_PRELOAD
+
+    Returns:
+        The shared zygote client
+    """
+    key = tuple(DEFAULT_PRELOAD if preload is None else preload)
+    with _zygotes_lock:
+        zygote = _zygotes.get(key)
+        if zygote is None:
+            zygote = _zygotes[key] = Zygote(key)
+        return zygote
+
+@atexit.register
+def _close_zygotes() -> None:
+    for zygote in list(_zygotes.values()):
+        zygote.close()
+
+@asynccontextmanager
+async def zygote_client(zygote: Zygote, server: Any, errlog=sys.stderr):
+    """
+    Client transport for tool servers forked from a zygote.
+
+    A drop-in replacement for mcp.client.stdio.stdio_client, for servers
+    whose command is the Python interpreter running a script.
+
+    Args:
+        zygote: Zygote to fork the server from
+        server: StdioServerParameters of the server
+        errlog: Stream the server's stderr goes to
+
+    Yields:
+        (read_stream, write_stream) for a ClientSession
+    """
+    import anyio
+    import anyio.lowlevel
+    import mcp.types as types
+    from mcp.client.stdio import get_default_environment
+    from mcp.shared.message import SessionMessage
+
+    read_stream_writer, read_stream = anyio.create_memory_object_stream(0)
+    write_stream, write_stream_reader = anyio.create_memory_object_stream(0)
+
+    env = {**get_default_environment(), **server.env} if server.env is not None else get_default_environment()
+    stdin_read, stdin_write = os.pipe()
+    stdout_read, stdout_write = os.pipe()
+    try:
+        start_time = time.perf_counter()
+        pid = await zygote.spawn(list(server.args), env, str(server.cwd) if server.cwd else None,
+                                 stdin_read, stdout_write, _stream_fd(errlog, 2))
+        logger.debug(f"Forked MCP server {server.args[0]} (pid {pid}) in "
+                     f"{(time.perf_counter() - start_time) * 1000:.1f}ms")
+    except BaseException:
+        for fd in (stdin_write, stdout_read):
+            os.close(fd)
+        raise
+    finally:
+        # The child holds its own copies now
+        os.close(stdin_read)
+        os.close(stdout_write)
+
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    read_transport, _ = await loop.connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader), os.fdopen(stdout_read, 'rb', 0))
+    transport, protocol = await loop.connect_write_pipe(asyncio.streams.FlowControlMixin, os.fdopen(stdin_write, 'wb', 0))
+    writer = asyncio.StreamWriter(transport, protocol, None, loop)
+
+    async def stdout_reader():
+        try:
+            async with read_stream_writer:
+                buffer = b""
+                while True:
+                    chunk = await reader.read(65536)
+                    if not chunk:
+                        break
+                    lines = (buffer + chunk).split(b"\n")
+                    buffer = lines.pop()
+                    for line in lines:
+                        try:
+                            message = types.JSONRPCMessage.model_validate_json(line.decode(server.encoding, server.encoding_error_handler))
+                        except Exception as exc:
+                            await read_stream_writer.send(exc)
+                            continue
+                        await read_stream_writer.send(SessionMessage(message))
+        except anyio.ClosedResourceError:
+            await anyio.lowlevel.checkpoint()
+
+    async def stdin_writer():
+        try:
+            async with write_stream_reader:
+                async for session_message in write_stream_reader:
+                    data = session_message.message.model_dump_json(by_alias=True, exclude_none=True)
+                    writer.write((data + "\n").encode(server.encoding, server.encoding_error_handler))
+                    await writer.drain()
+        except (anyio.ClosedResourceError, ConnectionError):
+            await anyio.lowlevel.checkpoint()
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(stdout_reader)
+        tg.start_soon(stdin_writer)
+        try:
+            yield read_stream, write_stream
+        finally:
+            # Like stdio_client, terminate the server instead of waiting for it
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+            writer.close()
+            read_transport.close()
+            await read_stream.aclose()
+            await write_stream.aclose()
+            tg.cancel_scope.cancel()
+
+# ===== Zygote process =====
+
+def _preload(modules: List[str]) -> Tuple[Dict[str, float], Dict[str, str]]:
+    """Import modules, returning their import times and the ones that failed."""
+    times, failed = {}, {}
+    for name in modules:
+        start_time = time.perf_counter()
+        try:
+            importlib.import_module(name)
+            times[name] = round(time.perf_counter() - start_time, 3)
+        except Exception as e:
+            failed[name] = str(e) or type(e).__name__
+    return times, failed
+
+def _run_child(request: Dict[str, Any], fds: List[int]) -> None:
+    """Become the tool server described by a spawn request. Never returns."""
+    code = 1
+    try:
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        for target, fd in enumerate(fds):
+            os.dup2(fd, target)
+        for fd in fds:
+            if fd > 2:
+                os.close(fd)
+        # Forked children would otherwise share the zygote's random state
+        random.seed()
+
+        if request.get('cwd'):
+            os.chdir(request['cwd'])
+        os.environ.clear()
+        os.environ.update(request['env'])
+        argv = request['argv']
+        sys.argv = list(argv)
+        # Like `python script.py`
+        sys.path[0] = os.path.dirname(os.path.abspath(argv[0]))
+
+        import runpy
+        runpy.run_path(argv[0], run_name='__main__')
+        code = 0
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except BaseException:
+        import traceback
+        traceback.print_exc()
+    finally:
+        # Exit like an interpreter would, but without unwinding the zygote's stack
+        try:
+            atexit._run_exitfuncs()
+        except BaseException:
+            pass
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except Exception:
+                pass
+        os._exit(code)
+
+def _handle_request(listener: socket.socket, conn: socket.socket) -> None:
+    """Fork a child for one spawn request and report its pid."""
+    fds: List[int] = []
+    try:
+        data, fds, _, _ = socket.recv_fds(conn, _MAX_REQUEST_BYTES, 3)
+        request = json.loads(data)
+        if len(fds) != 3:
+            raise ValueError(f"expected 3 file descriptors, got {len(fds)}")
+
+        pid = os.fork()
+        if pid == 0:
+            listener.close()
+            conn.close()
+            _run_child(request, fds)
+        conn.send(json.dumps({'pid': pid}).encode('utf-8'))
+    except Exception as e:
+        try:
+            conn.send(json.dumps({'error': str(e) or type(e).__name__}).encode('utf-8'))
+        except OSError:
+            pass
+    finally:
+        for fd in fds:
+            os.close(fd)
+        conn.close()
+
+def serve(socket_path: str, preload: List[str]) -> None:
+    """
+    Run the zygote: preload modules, then fork a child per request.
+
+    Exits when stdin reaches EOF, i.e. when the parent process is gone.
+
+    Args:
+        socket_path: Path of the Unix socket to listen on
+        preload: Modules to import before forking
+    """
+    preload_times, failed = _preload(preload)
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+    listener.bind(socket_path)
+    listener.listen(64)
+    # Children are not waited for, let the kernel reap them
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+
+    sys.stdout.write(json.dumps({'pid': os.getpid(), 'preload_times': preload_times, 'failed': failed}) + "\n")
+    sys.stdout.flush()
+
+    lifeline = sys.stdin.fileno()
+    try:
+        while True:
+            readable, _, _ = select.select([listener, lifeline], [], [])
+            if lifeline in readable and not os.read(lifeline, 4096):
+                break
+            if listener in readable:
+                conn, _ = listener.accept()
+                _handle_request(listener, conn)
+    finally:
+        listener.close()
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='FractFlow MCP zygote process')
+    parser.add_argument('--socket', required=True, help='Unix socket path to listen on')
+    parser.add_argument('--preload', default='', help='Comma-separated modules to import before forking')
+    args = parser.parse_args()
+    serve(args.socket, [name for name in args.preload.split(',') if name])
@@ -0,0 +1,271 @@
+"""
+Chat completion cache.
+
+Caches chat completion responses keyed by a hash of the request, with an
+in-memory LRU in front of an optional SQLite store, so that repeated
+deterministic requests do not cost a network round-trip.
+"""
+
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from openai.types.chat import ChatCompletion
+
+from ..infra.config import ConfigManager
+from ..infra.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Caches shared by every model in the process, keyed by database path
+_caches: Dict[Optional[str], 'CompletionCache'] = {}
+_caches_lock = threading.Lock()
+
+# Request arguments that do not change the response
+_IGNORED_KEYS = {'stream', 'timeout', 'extra_headers'}
+
+class CompletionCache:
+    """
+    Two-level cache of chat completion responses.
+
+    Entries expire after a TTL. The memory level is a bounded LRU; the disk
+    level, when a path is given, is a SQLite table bounded by entry count
+    that evicts the least recently used entries first. Disk access runs in a
+    worker thread so that it does not block the event loop.
+    """
+
+    def __init__(self,
+                 path: Optional[str] = None,
+                 ttl: Optional[float] = 86400.0,
+                 max_memory_entries: int = 256,
+                 max_disk_entries: int = 10000):
+        """
+        Initialize the cache.
+
+        Args:
+            path: SQLite database file, None to keep entries in memory only
+            ttl: Seconds an entry stays valid, None for no expiry
+            max_memory_entries: Maximum number of entries kept in memory
+            max_disk_entries: Maximum number of entries kept on disk
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+
+        self._memory: 'OrderedDict[str, tuple]' = OrderedDict()  # key -> (created_at, payload)
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0
+        }
+
+        if path:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            with self._db:
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS completions ("
+                    "key TEXT PRIMARY KEY, payload TEXT NOT NULL, "
+                    "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+                )
+                self._db.execute("CREATE INDEX IF NOT EXISTS completions_accessed ON completions (accessed_at)")
+
+    @staticmethod
+    def make_key(request: Dict[str, Any], endpoint: Any = None) -> str:
+        """
+        Hash the parts of a request that determine its response.
+
+        Args:
+            request: Keyword arguments of chat.completions.create
+            endpoint: Base URL of the client sending the request, so that
+                      providers serving the same model name do not share entries
+
+        Returns:
+            Hex digest identifying the request
+        """
+        relevant = {k: v for k, v in request.items() if k not in _IGNORED_KEYS}
+        relevant['endpoint'] = str(endpoint or '').rstrip('/')
+        encoded = json.dumps(relevant, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    def _is_expired(self, created_at: float) -> bool:
+        return self.ttl is not None and time.time() - created_at > self.ttl
+
+    def _remember(self, key: str, created_at: float, payload: str) -> None:
+        """Put an entry in the memory LRU, evicting the oldest when full."""
+        self._memory[key] = (created_at, payload)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _disk_get(self, key: str) -> Optional[tuple]:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT created_at, payload FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if self._is_expired(row[0]):
+                with self._db:
+                    self._db.execute("DELETE FROM completions WHERE key = ?", (key,))
+                return None
+            with self._db:
+                self._db.execute("UPDATE completions SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            return row
+
+    def _disk_put(self, key: str, created_at: float, payload: str) -> int:
+        with self._db_lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO completions (key, payload, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, payload, created_at, created_at)
+            )
+            evicted = 0
+            if self.ttl is not None:
+                evicted += self._db.execute(
+                    "DELETE FROM completions WHERE created_at < ?", (time.time() - self.ttl,)
+                ).rowcount
+            count = self._db.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+            if count > self.max_disk_entries:
+                evicted += self._db.execute(
+                    "DELETE FROM completions WHERE key IN "
+                    "(SELECT key FROM completions ORDER BY accessed_at ASC LIMIT ?)",
+                    (count - self.max_disk_entries,)
+                ).rowcount
+            return evicted
+
+    async def get(self, key: str) -> Optional[ChatCompletion]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Key from make_key()
+
+        Returns:
+            The cached response, or None on a miss
+        """
+        entry = self._memory.get(key)
+        if entry is not None and self._is_expired(entry[0]):
+            del self._memory[key]
+            entry = None
+        if entry is not None:
+            self._memory.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return ChatCompletion.model_validate_json(entry[1])
+
+        if self._db is not None:
+            try:
+                row = await asyncio.to_thread(self._disk_get, key)
+            except sqlite3.Error as e:
+                logger.warning("Completion cache read failed", {"error": str(e)})
+                row = None
+            if row is not None:
+                self._remember(key, row[0], row[1])
+                self.stats["disk_hits"] += 1
+                return ChatCompletion.model_validate_json(row[1])
+
+        self.stats["misses"] += 1
+        return None
+
+    async def put(self, key: str, response: Any) -> None:
+        """
+        Store a response.
+
+        Args:
+            key: Key from make_key()
+            response: ChatCompletion returned by the API
+        """
+        if not isinstance(response, ChatCompletion) or not response.choices:
+            return
+        payload = response.model_dump_json()
+        created_at = time.time()
+        self._remember(key, created_at, payload)
+        self.stats["stores"] += 1
+
+        if self._db is not None:
+            try:
+                self.stats["evictions"] += await asyncio.to_thread(self._disk_put, key, created_at, payload)
+            except sqlite3.Error as e:
+                logger.warning("Completion cache write failed", {"error": str(e)})
+
+    async def get_or_create(self, request: Dict[str, Any], create: Callable[[], Awaitable[Any]],
+                            endpoint: Any = None) -> Any:
+        """
+        Return the cached response for a request, or create and cache it.
+
+        Streaming requests bypass the cache.
+
+        Args:
+            request: Keyword arguments of chat.completions.create
+            create: Coroutine function performing the request
+            endpoint: Base URL of the client sending the request, see make_key()
+
+        Returns:
+            The response
+        """
+        if request.get('stream'):
+            return await create()
+
+        key = self.make_key(request, endpoint)
+        cached = await self.get(key)
+        if cached is not None:
+            logger.debug("Completion cache hit", {"model": request.get('model'), "stats": self.stats})
+            return cached
+
+        response = await create()
+        await self.put(key, response)
+        return response
+
+    def clear(self) -> None:
+        """Remove every entry from both levels."""
+        self._memory.clear()
+        if self._db is not None:
+            with self._db_lock, self._db:
+                self._db.execute("DELETE FROM completions")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
+
+def get_completion_cache(config: ConfigManager, scope: str = 'tool_calling') -> Optional[CompletionCache]:
+    """
+    Get the shared completion cache for a kind of request, if caching is enabled for it.
+
+    Args:
+        config: Configuration manager instance
+        scope: 'tool_calling' for tool calling helpers, 'orchestrator' for the main model
+
+    Returns:
+        The cache, or None if caching is disabled for the scope
+    """
+    mode = config.get('llm_cache.mode', 'off')
+    if mode == 'off' or (mode == 'tool_calling' and scope != 'tool_calling'):
+        return None
+
+    path = config.get('llm_cache.path')
+    if path:
+        path = os.path.abspath(os.path.expanduser(path))
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = CompletionCache(
+                path=path,
+                ttl=config.get('llm_cache.ttl', 86400.0),
+                max_memory_entries=config.get('llm_cache.max_memory_entries', 256),
+                max_disk_entries=config.get('llm_cache.max_disk_entries', 10000)
+            )
+        return _caches[path]
@@ -19,12 +19,13 @@ class DeepSeekModel(OrchestratorModel):
     high-quality tool calling instructions using DeepSeek's models.
     """
     
-    def __init__(self, config: Optional[ConfigManager] = None):
+    def __init__(self, config: Optional[ConfigManager] = None, native_tool_calling: bool = False):
         """
         Initialize the DeepSeek model with DeepSeek-specific configuration.
         
         Args:
             config: Configuration manager instance to use
+            native_tool_calling: Whether to pass tool schemas as the tools parameter
         """
         if config is None:
             config = ConfigManager()
@@ -45,7 +46,8 @@ class DeepSeekModel(OrchestratorModel):
             model_name=config.get('deepseek.model', 'deepseek-reasoner'),
             provider_name='deepseek',
             history_adapter=history_adapter,
-            config=config
+            config=config,
+            native_tool_calling=native_tool_calling
         )
         
         self.logger.debug("DeepSeek model created", {
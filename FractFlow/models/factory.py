@@ -9,10 +9,40 @@ from .base_model import BaseModel
 from ..infra.config import ConfigManager
 from ..infra.logging_utils import get_logger
 
+# Providers whose OpenAI-compatible API accepts tool definitions in the tools parameter
+NATIVE_TOOL_CALLING_PROVIDERS = ('deepseek', 'openrouter', 'qwen')
+
+def use_native_tool_calling(provider: str, config: ConfigManager) -> bool:
+    """
+    Decide whether a provider's model calls tools natively or through the two-stage pipeline.
+    
+    Args:
+        provider: The AI provider of the model
+        config: Configuration manager instance to use
+        
+    Returns:
+        True to pass tool schemas as the tools parameter, False to use
+        <tool_request> tags resolved by the tool calling helper
+    """
+    mode = config.get('tool_calling.mode', 'auto')
+    if mode == 'two_stage':
+        return False
+    if mode not in ('auto', 'native'):
+        raise ValueError(f"Unsupported tool calling mode: {mode}")
+    if provider not in NATIVE_TOOL_CALLING_PROVIDERS:
+        if mode == 'native':
+            get_logger(config.get_call_path()).warning("Provider does not support native tool calling, using two-stage tool calling", {"provider": provider})
+        return False
+    return True
+
 def create_model(provider: Optional[str] = None, config: Optional[ConfigManager] = None) -> BaseModel:
     """
     Factory function to create an appropriate model based on the provider.
     
+    With more than one provider in ``routing_providers``, returns a
+    RoutingModel hedging requests across them, the first one holding the
+    conversation.
+    
     Args:
         provider: The AI provider to use (e.g., 'openai', 'deepseek', 'openrouter', 'qwen')
         config: Configuration manager instance to use
@@ -37,21 +67,38 @@ def create_model(provider: Optional[str] = None, config: Optional[ConfigManager]
     # Use provider from args, or from config, or default to openai
     provider = provider or config.get('agent.provider', 'deepseek')
     
-    logger.debug(f"Creating model", {"provider": provider})
+    providers = config.get('routing.providers') or []
+    if len(providers) > 1:
+        # Every backend must understand the same history, so tools are only
+        # called natively if all providers support it
+        native_tool_calling = all(use_native_tool_calling(name, config) for name in providers)
+        logger.debug(f"Creating routing model", {"providers": providers, "native_tool_calling": native_tool_calling})
+        from .routing_model import RoutingModel
+        # Copy before the primary pushes its own components to the call path
+        configs = [config] + [config.create_copy() for _ in providers[1:]]
+        backends = [_create_provider_model(name, backend_config, native_tool_calling, logger)
+                    for name, backend_config in zip(providers, configs)]
+        return RoutingModel(backends, config=config)
     
+    native_tool_calling = use_native_tool_calling(provider, config)
+    logger.debug(f"Creating model", {"provider": provider, "native_tool_calling": native_tool_calling})
+    return _create_provider_model(provider, config, native_tool_calling, logger)
+
+def _create_provider_model(provider: str, config: ConfigManager, native_tool_calling: bool, logger) -> BaseModel:
+    """Create the model of one provider."""
     if provider == 'deepseek':
         from .deepseek_model import DeepSeekModel
-        model = DeepSeekModel(config=config)
+        model = DeepSeekModel(config=config, native_tool_calling=native_tool_calling)
         logger.info(f"Created DeepSeek model")
         return model
     elif provider == 'qwen':
         from .qwen_model import QwenModel
-        model = QwenModel(config=config)
+        model = QwenModel(config=config, native_tool_calling=native_tool_calling)
         logger.info(f"Created Qwen model")
         return model
     elif provider == 'openrouter':
         from .openrouter_model import OpenRouterModel
-        model = OpenRouterModel(config=config)
+        model = OpenRouterModel(config=config, native_tool_calling=native_tool_calling)
         logger.info(f"Created OpenRouter model")
         return model
     elif provider == 'openai':
@@ -0,0 +1,90 @@
+"""
+Shared asynchronous OpenAI-compatible clients.
+
+Provides AsyncOpenAI clients that share one pooled httpx transport per
+event loop, so that every model and tool calling helper in a process reuses
+keep-alive connections instead of blocking the event loop on synchronous
+HTTP requests.
+"""
+
+import asyncio
+import weakref
+from typing import Dict, Optional, Tuple
+
+import httpx
+from openai import AsyncOpenAI
+
+# Connection pool limits for the shared transport
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 20
+KEEPALIVE_EXPIRY = 60.0
+
+# Request timeouts in seconds; completions can take minutes on long prompts
+REQUEST_TIMEOUT = 600.0
+CONNECT_TIMEOUT = 10.0
+
+# httpx connections are bound to the event loop that opened them, so clients are cached per loop
+_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+_openai_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[Optional[str], Optional[str]], AsyncOpenAI]]" = weakref.WeakKeyDictionary()
+
+def get_shared_http_client() -> httpx.AsyncClient:
+    """
+    Get the pooled httpx client for the running event loop.
+
+    Returns:
+        The shared httpx.AsyncClient
+
+    Raises:
+        RuntimeError: If called without a running event loop
+    """
+    loop = asyncio.get_running_loop()
+    client = _http_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=KEEPALIVE_EXPIRY
+            ),
+            timeout=httpx.Timeout(REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT)
+        )
+        _http_clients[loop] = client
+        _openai_clients.pop(loop, None)
+    return client
+
+def get_async_openai_client(base_url: Optional[str], api_key: Optional[str]) -> AsyncOpenAI:
+    """
+    Get an AsyncOpenAI client for an endpoint, backed by the shared transport.
+
+    Clients are cached per event loop and endpoint, so repeated calls are cheap.
+
+    Args:
+        base_url: The API base URL, None for the OpenAI default
+        api_key: The API key for the endpoint
+
+    Returns:
+        A configured AsyncOpenAI client
+
+    Raises:
+        RuntimeError: If called without a running event loop
+    """
+    http_client = get_shared_http_client()
+    loop = asyncio.get_running_loop()
+    clients = _openai_clients.setdefault(loop, {})
+
+    key = (base_url, api_key)
+    if key not in clients:
+        clients[key] = AsyncOpenAI(
+            base_url=base_url,
+            api_key=api_key,
+            http_client=http_client
+        )
+    return clients[key]
+
+async def close_shared_clients() -> None:
+    """Close the shared transport of the running event loop and forget its clients."""
+    loop = asyncio.get_running_loop()
+    _openai_clients.pop(loop, None)
+    client = _http_clients.pop(loop, None)
+    if client is not None:
+        await client.aclose()
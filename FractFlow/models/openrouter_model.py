@@ -20,12 +20,13 @@ class OpenRouterModel(OrchestratorModel):
     that provides access to multiple AI models.
     """
     
-    def __init__(self, config: Optional[ConfigManager] = None):
+    def __init__(self, config: Optional[ConfigManager] = None, native_tool_calling: bool = False):
         """
         Initialize the OpenRouter model with OpenRouter-specific configuration.
         
         Args:
             config: Configuration manager instance to use
+            native_tool_calling: Whether to pass tool schemas as the tools parameter
         """
         if config is None:
             config = ConfigManager()
@@ -46,7 +47,8 @@ class OpenRouterModel(OrchestratorModel):
             model_name=config.get('openrouter.model', 'openai/gpt-4o'),
             provider_name='openrouter',
             history_adapter=history_adapter,
-            config=config
+            config=config,
+            native_tool_calling=native_tool_calling
         )
         
         self.logger.debug("OpenRouter model created", {
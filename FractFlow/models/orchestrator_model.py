@@ -7,18 +7,33 @@ Provides a base implementation for models that orchestrate tools and reasoning.
 import json
 import re
 import uuid
-from typing import Dict, List, Any, Optional
-from openai import OpenAI
+import asyncio
+from typing import AsyncIterator, Dict, List, Any, Optional
+from openai import AsyncOpenAI, BadRequestError, UnprocessableEntityError
 
 from .base_model import BaseModel
+from .openai_client import get_async_openai_client
+from .completion_cache import get_completion_cache
+from . import rate_limiter
 from .toolcall_model import ToolCallFactory
 from ..infra.config import ConfigManager
 from ..infra.error_handling import LLMError, handle_error, create_error_response
 from ..conversation.base_history import ConversationHistory
+from ..conversation.compaction import HistoryCompactor, TokenCounter
 from ..infra.logging_utils import get_logger
+from ..infra import tracing, usage
 
 
 
+# Matches the tool calling instructions written by the model
+TOOL_REQUEST_PATTERN = re.compile(r"<tool_request>(.*?)</tool_request>", re.DOTALL)
+
+# A rejected request whose error mentions one of these blames the tools parameter
+TOOL_REJECTION_PATTERN = re.compile(r"\btools\b|tool_choice|tool[ _-]?(?:use|calling)|function[ _-]?call|\bfunctions\b", re.IGNORECASE)
+
+# ...unless it points at the messages, e.g. a tool result without its assistant tool call
+HISTORY_REJECTION_PATTERN = re.compile(r"messages\[|role\W+tool\b", re.IGNORECASE)
+
 # Default personality component that can be customized
 DEFAULT_PERSONALITY = "You are an intelligent assistant. You carefully analyze user requests and determine if external tools are needed."
 
@@ -32,7 +47,8 @@ class OrchestratorModel(BaseModel):
     """
     
     def __init__(self, base_url: str, api_key: str, model_name: str, provider_name: str, 
-                 history_adapter: Any, config: Optional[ConfigManager] = None):
+                 history_adapter: Any, config: Optional[ConfigManager] = None,
+                 native_tool_calling: bool = False):
         """
         Initialize the orchestrator model with provider-specific settings.
         
@@ -43,34 +59,157 @@ class OrchestratorModel(BaseModel):
             provider_name: Name of the provider for tool helper creation
             history_adapter: Provider-specific history adapter instance
             config: Configuration manager instance to use
+            native_tool_calling: Pass tool schemas as the tools parameter and read
+                                 tool calls from the response, instead of asking for
+                                 <tool_request> tags resolved by the tool calling helper
         """
         if config is None:
             config = ConfigManager()
             
         self.config = config
+        self.native_tool_calling = native_tool_calling
         self.provider_name = provider_name
         
         # Initialize logger
-        self.logger = get_logger(self.config.get_call_path())
+        self.call_path = self.config.get_call_path()
+        self.logger = get_logger(self.call_path)
         
-        self.client = OpenAI(
-            base_url=base_url,
-            api_key=api_key
-        )
+        # The async client is created lazily since it is bound to the running event loop
+        self.base_url = base_url
+        self.api_key = api_key
+        self.client = None
         self.model = model_name
-        
-        # Get system prompt from config, or use default personality
-        custom_system_prompt = config.get('agent.custom_system_prompt', DEFAULT_PERSONALITY)
-        
-        # Combine the custom prompt with the required tool calling instructions
-        complete_system_prompt = f"{custom_system_prompt}\n\n{ToolCallFactory(config=config).create_tool_call_instruction()}"
+        self.completion_cache = get_completion_cache(config, 'orchestrator')
+        self.rate_limiter = rate_limiter.get_rate_limiter(config)
+        # A RoutingModel wrapping this model spreads its requests over several providers
+        self.router = None
         
         # Create conversation history with the complete system prompt
-        self.history = ConversationHistory(complete_system_prompt)
+        self.history = self.create_history()
         
         self.history_adapter = history_adapter
+        self.history_adapter.set_native_tool_calls(native_tool_calling)
         # Use the unified ToolCallHelper with provider name
         self.tool_helper = ToolCallFactory(config=config).create_tool_call_helper()
+        self.tool_dispatch = config.get('tool_calling.dispatch', 'sequential')
+        self.tool_dispatch_concurrency = max(1, config.get('tool_calling.max_concurrency', 4) or 1)
+
+    def create_history(self) -> ConversationHistory:
+        """
+        Create an empty conversation history set up like the model's own.
+        
+        Returns:
+            A history holding only the system prompt, with its own compactor
+        """
+        return ConversationHistory(self._build_system_prompt(), compactor=self._create_compactor())
+    
+    def swap_history(self, history: ConversationHistory) -> ConversationHistory:
+        """
+        Replace the conversation history the model works on.
+        
+        The history gets the system prompt of the current tool calling mode,
+        it may have been created before the model fell back to two-stage
+        tool calling.
+        
+        Args:
+            history: The history to continue, e.g. one from create_history()
+            
+        Returns:
+            The previous history
+        """
+        previous, self.history = self.history, history
+        self._apply_system_prompt(history)
+        self.history_adapter.reset()
+        return previous
+    
+    def _build_system_prompt(self) -> str:
+        """
+        Build the system prompt for the current tool calling mode.
+        
+        Returns:
+            The custom prompt, followed by the <tool_request> instructions
+            unless tools are called natively
+        """
+        # Get system prompt from config, or use default personality
+        custom_system_prompt = self.config.get('agent.custom_system_prompt', DEFAULT_PERSONALITY)
+        if self.native_tool_calling:
+            return custom_system_prompt or DEFAULT_PERSONALITY
+        
+        # Combine the custom prompt with the required tool calling instructions
+        return f"{custom_system_prompt}\n\n{ToolCallFactory(config=self.config).create_tool_call_instruction()}"
+    
+    def _fall_back_to_two_stage(self, reason: str) -> None:
+        """
+        Switch from native to two-stage tool calling for the rest of the conversation.
+        
+        Args:
+            reason: Why native tool calling cannot be used, for logging
+        """
+        self.logger.warning("Native tool calling rejected, falling back to two-stage tool calling", {
+            "provider": self.provider_name, "model": self.model, "reason": reason
+        })
+        self.native_tool_calling = False
+        # Other histories get the new prompt when they are swapped in
+        self._apply_system_prompt(self.history)
+        self.history_adapter.set_native_tool_calls(False)
+    
+    def _apply_system_prompt(self, history: ConversationHistory) -> None:
+        """
+        Give a history the system prompt of the current tool calling mode.
+        
+        Args:
+            history: The history to update in place
+        """
+        system_prompt = self._build_system_prompt()
+        messages = history.get_messages()
+        if messages and messages[0]["role"] == "system":
+            if messages[0]["content"] != system_prompt:
+                messages[0] = {**messages[0], "content": system_prompt}
+        else:
+            messages.insert(0, {"role": "system", "content": system_prompt})
+    
+    def _create_compactor(self) -> Optional[HistoryCompactor]:
+        """
+        Create the history compactor when a history token budget is configured.
+        
+        Returns:
+            The compactor, or None if compaction is disabled
+        """
+        max_tokens = self.config.get('history.max_tokens')
+        if not max_tokens:
+            return None
+        return HistoryCompactor(
+            max_tokens=max_tokens,
+            keep_recent_messages=self.config.get('history.keep_recent_messages', 6),
+            truncated_result_chars=self.config.get('history.truncated_result_chars', 2000),
+            strategy=self.config.get('history.compaction_strategy', 'truncate'),
+            token_counter=TokenCounter(self.config.get('history.tokenizer_encoding', 'cl100k_base')),
+            summarizer=self._summarize_tool_result
+        )
+    
+    async def _summarize_tool_result(self, content: str) -> Optional[str]:
+        """
+        Summarize a long tool result for history compaction.
+        
+        Args:
+            content: Full tool result
+            
+        Returns:
+            The summary, or None if the model call failed
+        """
+        # Compaction is housekeeping, so it waits behind the conversation's own requests
+        with rate_limiter.priority(rate_limiter.PRIORITY_BACKGROUND):
+            response = await self._create_chat_completion(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": "Summarize the following tool output. Keep every fact, number, name, path and identifier that later steps may need. Reply with the summary only."},
+                    {"role": "user", "content": content}
+                ],
+                max_tokens=512
+            )
+        if not response or not response.choices:
+            return None
+        return response.choices[0].message.content
 
     async def execute(self, tools: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """
@@ -85,24 +224,38 @@ class OrchestratorModel(BaseModel):
             Response with content and optional tool calls
         """
         try:
+            # Keep the history within its token budget
+            await self.history.compact()
+            
             # Format history using the adapter
             # Pass tools to the main model so it knows what tools are available
             formatted_messages = self.history_adapter.format_for_model(
                 self.history.get_messages(), tools=tools
             )
-            self.logger.debug(f"Formatted messages: {formatted_messages}")
+            self.logger.debug(lambda: f"Formatted messages: {formatted_messages}")
             # Get model response
             self.logger.debug(f"Calling {self.__class__.__name__} model: {self.model}")
-            response = await self._create_chat_completion(
-                model=self.model,
-                messages=formatted_messages
-            )
+            if self.native_tool_calling and tools:
+                response = await self._create_native_chat_completion(
+                    model=self.model,
+                    messages=formatted_messages,
+                    tools=tools
+                )
+                if response is None and not self.native_tool_calling:
+                    # The tools parameter was rejected, ask again with the two-stage prompt
+                    return await self.execute(tools)
+            else:
+                response = await self._create_chat_completion(
+                    model=self.model,
+                    messages=formatted_messages
+                )
             
             if not response or not response.choices:
                 self.logger.error(f"Failed to get response from {self.__class__.__name__} model")
                 return create_error_response(LLMError("Failed to get response from model"))
                 
-            content = response.choices[0].message.content
+            # Content is empty when the model only calls tools natively
+            content = response.choices[0].message.content or ""
             self.logger.info(f"Received response from {self.__class__.__name__} model", {"content": content})
             
             # Extract reasoning content if available
@@ -112,30 +265,17 @@ class OrchestratorModel(BaseModel):
                 self.logger.info("Reasoning content", {"reasoning_content": reasoning_content})
 
             # --- Multiple Tool Calling Logic ---
-            tool_calls = []
+            tool_calls = self._native_tool_calls(response.choices[0].message)
             
-            # Find all tool request tags
-            matches = re.findall(r"<tool_request>(.*?)</tool_request>", content, re.DOTALL)
+            # Find all tool request tags, models may still write them in native mode
+            matches = TOOL_REQUEST_PATTERN.findall(content)
             
             if matches and tools:
-                self.logger.debug(f"Found {len(matches)} tool request instructions")
+                self.logger.debug(f"Found {len(matches)} tool request instructions", {"dispatch": self.tool_dispatch})
                 
-                # Process each tool request
-                for i, tool_instruction in enumerate(matches):
-                    # Extract and clean the instruction text
-                    tool_instruction = tool_instruction.strip()
-                    self.logger.info(f"Processing tool request {i+1}", {"tool_instruction": tool_instruction})
-                    
-                    # Pass the instruction to the robust tool calling helper
-                    self.logger.debug(f"Invoking tool_helper for request {i+1}...")
-                    validated_tool_calls, stats = await self.tool_helper.call_tool(tool_instruction, tools)
-                    
-                    if validated_tool_calls and len(validated_tool_calls) > 0:
-                        # Add all valid tool calls to our list
-                        tool_calls.extend(validated_tool_calls)
-                        self.logger.debug(f"Helper generated {stats['valid_calls']} tool calls for request {i+1}")
-                    else:
-                        self.logger.error(f"Tool helper failed to generate valid tool calls for request {i+1}")
+                # Process the tool requests, keeping their calls in request order
+                for request_calls in await self.resolve_tool_requests(matches, tools):
+                    tool_calls.extend(request_calls)
                         
                 if not tool_calls:
                     self.logger.warning("None of the tool requests produced valid tool calls")
@@ -161,6 +301,280 @@ class OrchestratorModel(BaseModel):
             self.logger.error(f"Error in model execution: {error}")
             return create_error_response(error)
 
+    async def execute_stream(self, tools: Optional[List[Dict[str, Any]]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute the model with the current conversation history, streaming the response.
+        
+        Yields events as the completion arrives instead of waiting for the whole
+        response. Each tool request is reported as soon as its closing tag is
+        received, and each native tool call as soon as the next one starts, so
+        the caller can start executing it while the model is still generating.
+        
+        Args:
+            tools: List of tools available to the model
+            
+        Yields:
+            Event dictionaries with a "type" key:
+            - "content": {"delta": str} a piece of the response text
+            - "reasoning": {"delta": str} a piece of the reasoning content
+            - "tool_request": {"index": int, "instruction": str} a complete tool request
+            - "tool_call": {"index": int, "tool_call": dict} a complete native tool call in OpenAI format
+            - "done": {"content": str, "reasoning_content": Optional[str]} the full response
+            - "error": {"error": str} the request failed, no further events follow
+        """
+        try:
+            await self.history.compact()
+            formatted_messages = self.history_adapter.format_for_model(
+                self.history.get_messages(), tools=tools
+            )
+            self.logger.debug(f"Streaming {self.__class__.__name__} model: {self.model}")
+            native = bool(self.native_tool_calling and tools)
+            if native:
+                stream = await self._create_native_chat_completion(
+                    model=self.model,
+                    messages=formatted_messages,
+                    tools=tools,
+                    stream=True
+                )
+                if stream is None and not self.native_tool_calling:
+                    # The tools parameter was rejected, ask again with the two-stage prompt
+                    async for event in self.execute_stream(tools):
+                        yield event
+                    return
+            else:
+                stream = await self._create_chat_completion(
+                    model=self.model,
+                    messages=formatted_messages,
+                    stream=True
+                )
+            
+            if stream is None:
+                self.logger.error(f"Failed to get response from {self.__class__.__name__} model")
+                yield {"type": "error", "error": str(LLMError("Failed to get response from model"))}
+                return
+            
+            content = ""
+            reasoning_content = ""
+            scan_position = 0  # Content before this offset has already been scanned for tool requests
+            request_count = 0
+            native_calls: List[Dict[str, Any]] = []  # Native tool calls assembled from the deltas
+            reported_calls = 0
+            
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                
+                if native and getattr(delta, 'tool_calls', None):
+                    self._merge_tool_call_deltas(native_calls, delta.tool_calls)
+                    # A call is complete once the next one starts
+                    while reported_calls < len(native_calls) - 1:
+                        event = self._tool_call_event(native_calls, reported_calls)
+                        reported_calls += 1
+                        if event:
+                            yield event
+                
+                reasoning_delta = getattr(delta, 'reasoning_content', None)
+                if reasoning_delta:
+                    reasoning_content += reasoning_delta
+                    yield {"type": "reasoning", "delta": reasoning_delta}
+                
+                if not delta.content:
+                    continue
+                content += delta.content
+                yield {"type": "content", "delta": delta.content}
+                
+                # Report every tool request whose closing tag has arrived
+                for match in TOOL_REQUEST_PATTERN.finditer(content, scan_position):
+                    scan_position = match.end()
+                    if not tools:
+                        self.logger.warning("Found a tool request, but no tools were provided to execute")
+                        continue
+                    yield {"type": "tool_request", "index": request_count, "instruction": match.group(1)}
+                    request_count += 1
+            
+            for index in range(reported_calls, len(native_calls)):
+                event = self._tool_call_event(native_calls, index)
+                if event:
+                    yield event
+            
+            self.logger.info(f"Received streamed response from {self.__class__.__name__} model", {"content": content})
+            yield {"type": "done", "content": content, "reasoning_content": reasoning_content or None}
+            
+        except Exception as e:
+            error = handle_error(e)
+            self.logger.error(f"Error in streaming model execution: {error}")
+            yield {"type": "error", "error": str(error)}
+
+    async def resolve_tool_requests(self, instructions: List[str], tools: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        Turn all tool request instructions of a response into validated tool calls.
+        
+        With tool_calling.dispatch 'sequential' the instructions are converted
+        one after another, with 'concurrent' at most tool_calling.max_concurrency
+        are converted at a time, and with 'batched' a single helper completion
+        converts all of them when the helper supports it. A failing instruction
+        only loses its own tool calls.
+        
+        Args:
+            instructions: Texts found inside the <tool_request> tags
+            tools: List of tools available to the model
+            
+        Returns:
+            Tool calls of each instruction, in the same order
+        """
+        if len(instructions) > 1 and self.tool_dispatch == 'batched' and hasattr(self.tool_helper, 'call_tool_batch'):
+            return await self._resolve_tool_requests_batched(instructions, tools)
+        
+        if len(instructions) > 1 and self.tool_dispatch in ('concurrent', 'batched'):
+            semaphore = asyncio.Semaphore(self.tool_dispatch_concurrency)
+            
+            async def resolve(index: int, instruction: str) -> List[Dict[str, Any]]:
+                async with semaphore:
+                    return await self.resolve_tool_request(instruction, tools, index)
+            
+            return list(await asyncio.gather(*(resolve(i, instruction) for i, instruction in enumerate(instructions))))
+        
+        return [await self.resolve_tool_request(instruction, tools, i) for i, instruction in enumerate(instructions)]
+    
+    async def _resolve_tool_requests_batched(self, instructions: List[str], tools: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        Convert all tool request instructions with one batched helper completion.
+        
+        Args:
+            instructions: Texts found inside the <tool_request> tags
+            tools: List of tools available to the model
+            
+        Returns:
+            Tool calls of each instruction, in the same order
+        """
+        instructions = [instruction.strip() for instruction in instructions]
+        self.logger.info("Processing tool requests in a batch", {"count": len(instructions)})
+        with tracing.span("tool_helper", "llm", batched=True, requests=len(instructions)) as span:
+            try:
+                results = await self.tool_helper.call_tool_batch(instructions, tools)
+            except Exception as e:
+                error = handle_error(e, {"tool_instructions": instructions})
+                self.logger.error("Batched tool helper call raised, converting the requests one by one", {"error": str(error)})
+                results = None
+            if span is not None and results is not None:
+                span.set(valid_calls=sum(stats.get("valid_calls", 0) for _, stats in results),
+                         batched_requests=sum(1 for _, stats in results if stats.get("batched")))
+        
+        if results is None:
+            return [await self.resolve_tool_request(instruction, tools, i) for i, instruction in enumerate(instructions)]
+        
+        resolved = []
+        for i, (validated_tool_calls, stats) in enumerate(results):
+            if validated_tool_calls:
+                self.logger.debug(f"Helper generated {stats['valid_calls']} tool calls for request {i+1}", {"stats": stats})
+            else:
+                self.logger.error(f"Tool helper failed to generate valid tool calls for request {i+1}", {"stats": stats})
+            resolved.append(list(validated_tool_calls))
+        return resolved
+    
+    async def resolve_tool_request(self, tool_instruction: str, tools: List[Dict[str, Any]], index: int = 0) -> List[Dict[str, Any]]:
+        """
+        Turn a tool request instruction into validated tool calls.
+        
+        Args:
+            tool_instruction: Text found inside a <tool_request> tag
+            tools: List of tools available to the model
+            index: Position of the request in the response, used for logging
+            
+        Returns:
+            List of tool calls in OpenAI format, empty if none could be generated
+        """
+        # Extract and clean the instruction text
+        tool_instruction = tool_instruction.strip()
+        self.logger.info(f"Processing tool request {index+1}", {"tool_instruction": tool_instruction})
+        
+        # Pass the instruction to the robust tool calling helper
+        self.logger.debug(f"Invoking tool_helper for request {index+1}...")
+        with tracing.span("tool_helper", "llm", request_index=index) as span:
+            try:
+                validated_tool_calls, stats = await self.tool_helper.call_tool(tool_instruction, tools)
+            except Exception as e:
+                # Keep the other requests of the response going
+                error = handle_error(e, {"tool_instruction": tool_instruction})
+                self.logger.error(f"Tool helper raised for request {index+1}", {"error": str(error)})
+                return []
+            if span is not None:
+                span.set(**{key: value for key, value in stats.items() if isinstance(value, (int, bool))})
+        
+        if validated_tool_calls and len(validated_tool_calls) > 0:
+            self.logger.debug(f"Helper generated {stats['valid_calls']} tool calls for request {index+1}")
+            return list(validated_tool_calls)
+        
+        self.logger.error(f"Tool helper failed to generate valid tool calls for request {index+1}")
+        return []
+
+    async def initialize_client(self) -> AsyncOpenAI:
+        """
+        Get the async OpenAI-compatible client for the running event loop.
+        
+        Returns:
+            AsyncOpenAI client sharing the process-wide connection pool
+        """
+        self.client = get_async_openai_client(self.base_url, self.api_key)
+        return self.client
+
+    async def _request_chat_completion(self, **kwargs) -> Any:
+        """
+        Call the model provider's API, or the router's providers when routed.
+        
+        Args:
+            **kwargs: Arguments to pass to the API
+            
+        Returns:
+            The API response
+            
+        Raises:
+            openai.OpenAIError: If the API call fails
+        """
+        if self.router is not None:
+            return await self.router.request(kwargs)
+        return await self.send_chat_completion(**kwargs)
+    
+    async def send_chat_completion(self, **kwargs) -> Any:
+        """
+        Call this model's provider API.
+        
+        Args:
+            **kwargs: Arguments to pass to the API
+            
+        Returns:
+            The API response
+            
+        Raises:
+            openai.OpenAIError: If the API call fails
+        """
+        # Add max_tokens and temperature to API call parameters if not already present
+        if 'max_tokens' not in kwargs:
+            kwargs['max_tokens'] = self.config.get(f'{self.provider_name}.max_tokens')
+        
+        if 'temperature' not in kwargs:
+            kwargs['temperature'] = self.config.get(f'{self.provider_name}.temperature')
+            
+        if kwargs.get('stream') and 'stream_options' not in kwargs:
+            # Ask for a final chunk with the usage of the streamed request
+            kwargs['stream_options'] = {'include_usage': True}
+            
+        client = await self.initialize_client()
+        # For streamed requests the span ends when the response starts arriving
+        with tracing.span("chat_completion", "llm", provider=self.provider_name,
+                          model=kwargs.get('model'), stream=bool(kwargs.get('stream')),
+                          native_tools=bool(kwargs.get('tools'))):
+            async def create() -> Any:
+                response = await rate_limiter.create_chat_completion(client, kwargs, self.rate_limiter)
+                if kwargs.get('stream'):
+                    return usage.record_stream(self.call_path, kwargs.get('model'), response)
+                usage.record(self.call_path, kwargs.get('model'), response)
+                return response
+            if self.completion_cache is not None:
+                return await self.completion_cache.get_or_create(kwargs, create, client.base_url)
+            return await create()
+    
     async def _create_chat_completion(self, **kwargs) -> Any:
         """
         Handle API call to model provider.
@@ -172,19 +586,125 @@ class OrchestratorModel(BaseModel):
             The API response or None if failed
         """
         try:
-            # Add max_tokens and temperature to API call parameters if not already present
-            if 'max_tokens' not in kwargs:
-                kwargs['max_tokens'] = self.config.get(f'{self.provider_name}.max_tokens')
+            return await self._request_chat_completion(**kwargs)
+        except Exception as e:
+            error = handle_error(e, {"kwargs": kwargs})
+            self.logger.error(f"API call error: {error}")
+            return None
+    
+    async def _create_native_chat_completion(self, **kwargs) -> Any:
+        """
+        Handle API call to model provider with native tool definitions.
+        
+        When the provider or model rejects the tool definitions, the model falls
+        back to two-stage tool calling and None is returned. Other rejected
+        requests, such as a context length overflow, are logged like any
+        failed request.
+        
+        Args:
+            **kwargs: Arguments to pass to the API, including tools
             
-            if 'temperature' not in kwargs:
-                kwargs['temperature'] = self.config.get(f'{self.provider_name}.temperature')
-                
-            result = self.client.chat.completions.create(**kwargs)
-            return await result if hasattr(result, "__await__") else result
+        Returns:
+            The API response or None if failed
+        """
+        try:
+            return await self._request_chat_completion(**kwargs)
+        except (BadRequestError, UnprocessableEntityError) as e:
+            if self._rejects_tools(e):
+                self._fall_back_to_two_stage(str(e))
+                return None
+            error = handle_error(e, {"kwargs": kwargs})
+            self.logger.error(f"API call error: {error}")
+            return None
         except Exception as e:
             error = handle_error(e, {"kwargs": kwargs})
             self.logger.error(f"API call error: {error}")
             return None
+    
+    @staticmethod
+    def _rejects_tools(error: Exception) -> bool:
+        """
+        Whether a rejected request failed because of its tool definitions.
+        
+        Args:
+            error: The 400 or 422 error of the provider
+            
+        Returns:
+            True if the error refers to tools or function calling rather than the messages
+        """
+        body = getattr(error, 'body', None)
+        text = f"{getattr(error, 'message', '')} {json.dumps(body, default=str) if body is not None else ''}"
+        return bool(TOOL_REJECTION_PATTERN.search(text)) and not HISTORY_REJECTION_PATTERN.search(text)
+    
+    @staticmethod
+    def _native_tool_calls(message: Any) -> List[Dict[str, Any]]:
+        """
+        Read the native tool calls of a response message.
+        
+        Args:
+            message: Message of a chat completion choice
+            
+        Returns:
+            List of tool calls in OpenAI format, empty if there are none
+        """
+        tool_calls = []
+        for tool_call in getattr(message, 'tool_calls', None) or []:
+            if not tool_call.function or not tool_call.function.name:
+                continue
+            tool_calls.append({
+                "id": tool_call.id or f"call_{uuid.uuid4().hex[:8]}",
+                "type": "function",
+                "function": {
+                    "name": tool_call.function.name,
+                    "arguments": tool_call.function.arguments or "{}"
+                }
+            })
+        return tool_calls
+    
+    def _tool_call_event(self, tool_calls: List[Dict[str, Any]], index: int) -> Optional[Dict[str, Any]]:
+        """
+        Create the stream event for a completely received native tool call.
+        
+        Args:
+            tool_calls: Tool calls assembled from the deltas
+            index: Position of the completed call
+            
+        Returns:
+            The "tool_call" event, or None if the call has no function name
+        """
+        tool_call = tool_calls[index]
+        if not tool_call["function"]["name"]:
+            self.logger.warning("Dropping streamed tool call without a function name", {"index": index})
+            return None
+        if not tool_call["function"]["arguments"]:
+            tool_call["function"]["arguments"] = "{}"
+        return {"type": "tool_call", "index": index, "tool_call": tool_call}
+    
+    @staticmethod
+    def _merge_tool_call_deltas(tool_calls: List[Dict[str, Any]], deltas: List[Any]) -> None:
+        """
+        Merge streamed tool call deltas into the tool calls assembled so far.
+        
+        Args:
+            tool_calls: Tool calls in OpenAI format, extended in place
+            deltas: Tool call deltas of a stream chunk
+        """
+        for delta in deltas:
+            index = delta.index if delta.index is not None else max(len(tool_calls) - 1, 0)
+            while len(tool_calls) <= index:
+                tool_calls.append({
+                    "id": f"call_{uuid.uuid4().hex[:8]}",
+                    "type": "function",
+                    "function": {"name": "", "arguments": ""}
+                })
+            tool_call = tool_calls[index]
+            if delta.id:
+                tool_call["id"] = delta.id
+            if delta.function:
+                if delta.function.name:
+                    tool_call["function"]["name"] += delta.function.name
+                if delta.function.arguments:
+                    tool_call["function"]["arguments"] += delta.function.arguments
 
     def add_user_message(self, message: str) -> None:
         """
@@ -19,12 +19,13 @@ class QwenModel(OrchestratorModel):
     high-quality tool calling instructions using Qwen's models.
     """
     
-    def __init__(self, config: Optional[ConfigManager] = None):
+    def __init__(self, config: Optional[ConfigManager] = None, native_tool_calling: bool = False):
         """
         Initialize the Qwen model with Qwen-specific configuration.
         
         Args:
             config: Configuration manager instance to use
+            native_tool_calling: Whether to pass tool schemas as the tools parameter
         """
         if config is None:
             config = ConfigManager()
@@ -45,7 +46,8 @@ class QwenModel(OrchestratorModel):
             model_name=config.get('qwen.model', 'qwen-max'),
             provider_name='qwen',
             history_adapter=history_adapter,
-            config=config
+            config=config,
+            native_tool_calling=native_tool_calling
         )
         
         self.logger.debug("Qwen model created", {
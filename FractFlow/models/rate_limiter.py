@@ -0,0 +1,581 @@
+"""
+LLM rate limiting.
+
+Schedules every chat completion request of a process through token buckets
+keyed by provider endpoint, enforcing requests per minute and tokens per
+minute. Requests wait in a priority queue instead of failing: the top-level
+orchestrator goes first, nested agents next and helper calls such as tool
+call generation last. Requests rejected with HTTP 429 pause their endpoint
+for the advertised Retry-After and are queued again.
+
+With a state directory the buckets live in lock-protected files, so that
+the agent servers of a whole call tree share one quota. Child servers
+inherit the limits and the directory through their environment. Across
+processes, lower priorities only take capacity while a reserve share of
+each bucket stays free for higher ones.
+"""
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import heapq
+import itertools
+import threading
+import contextvars
+import weakref
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from openai import RateLimitError
+
+from ..infra.config import ConfigManager
+from ..infra.logging_utils import get_logger
+from ..conversation.compaction import TokenCounter
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = get_logger(__name__)
+
+# Request priorities, lower values are served first
+PRIORITY_FOREGROUND = 0
+PRIORITY_NESTED = 1
+PRIORITY_BACKGROUND = 2
+
+# Environment variable carrying the limiter settings into child servers
+RATE_LIMIT_ENV = 'FRACTFLOW_LLM_RATE_LIMIT'
+
+# Longest pause applied for a 429 without a Retry-After header
+MAX_BACKOFF = 60.0
+
+_priority: contextvars.ContextVar = contextvars.ContextVar('fractflow_llm_priority', default=PRIORITY_FOREGROUND)
+
+# Limiters shared by every model in the process, keyed by state directory
+_limiters: Dict[Optional[str], 'RateLimiter'] = {}
+_limiters_lock = threading.Lock()
+
+_token_counter = TokenCounter()
+
+@contextmanager
+def priority(level: int) -> Iterator[None]:
+    """
+    Lower the priority of the LLM requests made inside the block.
+
+    Nested blocks keep the lowest priority, so helper calls of a nested
+    agent stay behind those of the nested agent itself.
+
+    Args:
+        level: PRIORITY_FOREGROUND, PRIORITY_NESTED or PRIORITY_BACKGROUND
+    """
+    token = _priority.set(max(_priority.get(), level))
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def current_priority() -> int:
+    """Get the priority of requests made by the running task."""
+    return _priority.get()
+
+def estimate_request_tokens(request: Dict[str, Any]) -> int:
+    """
+    Estimate the prompt tokens of a chat completion request.
+
+    The estimate is corrected with the reported usage once the response
+    arrives.
+
+    Args:
+        request: Keyword arguments of chat.completions.create
+
+    Returns:
+        Estimated number of tokens
+    """
+    tokens = _token_counter.count_messages(request.get('messages') or [])
+    if request.get('tools'):
+        tokens += _token_counter.count_text(json.dumps(request['tools'], ensure_ascii=False))
+    return tokens
+
+def _refill(state: Dict[str, float], limits: Dict[str, float], now: float) -> None:
+    """Add the capacity accrued since the last update to each bucket."""
+    elapsed = max(0.0, now - state.get('updated', now))
+    for bucket, limit_key in (('requests', 'requests_per_minute'), ('tokens', 'tokens_per_minute')):
+        capacity = limits.get(limit_key)
+        if capacity:
+            level = state.get(bucket, capacity)
+            state[bucket] = min(capacity, level + capacity / 60.0 * elapsed)
+    state['updated'] = now
+
+def _try_acquire(state: Dict[str, float], limits: Dict[str, float], tokens: int, reserve: float) -> float:
+    """
+    Take one request and the tokens from the buckets if they have room.
+
+    Args:
+        state: Bucket levels, updated in place
+        limits: requests_per_minute and tokens_per_minute, either may be missing
+        tokens: Tokens the request is expected to use
+        reserve: Share of each bucket that has to stay free after taking
+
+    Returns:
+        0 if taken, otherwise the seconds until there is room
+    """
+    now = time.time()
+    _refill(state, limits, now)
+    paused_until = state.get('paused_until', 0.0)
+    if paused_until > now:
+        return paused_until - now
+
+    wait = 0.0
+    amounts = {'requests': 1, 'tokens': tokens}
+    for bucket, limit_key in (('requests', 'requests_per_minute'), ('tokens', 'tokens_per_minute')):
+        capacity = limits.get(limit_key)
+        if not capacity:
+            continue
+        # Requests larger than the bucket go through when it is full and leave a debt
+        needed = min(amounts[bucket], capacity * (1.0 - reserve)) + capacity * reserve
+        if state[bucket] < needed:
+            wait = max(wait, (needed - state[bucket]) / (capacity / 60.0))
+    if wait > 0:
+        return wait
+
+    for bucket, limit_key in (('requests', 'requests_per_minute'), ('tokens', 'tokens_per_minute')):
+        if limits.get(limit_key):
+            state[bucket] -= amounts[bucket]
+    return 0.0
+
+class MemoryBucketStore:
+    """Token bucket levels of one process."""
+
+    def __init__(self):
+        """Initialize the store."""
+        self._states: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def update(self, key: str, function: Callable[[Dict[str, float]], Any]) -> Any:
+        """
+        Apply a function to the bucket state of an endpoint atomically.
+
+        Args:
+            key: Endpoint key
+            function: Function changing the state dictionary in place
+
+        Returns:
+            The function's result
+        """
+        with self._lock:
+            return function(self._states.setdefault(key, {}))
+
+class FileBucketStore(MemoryBucketStore):
+    """Token bucket levels shared by processes through files guarded by flock."""
+
+    def __init__(self, directory: str):
+        """
+        Initialize the store.
+
+        Args:
+            directory: Directory holding one state file per endpoint
+        """
+        super().__init__()
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def update(self, key: str, function: Callable[[Dict[str, float]], Any]) -> Any:
+        path = os.path.join(self.directory, hashlib.sha1(key.encode('utf-8')).hexdigest()[:16] + '.json')
+        # The thread lock keeps threads of this process from sharing the flock
+        with self._lock, open(path, 'a+', encoding='utf-8') as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                file.seek(0)
+                content = file.read()
+                try:
+                    state = json.loads(content) if content else {}
+                except json.JSONDecodeError:
+                    state = {}
+                result = function(state)
+                file.seek(0)
+                file.truncate()
+                file.write(json.dumps(state))
+                file.flush()
+                return result
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+
+class _WaitQueue:
+    """Requests of one event loop waiting for one endpoint, in priority order."""
+
+    def __init__(self):
+        self.heap: List[Tuple[int, int]] = []
+        self.condition = asyncio.Condition()
+
+class RateLimiter:
+    """
+    Process-wide scheduler of LLM requests.
+
+    Limits are looked up by the request's base URL, then by its host name,
+    then under '*'. Endpoints without limits are not throttled.
+    """
+
+    def __init__(self,
+                 limits: Dict[str, Dict[str, float]],
+                 state_dir: Optional[str] = None,
+                 reserve: float = 0.2,
+                 max_retries: int = 5):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            limits: requests_per_minute and tokens_per_minute by base URL, host or '*'
+            state_dir: Directory to share the buckets with other processes through,
+                       None to keep them in this process
+            reserve: Share of a shared bucket that background requests of any process
+                     leave free for foreground requests; nested agents leave half of it
+            max_retries: How often a request rejected with HTTP 429 is queued again
+        """
+        self.limits = {key.rstrip('/'): value for key, value in limits.items()}
+        self.state_dir = state_dir
+        self.reserve = min(max(reserve, 0.0), 0.9)
+        self.max_retries = max_retries
+
+        if state_dir and fcntl is None:
+            logger.warning("File locks are not available on this platform, rate limits apply per process")
+            state_dir = None
+        self.store = FileBucketStore(state_dir) if state_dir else MemoryBucketStore()
+
+        self.stats: Dict[str, Dict[str, float]] = {}
+        self._queues: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, _WaitQueue]]" = weakref.WeakKeyDictionary()
+        self._sequence = itertools.count()
+
+    @staticmethod
+    def endpoint_key(base_url: Any) -> str:
+        """
+        Get the key a client's requests are scheduled under.
+
+        Args:
+            base_url: The client's base URL
+
+        Returns:
+            The base URL without a trailing slash
+        """
+        return str(base_url or 'default').rstrip('/')
+
+    def get_limits(self, key: str) -> Optional[Dict[str, float]]:
+        """
+        Get the limits of an endpoint.
+
+        Args:
+            key: Endpoint key from endpoint_key()
+
+        Returns:
+            The limits, or None if the endpoint is not limited
+        """
+        if key in self.limits:
+            return self.limits[key]
+        host = urlparse(key).hostname
+        if host and host in self.limits:
+            return self.limits[host]
+        return self.limits.get('*')
+
+    def _get_stats(self, key: str) -> Dict[str, float]:
+        return self.stats.setdefault(key, {
+            'requests': 0, 'queued': 0, 'wait_seconds': 0.0, 'rate_limited': 0, 'tokens': 0
+        })
+
+    def _get_queue(self, key: str) -> _WaitQueue:
+        """Get the wait queue of an endpoint for the running event loop."""
+        queues = self._queues.setdefault(asyncio.get_running_loop(), {})
+        if key not in queues:
+            queues[key] = _WaitQueue()
+        return queues[key]
+
+    async def acquire(self, key: str, tokens: int, priority_level: Optional[int] = None) -> None:
+        """
+        Wait until a request may be sent to an endpoint.
+
+        Args:
+            key: Endpoint key from endpoint_key()
+            tokens: Tokens the request is expected to use
+            priority_level: Request priority; the running task's priority applies if it is lower
+        """
+        limits = self.get_limits(key)
+        if not limits:
+            return
+        priority_level = max(current_priority(), priority_level or PRIORITY_FOREGROUND)
+        # The queue orders requests within the process; across processes, lower
+        # priorities leave headroom to higher ones
+        reserve = 0.0
+        if isinstance(self.store, FileBucketStore):
+            reserve = self.reserve * min(priority_level, PRIORITY_BACKGROUND) / PRIORITY_BACKGROUND
+
+        queue = self._get_queue(key)
+        entry = (priority_level, next(self._sequence))
+        stats = self._get_stats(key)
+        start_time = time.perf_counter()
+        async with queue.condition:
+            heapq.heappush(queue.heap, entry)
+            try:
+                while True:
+                    wait = None
+                    if queue.heap[0] == entry:
+                        wait = self.store.update(key, lambda state: _try_acquire(state, limits, tokens, reserve))
+                        if wait <= 0:
+                            break
+                    try:
+                        await asyncio.wait_for(queue.condition.wait(), wait)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                queue.heap.remove(entry)
+                heapq.heapify(queue.heap)
+                # Let the next request in line check the buckets
+                queue.condition.notify_all()
+
+        waited = time.perf_counter() - start_time
+        stats['requests'] += 1
+        if waited > 0.01:
+            stats['queued'] += 1
+            stats['wait_seconds'] += waited
+            logger.debug("LLM request was queued by the rate limiter", {
+                "endpoint": key, "priority": priority_level, "seconds": round(waited, 3)
+            })
+
+    def settle(self, key: str, estimated_tokens: int, used_tokens: int) -> None:
+        """
+        Correct the tokens taken for a request with the tokens it actually used.
+
+        Args:
+            key: Endpoint key from endpoint_key()
+            estimated_tokens: Tokens taken by acquire()
+            used_tokens: Tokens reported in the response's usage
+        """
+        limits = self.get_limits(key)
+        self._get_stats(key)['tokens'] += used_tokens
+        if not limits or not limits.get('tokens_per_minute'):
+            return
+
+        def adjust(state: Dict[str, float]) -> None:
+            _refill(state, limits, time.time())
+            state['tokens'] = min(limits['tokens_per_minute'], state['tokens'] + estimated_tokens - used_tokens)
+        self.store.update(key, adjust)
+
+    def settle_stream(self, key: str, estimated_tokens: int, stream: Any) -> Any:
+        """
+        Settle a streamed request once its stream is consumed.
+
+        The tokens come from the usage chunk the stream ends with, or, if
+        the provider sends none, from the estimate plus a count of the
+        streamed text.
+
+        Args:
+            key: Endpoint key from endpoint_key()
+            estimated_tokens: Tokens taken by acquire()
+            stream: Streamed chat completion response
+
+        Returns:
+            The stream, wrapped
+        """
+        return _SettlingStream(stream, self, key, estimated_tokens)
+
+    def pause(self, key: str, seconds: float) -> None:
+        """
+        Stop sending requests to an endpoint for a while, e.g. after HTTP 429.
+
+        Args:
+            key: Endpoint key from endpoint_key()
+            seconds: Pause length
+        """
+        def extend(state: Dict[str, float]) -> None:
+            state['paused_until'] = max(state.get('paused_until', 0.0), time.time() + seconds)
+        self.store.update(key, extend)
+
+    async def run(self, base_url: Any, create: Callable[[], Awaitable[Any]],
+                  tokens: int, priority_level: Optional[int] = None) -> Any:
+        """
+        Send a request once the endpoint has capacity, queueing it again on HTTP 429.
+
+        Args:
+            base_url: Base URL of the client sending the request
+            create: Coroutine function sending the request
+            tokens: Tokens the request is expected to use
+            priority_level: Request priority, by default the one of the running task
+
+        Returns:
+            The response
+
+        Raises:
+            RateLimitError: If the request is still rejected after max_retries retries
+        """
+        key = self.endpoint_key(base_url)
+        if not self.get_limits(key):
+            return await create()
+
+        for attempt in range(self.max_retries + 1):
+            await self.acquire(key, tokens, priority_level)
+            try:
+                response = await create()
+            except RateLimitError as e:
+                self._get_stats(key)['rate_limited'] += 1
+                if attempt >= self.max_retries:
+                    raise
+                delay = _retry_after(e) or min(MAX_BACKOFF, 2.0 ** attempt)
+                logger.warning("LLM endpoint returned 429, pausing it", {
+                    "endpoint": key, "seconds": round(delay, 2), "attempt": attempt + 1
+                })
+                self.pause(key, delay)
+                continue
+
+            usage = getattr(response, 'usage', None)
+            if usage is not None and getattr(usage, 'total_tokens', None):
+                self.settle(key, tokens, usage.total_tokens)
+            return response
+
+    def child_environment(self) -> Dict[str, str]:
+        """
+        Environment variables that make child servers use the same limits.
+
+        Returns:
+            Variables to add to the child's environment
+        """
+        return {RATE_LIMIT_ENV: json.dumps({
+            'limits': self.limits,
+            'state_dir': self.state_dir,
+            'reserve': self.reserve,
+            'max_retries': self.max_retries
+        })}
+
+class _SettlingStream:
+    """Streamed chat completion that settles its request when the stream ends."""
+
+    def __init__(self, stream: Any, rate_limiter: RateLimiter, key: str, estimated_tokens: int):
+        self._stream = stream
+        self._rate_limiter = rate_limiter
+        self._key = key
+        self._estimated_tokens = estimated_tokens
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._stream, name)
+
+    async def __aiter__(self):
+        reported_tokens = None
+        streamed_text: List[str] = []
+        try:
+            async for chunk in self._stream:
+                usage = getattr(chunk, 'usage', None)
+                if usage is not None and getattr(usage, 'total_tokens', None):
+                    reported_tokens = usage.total_tokens
+                for choice in getattr(chunk, 'choices', None) or []:
+                    delta = getattr(choice, 'delta', None)
+                    streamed_text.append(getattr(delta, 'content', None) or '')
+                    streamed_text.append(getattr(delta, 'reasoning_content', None) or '')
+                    for tool_call in getattr(delta, 'tool_calls', None) or []:
+                        function = getattr(tool_call, 'function', None)
+                        streamed_text.append(getattr(function, 'name', None) or '')
+                        streamed_text.append(getattr(function, 'arguments', None) or '')
+                yield chunk
+        finally:
+            # Also settle streams that are abandoned or fail part way
+            if reported_tokens is None:
+                reported_tokens = self._estimated_tokens + _token_counter.count_text(''.join(streamed_text))
+            self._rate_limiter.settle(self._key, self._estimated_tokens, reported_tokens)
+
+def _retry_after(error: RateLimitError) -> Optional[float]:
+    """Read the Retry-After delay of a 429 response, in seconds."""
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+    for header, scale in (('retry-after-ms', 0.001), ('retry-after', 1.0)):
+        value = headers.get(header)
+        if value is None:
+            continue
+        try:
+            return max(0.0, float(value) * scale)
+        except ValueError:
+            continue
+    return None
+
+def get_rate_limiter(config: Optional[ConfigManager] = None) -> Optional[RateLimiter]:
+    """
+    Get the process-wide rate limiter, if limits are configured.
+
+    Limits come from the configuration, or else from the environment of a
+    parent agent process.
+
+    Args:
+        config: Configuration manager instance
+
+    Returns:
+        The rate limiter, or None if no limits are configured
+    """
+    settings = None
+    if config is not None and config.get('llm_rate_limit.limits'):
+        settings = {
+            'limits': config.get('llm_rate_limit.limits'),
+            'state_dir': config.get('llm_rate_limit.state_dir'),
+            'reserve': config.get('llm_rate_limit.reserve', 0.2),
+            'max_retries': config.get('llm_rate_limit.max_retries', 5)
+        }
+    elif os.environ.get(RATE_LIMIT_ENV):
+        try:
+            settings = json.loads(os.environ[RATE_LIMIT_ENV])
+        except json.JSONDecodeError:
+            logger.warning("Ignoring malformed rate limit settings", {"variable": RATE_LIMIT_ENV})
+    if not settings:
+        return None
+
+    state_dir = settings.get('state_dir')
+    if state_dir:
+        state_dir = os.path.abspath(os.path.expanduser(state_dir))
+    with _limiters_lock:
+        if state_dir not in _limiters:
+            _limiters[state_dir] = RateLimiter(
+                limits=settings['limits'],
+                state_dir=state_dir,
+                reserve=settings.get('reserve', 0.2),
+                max_retries=settings.get('max_retries', 5)
+            )
+        return _limiters[state_dir]
+
+def child_environment() -> Dict[str, str]:
+    """
+    Environment variables that make child servers use this process's limits.
+
+    Without a state directory each child gets the full limits to itself.
+
+    Returns:
+        Variables to add to the child's environment, empty when no limits are configured
+    """
+    with _limiters_lock:
+        limiters = sorted(_limiters.values(), key=lambda limiter: limiter.state_dir is None)
+    return limiters[0].child_environment() if limiters else {}
+
+async def create_chat_completion(client: Any, request: Dict[str, Any],
+                                 rate_limiter: Optional[RateLimiter] = None,
+                                 priority_level: Optional[int] = None) -> Any:
+    """
+    Send a chat completion request, through the rate limiter when there is one.
+
+    Streamed requests are settled once their stream has been consumed.
+
+    Args:
+        client: AsyncOpenAI client
+        request: Keyword arguments of chat.completions.create
+        rate_limiter: The process's rate limiter, None to send right away
+        priority_level: Request priority, by default the one of the running task
+
+    Returns:
+        The API response
+    """
+    if rate_limiter is None:
+        return await client.chat.completions.create(**request)
+    tokens = estimate_request_tokens(request)
+    response = await rate_limiter.run(
+        client.base_url,
+        lambda: client.chat.completions.create(**request),
+        tokens,
+        priority_level
+    )
+    key = rate_limiter.endpoint_key(client.base_url)
+    if request.get('stream') and rate_limiter.get_limits(key):
+        return rate_limiter.settle_stream(key, tokens, response)
+    return response
@@ -0,0 +1,379 @@
+"""
+Routing model implementation.
+
+Spreads the requests of one conversation over several providers. Requests
+go to the healthiest provider first; if it has not answered within a
+deadline taken from its own latency percentiles, a hedged copy is sent to
+the next provider and whichever answers first wins, the other request is
+cancelled. Failed requests fail over to the next provider right away.
+Providers ranked down are probed now and then, so they can win back their
+place once they recover.
+"""
+
+import time
+import asyncio
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+from .base_model import BaseModel
+from .orchestrator_model import OrchestratorModel
+from ..conversation.base_history import ConversationHistory
+from ..infra.config import ConfigManager
+from ..infra.logging_utils import get_logger
+from ..infra import tracing
+
+# An endpoint this many times slower than the fastest healthy one is tried after it
+SLOW_FACTOR = 3.0
+
+# Endpoints whose error rate EWMA is above this are tried last
+UNHEALTHY_ERROR_RATE = 0.5
+
+# Latencies needed before hedging uses an endpoint's percentile instead of the initial delay
+MIN_SAMPLES = 5
+
+class EndpointHealth:
+    """
+    Latency and error statistics of one provider endpoint.
+
+    Latencies are kept separately for streamed requests, measured until
+    the response starts arriving, and for complete responses.
+    """
+
+    def __init__(self, name: str, alpha: float = 0.2, window: int = 100):
+        """
+        Initialize the statistics.
+
+        Args:
+            name: Endpoint name, e.g. 'deepseek'
+            alpha: Weight of the newest sample in the moving averages
+            window: Number of recent latencies the percentiles are computed from
+        """
+        self.name = name
+        self.alpha = alpha
+        self.latency_ewma: Dict[bool, Optional[float]] = {False: None, True: None}
+        self.error_rate = 0.0
+        self.counters = {'requests': 0, 'errors': 0, 'hedges': 0, 'wins': 0, 'cancelled': 0, 'probes': 0}
+        # Start of the latest request, ranked down endpoints are probed when it gets old
+        self.last_attempt = time.monotonic()
+        self._recent: Dict[bool, Deque[float]] = {False: deque(maxlen=window), True: deque(maxlen=window)}
+
+    def record_success(self, stream: bool, seconds: float) -> None:
+        """
+        Record a request that got a response.
+
+        Args:
+            stream: Whether the request was streamed
+            seconds: Time until the response (started to) arrive
+        """
+        self.record_latency(stream, seconds)
+        self._recent[stream].append(seconds)
+        self.error_rate *= 1 - self.alpha
+
+    def record_latency(self, stream: bool, seconds: float) -> None:
+        """
+        Update the latency average only, e.g. with the time a cancelled request had taken so far.
+
+        Args:
+            stream: Whether the request was streamed
+            seconds: Latency, or a lower bound of it
+        """
+        previous = self.latency_ewma[stream]
+        self.latency_ewma[stream] = seconds if previous is None else self.alpha * seconds + (1 - self.alpha) * previous
+
+    def record_failure(self) -> None:
+        """Record a request that failed."""
+        self.counters['errors'] += 1
+        self.error_rate = self.alpha + (1 - self.alpha) * self.error_rate
+
+    def percentile(self, stream: bool, quantile: float) -> Optional[float]:
+        """
+        Get a latency percentile of recent requests.
+
+        Args:
+            stream: Whether to look at streamed requests
+            quantile: Quantile between 0 and 1
+
+        Returns:
+            The latency in seconds, None without samples
+        """
+        recent = sorted(self._recent[stream])
+        if not recent:
+            return None
+        return recent[min(len(recent) - 1, int(quantile * len(recent)))]
+
+    def sample_count(self, stream: bool) -> int:
+        """Number of latencies the percentiles are computed from."""
+        return len(self._recent[stream])
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the current statistics.
+
+        Returns:
+            Counters, error rate EWMA and latency EWMAs and p95 by request kind
+        """
+        result = {**self.counters, 'error_rate': round(self.error_rate, 3)}
+        for stream, kind in ((False, 'response'), (True, 'first_byte')):
+            if self.latency_ewma[stream] is not None:
+                result[f'{kind}_ewma_s'] = round(self.latency_ewma[stream], 3)
+            if self._recent[stream]:
+                result[f'{kind}_p95_s'] = round(self.percentile(stream, 0.95), 3)
+        return result
+
+class RoutingModel(BaseModel):
+    """
+    Model hedging its requests across several provider models.
+
+    The first backend holds the conversation: history, tool calling mode and
+    tool calling helper are its own, and its requests are routed through
+    this model. The other backends only serve requests.
+    """
+
+    def __init__(self, backends: List[OrchestratorModel], config: Optional[ConfigManager] = None):
+        """
+        Initialize the routing model.
+
+        Args:
+            backends: Provider models in order of preference, at least one
+            config: Configuration manager instance to use
+        """
+        if not backends:
+            raise ValueError("RoutingModel needs at least one backend")
+        self.config = config or ConfigManager()
+        self.logger = get_logger(self.config.get_call_path())
+
+        self.backends = backends
+        self.primary = backends[0]
+        self.primary.router = self
+
+        self.hedge_percentile = self.config.get('routing.hedge_percentile', 0.95)
+        self.initial_hedge_delay = self.config.get('routing.initial_hedge_delay', 30.0)
+        self.min_hedge_delay = self.config.get('routing.min_hedge_delay', 0.5)
+        self.max_hedges = self.config.get('routing.max_hedges', 1)
+        self.probe_interval = self.config.get('routing.probe_interval', 60.0)
+        alpha = self.config.get('routing.ewma_alpha', 0.2)
+        self.health = [EndpointHealth(backend.provider_name, alpha) for backend in backends]
+
+        self.logger.debug("Routing model created", {
+            "providers": [backend.provider_name for backend in backends],
+            "hedge_percentile": self.hedge_percentile,
+            "max_hedges": self.max_hedges
+        })
+
+    # The conversation lives in the primary backend
+
+    @property
+    def history(self) -> ConversationHistory:
+        """The conversation history, held by the primary backend."""
+        return self.primary.history
+
+    @history.setter
+    def history(self, history: ConversationHistory) -> None:
+        self.primary.history = history
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes not defined here, e.g. native_tool_calling
+        if name in ('primary', 'backends'):
+            raise AttributeError(name)
+        return getattr(self.primary, name)
+
+    async def execute(self, tools: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        return await self.primary.execute(tools)
+
+    async def execute_stream(self, tools: Optional[List[Dict[str, Any]]] = None) -> AsyncIterator[Dict[str, Any]]:
+        async for event in self.primary.execute_stream(tools):
+            yield event
+
+    def add_user_message(self, message: str) -> None:
+        self.primary.add_user_message(message)
+
+    def add_assistant_message(self, message: str, tool_calls: Optional[List[Dict[str, Any]]] = None) -> None:
+        self.primary.add_assistant_message(message, tool_calls)
+
+    def add_tool_result(self, tool_name: str, result: str, tool_call_id: Optional[str] = None) -> None:
+        self.primary.add_tool_result(tool_name, result, tool_call_id)
+
+    def create_history(self) -> ConversationHistory:
+        return self.primary.create_history()
+
+    def swap_history(self, history: ConversationHistory) -> ConversationHistory:
+        return self.primary.swap_history(history)
+
+    # Request routing
+
+    def rank_endpoints(self, stream: bool) -> List[int]:
+        """
+        Order the backends for a request.
+
+        Healthy backends come first in configured order, except that a
+        backend much slower than the fastest healthy one moves behind it.
+
+        Args:
+            stream: Whether the request is streamed
+
+        Returns:
+            Backend indexes, best first
+        """
+        healthy = [index for index, health in enumerate(self.health) if health.error_rate <= UNHEALTHY_ERROR_RATE]
+        unhealthy = sorted((index for index in range(len(self.backends)) if index not in healthy),
+                           key=lambda index: self.health[index].error_rate)
+        latencies = [self.health[index].latency_ewma[stream] for index in healthy]
+        known = [latency for latency in latencies if latency is not None]
+        if known:
+            fastest = min(known)
+            healthy.sort(key=lambda index: (self.health[index].latency_ewma[stream] or 0.0) > SLOW_FACTOR * fastest)
+        return healthy + unhealthy
+
+    def hedge_delay(self, index: int, stream: bool) -> float:
+        """
+        Get how long to wait for a backend before hedging.
+
+        Args:
+            index: Backend index
+            stream: Whether the request is streamed
+
+        Returns:
+            The backend's latency percentile, or the initial delay while it has too few samples
+        """
+        health = self.health[index]
+        if health.sample_count(stream) < MIN_SAMPLES:
+            return self.initial_hedge_delay
+        return max(self.min_hedge_delay, health.percentile(stream, self.hedge_percentile))
+
+    def _probe_candidate(self, order: List[int]) -> Optional[int]:
+        """
+        Pick a ranked down backend to send the next request to first.
+
+        Without traffic a backend's statistics never change, so one slow or
+        failed request would keep it ranked down for good. A backend that is
+        unhealthy or ranked behind its configured position, and has not been
+        tried for probe_interval seconds, gets a request again. Healthy
+        backends in their configured place are never probed, so the
+        preference order holds while the preferred backends are fine.
+
+        Args:
+            order: Backend indexes, best first
+
+        Returns:
+            The backend to probe, None if none is due
+        """
+        if self.probe_interval is None:
+            return None
+        now = time.monotonic()
+        for position, index in enumerate(order[1:], start=1):
+            demoted = position > index or self.health[index].error_rate > UNHEALTHY_ERROR_RATE
+            if demoted and now - self.health[index].last_attempt >= self.probe_interval:
+                self.health[index].counters['probes'] += 1
+                return index
+        return None
+
+    async def _attempt(self, index: int, kwargs: Dict[str, Any]) -> Any:
+        """Send a request to one backend, recording its latency or failure."""
+        backend, health = self.backends[index], self.health[index]
+        stream = bool(kwargs.get('stream'))
+        health.counters['requests'] += 1
+        health.last_attempt = time.monotonic()
+        start_time = time.perf_counter()
+        try:
+            response = await backend.send_chat_completion(**{**kwargs, 'model': backend.model})
+        except asyncio.CancelledError:
+            # Lost to a hedge: it took at least this long, so slow endpoints get ranked down
+            health.counters['cancelled'] += 1
+            health.record_latency(stream, time.perf_counter() - start_time)
+            raise
+        except Exception:
+            health.record_failure()
+            raise
+        health.record_success(stream, time.perf_counter() - start_time)
+        return response
+
+    async def request(self, kwargs: Dict[str, Any]) -> Any:
+        """
+        Send a request, hedging and failing over across the backends.
+
+        Args:
+            kwargs: Arguments for the API, the model is replaced per backend
+
+        Returns:
+            The first response
+
+        Raises:
+            Exception: The error of the first backend tried if every backend failed
+        """
+        stream = bool(kwargs.get('stream'))
+        order = self.rank_endpoints(stream)
+        leader = order[0]
+        probe = self._probe_candidate(order)
+        if probe is not None:
+            order.remove(probe)
+            order.insert(0, probe)
+        tasks: Dict[asyncio.Task, int] = {}
+        errors: List[Exception] = []
+        hedges = 0
+        next_position = 0
+
+        def start_next() -> None:
+            nonlocal next_position
+            index = order[next_position]
+            next_position += 1
+            tasks[asyncio.create_task(self._attempt(index, kwargs))] = index
+
+        start_next()
+        try:
+            while tasks:
+                can_hedge = hedges < self.max_hedges and next_position < len(order)
+                # Hedge once the earliest started backend still running exceeds its hedge delay
+                timeout = None
+                if can_hedge:
+                    index = tasks[next(iter(tasks))]
+                    timeout = self.hedge_delay(index, stream)
+                    if index == probe:
+                        # A probe may wait no longer than the backend it displaced would have
+                        timeout = min(timeout, self.hedge_delay(leader, stream))
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    hedges += 1
+                    self.health[order[next_position]].counters['hedges'] += 1
+                    self.logger.info("Provider is slow, sending a hedged request", {
+                        "slow": self.backends[tasks[next(iter(tasks))]].provider_name,
+                        "hedge": self.backends[order[next_position]].provider_name,
+                        "after_seconds": round(timeout, 2)
+                    })
+                    tracing.annotate(hedged=True)
+                    start_next()
+                    continue
+
+                for task in done:
+                    index = tasks.pop(task)
+                    if task.exception() is None:
+                        self.health[index].counters['wins'] += 1
+                        if len(self.backends) > 1:
+                            tracing.annotate(provider=self.backends[index].provider_name)
+                        return task.result()
+                    errors.append(task.exception())
+                    self.logger.warning("Provider request failed", {
+                        "provider": self.backends[index].provider_name, "error": str(task.exception())
+                    })
+
+                # Fail over when nothing is left running
+                if not tasks and next_position < len(order):
+                    start_next()
+        finally:
+            for task in tasks:
+                task.cancel()
+            for result in await asyncio.gather(*tasks, return_exceptions=True):
+                # A loser that answered in the same instant still holds its stream open
+                if hasattr(result, 'close') and asyncio.iscoroutinefunction(result.close):
+                    await result.close()
+
+        raise errors[0]
+
+    def get_endpoint_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the health statistics of every backend.
+
+        Returns:
+            EndpointHealth.snapshot() by provider name
+        """
+        return {health.name: health.snapshot() for health in self.health}
@@ -0,0 +1,323 @@
+"""
+Local tool call validation.
+
+Provides compiled JSON schema validators for tool arguments and an edit
+distance index for resolving misspelled tool names, so that well formed tool
+calls can be checked and repaired without another LLM round-trip.
+"""
+
+import json
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import jsonschema
+except ImportError:
+    jsonschema = None
+
+# A validator returns the list of problems found, empty when the value is valid
+Validator = Callable[[Any], List[str]]
+
+_TYPE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    'string': lambda v: isinstance(v, str),
+    'integer': lambda v: isinstance(v, int) and not isinstance(v, bool),
+    'number': lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    'boolean': lambda v: isinstance(v, bool),
+    'object': lambda v: isinstance(v, dict),
+    'array': lambda v: isinstance(v, list),
+    'null': lambda v: v is None,
+}
+
+def _compile_node(schema: Dict[str, Any], path: str) -> Validator:
+    """
+    Compile one schema node into a validator closure.
+
+    Supports the subset of JSON schema produced for MCP tools: type, enum,
+    properties, required, additionalProperties, items and anyOf. Unknown
+    keywords are ignored.
+
+    Args:
+        schema: Schema node
+        path: Location of the node, used in error messages
+
+    Returns:
+        Validator for the node
+    """
+    if not isinstance(schema, dict):
+        return lambda value: []
+
+    checks: List[Validator] = []
+
+    types = schema.get('type')
+    if types:
+        type_names = [types] if isinstance(types, str) else list(types)
+        type_checks = [_TYPE_CHECKS[name] for name in type_names if name in _TYPE_CHECKS]
+        if type_checks:
+            def check_type(value, type_checks=type_checks, type_names=type_names):
+                if any(check(value) for check in type_checks):
+                    return []
+                return [f"{path}: expected {'/'.join(type_names)}, got {type(value).__name__}"]
+            checks.append(check_type)
+
+    if 'enum' in schema:
+        allowed = list(schema['enum'])
+        checks.append(lambda value: [] if value in allowed else [f"{path}: {value!r} is not one of {allowed}"])
+
+    if 'anyOf' in schema:
+        options = [_compile_node(option, path) for option in schema['anyOf']]
+        def check_any_of(value):
+            errors = [option(value) for option in options]
+            return [] if any(not e for e in errors) else [f"{path}: does not match any allowed schema"]
+        checks.append(check_any_of)
+
+    properties = schema.get('properties')
+    required = schema.get('required', [])
+    additional = schema.get('additionalProperties', True)
+    if properties is not None or required or additional is False:
+        property_validators = {
+            name: _compile_node(sub_schema, f"{path}.{name}")
+            for name, sub_schema in (properties or {}).items()
+        }
+        def check_object(value):
+            if not isinstance(value, dict):
+                return []
+            errors = [f"{path}: missing required property '{name}'" for name in required if name not in value]
+            for name, item in value.items():
+                validator = property_validators.get(name)
+                if validator is not None:
+                    errors.extend(validator(item))
+                elif additional is False:
+                    errors.append(f"{path}: unexpected property '{name}'")
+            return errors
+        checks.append(check_object)
+
+    if isinstance(schema.get('items'), dict):
+        item_validator = _compile_node(schema['items'], f"{path}[]")
+        def check_items(value):
+            if not isinstance(value, list):
+                return []
+            errors = []
+            for item in value:
+                errors.extend(item_validator(item))
+            return errors
+        checks.append(check_items)
+
+    def validate(value):
+        for check in checks:
+            errors = check(value)
+            if errors:
+                # Later checks usually repeat the same problem, report the first one
+                return errors
+        return []
+    return validate
+
+def compile_validator(schema: Optional[Dict[str, Any]]) -> Validator:
+    """
+    Compile a JSON schema into a validator function.
+
+    Uses the jsonschema package when it is installed, and the built-in
+    compiler for the common subset otherwise.
+
+    Args:
+        schema: JSON schema of the tool parameters
+
+    Returns:
+        Function returning the list of validation errors for a value
+    """
+    schema = schema or {'type': 'object'}
+    if jsonschema is not None:
+        try:
+            validator_cls = jsonschema.validators.validator_for(schema)
+            compiled = validator_cls(schema)
+            return lambda value: [error.message for error in compiled.iter_errors(value)]
+        except Exception:
+            # Fall back to the built-in compiler for schemas jsonschema rejects
+            pass
+    return _compile_node(schema, 'arguments')
+
+def coerce_arguments(arguments: Dict[str, Any], schema: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], int]:
+    """
+    Coerce argument values to the primitive types declared by the schema.
+
+    Fixes the common mistakes of LLM written tool calls, such as numbers and
+    booleans passed as strings or objects passed as JSON strings.
+
+    Args:
+        arguments: Tool call arguments
+        schema: JSON schema of the tool parameters
+
+    Returns:
+        Tuple of (coerced arguments, number of values changed)
+    """
+    properties = (schema or {}).get('properties', {})
+    coerced = dict(arguments)
+    changed = 0
+
+    for name, value in arguments.items():
+        expected = properties.get(name, {}).get('type')
+        if not isinstance(expected, str) or not isinstance(value, str) or expected == 'string':
+            continue
+        text = value.strip()
+        try:
+            if expected == 'integer':
+                new_value = int(text)
+            elif expected == 'number':
+                new_value = float(text)
+            elif expected == 'boolean' and text.lower() in ('true', 'false'):
+                new_value = text.lower() == 'true'
+            elif expected in ('object', 'array'):
+                new_value = json.loads(text)
+                if not _TYPE_CHECKS[expected](new_value):
+                    continue
+            else:
+                continue
+        except ValueError:
+            continue
+        coerced[name] = new_value
+        changed += 1
+
+    return coerced, changed
+
+def edit_distance(a: str, b: str, max_distance: Optional[int] = None) -> int:
+    """
+    Compute the Levenshtein distance between two strings.
+
+    Args:
+        a: First string
+        b: Second string
+        max_distance: Optional bound, returns max_distance + 1 as soon as it is exceeded
+
+    Returns:
+        Number of single character insertions, deletions and substitutions
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if max_distance is not None and len(a) - len(b) > max_distance:
+        return max_distance + 1
+
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            ))
+        if max_distance is not None and min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+def _normalize_name(name: str) -> str:
+    """Normalize a tool name so that case and separator differences don't count."""
+    return name.strip().lower().replace('-', '_').replace(' ', '_')
+
+class ToolNameIndex:
+    """
+    Fuzzy lookup of tool names by edit distance.
+
+    Names are matched after normalizing case and separators, and a match is
+    only accepted when the distance is small relative to the name length and
+    clearly better than the runner-up.
+    """
+
+    def __init__(self, names: Sequence[str], max_ratio: float = 0.34):
+        """
+        Build the index.
+
+        Args:
+            names: Valid tool names
+            max_ratio: Maximum accepted distance as a fraction of the longer name
+        """
+        self.names = list(names)
+        self.max_ratio = max_ratio
+        self._normalized: Dict[str, str] = {}
+        for name in self.names:
+            self._normalized.setdefault(_normalize_name(name), name)
+
+    def find(self, name: str) -> Optional[str]:
+        """
+        Find the valid tool name closest to a possibly misspelled one.
+
+        Args:
+            name: Tool name written by the model
+
+        Returns:
+            The matching tool name, or None if there is no confident match
+        """
+        if not name:
+            return None
+        normalized = _normalize_name(name)
+        if normalized in self._normalized:
+            return self._normalized[normalized]
+
+        # Tolerate namespaced names such as "server.tool_name"
+        for separator in ('.', '/', ':'):
+            if separator in normalized:
+                suffix = normalized.rsplit(separator, 1)[-1]
+                if suffix in self._normalized:
+                    return self._normalized[suffix]
+
+        best_name, best_distance, runner_up = None, None, None
+        for candidate_normalized, candidate in self._normalized.items():
+            limit = int(max(len(normalized), len(candidate_normalized)) * self.max_ratio)
+            distance = edit_distance(normalized, candidate_normalized, limit)
+            if distance > limit:
+                continue
+            if best_distance is None or distance < best_distance:
+                best_name, runner_up, best_distance = candidate, best_distance, distance
+            elif runner_up is None or distance < runner_up:
+                runner_up = distance
+
+        if best_name is None or (runner_up is not None and runner_up == best_distance):
+            # No candidate, or an ambiguous tie between candidates
+            return None
+        return best_name
+
+class ToolValidatorCache:
+    """
+    Per-tool cache of compiled argument validators and of the name index.
+
+    Validators are keyed by tool name and reused as long as the tool's schema
+    object is unchanged, which holds for as long as the tool registry keeps
+    the same tool list.
+    """
+
+    def __init__(self):
+        """Initialize an empty cache."""
+        self._validators: Dict[str, Tuple[Any, Validator]] = {}
+        self._index: Optional[Tuple[Tuple[str, ...], ToolNameIndex]] = None
+
+    def get_validator(self, tool_name: str, schema: Optional[Dict[str, Any]]) -> Validator:
+        """
+        Get the compiled validator for a tool's parameters.
+
+        Args:
+            tool_name: Name of the tool
+            schema: JSON schema of the tool parameters
+
+        Returns:
+            The validator
+        """
+        cached = self._validators.get(tool_name)
+        # Holding the schema object keeps its identity unique while it is cached
+        if cached is not None and cached[0] is schema:
+            return cached[1]
+        validator = compile_validator(schema)
+        self._validators[tool_name] = (schema, validator)
+        return validator
+
+    def get_name_index(self, names: Sequence[str]) -> ToolNameIndex:
+        """
+        Get the name index for a set of tool names.
+
+        Args:
+            names: Valid tool names
+
+        Returns:
+            The index, rebuilt only when the names change
+        """
+        key = tuple(names)
+        if self._index is None or self._index[0] != key:
+            self._index = (key, ToolNameIndex(key))
+        return self._index[1]
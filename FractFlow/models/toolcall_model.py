@@ -1,14 +1,20 @@
 import json
 import uuid
+import asyncio
 from typing import List, Dict, Any, Optional, Tuple
 from json_repair import repair_json
-from tokencost import calculate_prompt_cost
 
-from openai import OpenAI
+from openai import AsyncOpenAI
 
 from ..infra.config import ConfigManager
 from ..infra.error_handling import handle_error
 from ..infra.logging_utils import get_logger
+from ..infra import usage
+from .openai_client import get_async_openai_client
+from .tool_validation import ToolValidatorCache, coerce_arguments
+from .completion_cache import get_completion_cache
+from .rate_limiter import PRIORITY_BACKGROUND, create_chat_completion, get_rate_limiter
+from ..conversation.compaction import TokenCounter
 
 class ToolCallHelper_v1:
     """
@@ -31,7 +37,8 @@ class ToolCallHelper_v1:
         self.config.push_to_call_path("tool_call_helper")
         
         # Initialize logger
-        self.logger = get_logger(self.config.get_call_path())
+        self.call_path = self.config.get_call_path()
+        self.logger = get_logger(self.call_path)
         
         self.client = None
         
@@ -41,25 +48,25 @@ class ToolCallHelper_v1:
         self.api_key = self.config.get('tool_calling.api_key', self.config.get('deepseek.api_key'))
         self.model = self.config.get('tool_calling.model', 'deepseek-chat')
         self.temperature = self.config.get('tool_calling.temperature', 0)
+        self.token_counter = TokenCounter(self.config.get('history.tokenizer_encoding', 'cl100k_base'))
+        self.completion_cache = get_completion_cache(self.config, 'tool_calling')
+        self.rate_limiter = get_rate_limiter(self.config)
         # self.default_max_tokens = self.config.get('tool_calling.default_max_tokens', 8192)
         self.logger.debug("Tool call helper initialized", {
             "model": self.model,
             "max_retries": self.max_retries
         })
         
-    async def initialize_client(self) -> OpenAI:
+    async def initialize_client(self) -> AsyncOpenAI:
         """
-        Initialize the OpenAI-compatible client.
+        Get the async OpenAI-compatible client for the running event loop.
         
         Returns:
-            Configured OpenAI client
+            AsyncOpenAI client sharing the process-wide connection pool
         """
         if self.client is None:
             self.logger.debug("Initializing OpenAI client", {"base_url": self.base_url})
-            self.client = OpenAI(
-                base_url=self.base_url,
-                api_key=self.api_key
-            )
+        self.client = get_async_openai_client(self.base_url, self.api_key)
         return self.client
         
     def create_system_prompt(self, tools: List[Dict[str, Any]]) -> str:
@@ -72,19 +79,7 @@ class ToolCallHelper_v1:
         Returns:
             System prompt for the tool calling model
         """
-        # List all available tools with names and descriptions
-        tool_details = []
-        for tool in tools:
-            tool_name = tool['function']['name']
-            description = tool['function'].get('description', 'No description available')
-            
-            # List all parameters for this tool
-            params = tool['function'].get('parameters', {}).get('properties', {})
-            param_list = ", ".join(params.keys()) if params else "No parameters"
-            
-            tool_details.append(f"- {tool_name}: {description}\n  Parameters: {param_list}")
-        
-        tools_text = "\n".join(tool_details)
+        tools_text = self._format_tool_list(tools)
         
         self.logger.debug("Creating system prompt", {"tools_count": len(tools)})
         
@@ -130,6 +125,90 @@ The number of tool calls in the array should match exactly what's needed - don't
 For simple requests needing only one tool call, return an array with just one element.
 Output JSON only, no other text. The arguments must be a valid JSON object."""
     
+    def create_batch_system_prompt(self, tools: List[Dict[str, Any]]) -> str:
+        """
+        Create a system prompt for converting several numbered requests at once.
+        
+        Args:
+            tools: List of available tools
+            
+        Returns:
+            System prompt for the tool calling model
+        """
+        tools_text = self._format_tool_list(tools)
+        
+        json_example = """{
+    "requests": [
+        {
+            "request": 0,
+            "tool_calls": [
+                {
+                    "function": {
+                        "name": "tool_name",
+                        "arguments": {
+                            "param1": "value1"
+                        }
+                    }
+                }
+            ]
+        },
+        {
+            "request": 1,
+            "tool_calls": [
+                {
+                    "function": {
+                        "name": "another_tool_name",
+                        "arguments": {
+                            "param1": "value1"
+                        }
+                    }
+                }
+            ]
+        }
+    ]
+}"""
+
+        return f"""You are a tool calling expert. You will receive several numbered requests. Your task is to generate correct JSON format tool calls for EACH request, based ONLY on the tools that are available.
+
+AVAILABLE TOOLS (ONLY USE THESE - DO NOT INVENT NEW ONES):
+{tools_text}
+
+IMPORTANT RULES:
+1. ONLY use tool names from the list above - never invent new tool names
+2. ONLY use parameter names that are listed for each tool - never invent new parameters
+3. If a requested tool doesn't exactly match any available tool, use the closest matching one
+4. Convert every request separately and keep its number - never merge requests
+5. A request may need several tool calls, list all of them in its own tool_calls array
+
+You must output strictly in the following JSON format:
+{json_example}
+
+Output JSON only, no other text. The arguments must be a valid JSON object."""
+    
+    def _format_tool_list(self, tools: List[Dict[str, Any]]) -> str:
+        """
+        List the available tools with their descriptions and parameter names.
+        
+        Args:
+            tools: List of available tools
+            
+        Returns:
+            One entry per tool
+        """
+        # List all available tools with names and descriptions
+        tool_details = []
+        for tool in tools:
+            tool_name = tool['function']['name']
+            description = tool['function'].get('description', 'No description available')
+            
+            # List all parameters for this tool
+            params = tool['function'].get('parameters', {}).get('properties', {})
+            param_list = ", ".join(params.keys()) if params else "No parameters"
+            
+            tool_details.append(f"- {tool_name}: {description}\n  Parameters: {param_list}")
+        
+        return "\n".join(tool_details)
+    
     def _estimate_token_count(self, messages: List[Dict[str, str]]) -> int:
         """
         Estimate the token count for a given set of messages.
@@ -140,25 +219,7 @@ Output JSON only, no other text. The arguments must be a valid JSON object."""
         Returns:
             Estimated token count
         """
-        return sum(len(m.get("content", "")) for m in messages) // 2
-        # try:
-        #     # Use tokencost to calculate the token count
-        #     # We use the model name to determine the encoding
-        #     token_cost = calculate_prompt_cost(messages, self.model)
-        #     # Convert the cost to token count (approximate)
-        #     # This is a rough estimate based on pricing
-        #     estimated_tokens = int(token_cost * 1000 * 1000)  # Convert from $ to token count approximation
-            
-        #     self.logger.debug("Estimated token count", {
-        #         "messages_count": len(messages),
-        #         "estimated_tokens": estimated_tokens
-        #     })
-            
-        #     return estimated_tokens
-        # except Exception as e:
-        #     self.logger.warning(f"Error estimating token count", {"error": str(e)})
-        #     # Return a conservative estimate
-        #     return sum(len(m.get("content", "")) for m in messages) // 2
+        return self.token_counter.count_messages(messages)
     
     def _calculate_max_tokens(self, messages: List[Dict[str, str]]) -> int:
         """
@@ -204,9 +265,8 @@ Output JSON only, no other text. The arguments must be a valid JSON object."""
             - The exception if an error occurred, or None if successful
         """
         try:
-            # Make sure client is initialized
-            if not self.client:
-                await self.initialize_client()
+            # Get the client bound to the running event loop
+            client = await self.initialize_client()
                 
             # Add model if not provided
             if 'model' not in kwargs:
@@ -222,9 +282,17 @@ Output JSON only, no other text. The arguments must be a valid JSON object."""
                 "model": kwargs.get('model'),
                 "max_tokens": kwargs.get('max_tokens')
             })
-            result = self.client.chat.completions.create(**kwargs)
+            # Helper calls yield to the orchestrators' requests when the provider is rate limited
+            async def create() -> Any:
+                response = await create_chat_completion(client, kwargs, self.rate_limiter, PRIORITY_BACKGROUND)
+                usage.record(self.call_path, kwargs.get('model'), response)
+                return response
+            if self.completion_cache is not None:
+                result = await self.completion_cache.get_or_create(kwargs, create, client.base_url)
+            else:
+                result = await create()
             self.logger.debug("API call successful")
-            return await result if hasattr(result, "__await__") else result, None
+            return result, None
         except Exception as e:
             error = handle_error(e, {"kwargs": kwargs})
             self.logger.error(f"API call error", {"error": str(error)})
@@ -256,57 +324,72 @@ Output JSON only, no other text. The arguments must be a valid JSON object."""
         try:
             self.logger.debug("Parsing model response")
             model_response = json.loads(content)
+        except json.JSONDecodeError as e:
+            self.logger.error(f"JSON parsing error", {"error": str(e)})
+            return None
+        
+        return self._extract_tool_calls(model_response)
+    
+    def _extract_tool_calls(self, model_response: Any) -> Optional[List[Dict[str, Any]]]:
+        """
+        Turn a parsed tool calling response into tool calls in OpenAI format.
+        
+        Args:
+            model_response: JSON object with a tool_calls array or a single function object
             
-            # Process multiple tool calls
-            if "tool_calls" in model_response and isinstance(model_response["tool_calls"], list):
-                # Handle standard multiple tool calls format
-                tool_calls = []
-                for i, call_data in enumerate(model_response["tool_calls"]):
-                    if "function" not in call_data:
-                        self.logger.error("Tool call missing function object", {"index": i})
-                        continue
-                        
-                    function_data = call_data.get("function", {})
+        Returns:
+            List of tool calls or None if the object has neither
+        """
+        if not isinstance(model_response, dict):
+            self.logger.error("Response is not a JSON object")
+            return None
+        
+        # Process multiple tool calls
+        if "tool_calls" in model_response and isinstance(model_response["tool_calls"], list):
+            # Handle standard multiple tool calls format
+            tool_calls = []
+            for i, call_data in enumerate(model_response["tool_calls"]):
+                if "function" not in call_data:
+                    self.logger.error("Tool call missing function object", {"index": i})
+                    continue
                     
-                    # Ensure arguments is a proper dictionary
-                    if "arguments" in function_data and isinstance(function_data["arguments"], str):
-                        try:
-                            # Convert arguments string to dictionary if needed (for backward compatibility)
-                            function_data["arguments"] = json.loads(function_data["arguments"])
-                        except json.JSONDecodeError:
-                            self.logger.error("Failed to parse arguments string as JSON", {"index": i})
-                            continue
-                            
-                    # Add ID and type fields to each call
-                    call_id = self.generate_call_id()
-                    tool_call = {
-                        "id": call_id,
-                        "type": "function",
-                        "function": function_data
-                    }
-                    tool_calls.append(tool_call)
+                function_data = call_data.get("function", {})
                 
-                self.logger.debug("Parsed tool calls", {"count": len(tool_calls)})
-                return tool_calls
-                
-            # Handle single tool call format (for backward compatibility)
-            elif "function" in model_response:
-                # Convert single tool call to list format
+                # Ensure arguments is a proper dictionary
+                if "arguments" in function_data and isinstance(function_data["arguments"], str):
+                    try:
+                        # Convert arguments string to dictionary if needed (for backward compatibility)
+                        function_data["arguments"] = json.loads(function_data["arguments"])
+                    except json.JSONDecodeError:
+                        self.logger.error("Failed to parse arguments string as JSON", {"index": i})
+                        continue
+                        
+                # Add ID and type fields to each call
                 call_id = self.generate_call_id()
                 tool_call = {
                     "id": call_id,
                     "type": "function",
-                    "function": model_response.get("function", {})
+                    "function": function_data
                 }
-                
-                self.logger.debug("Parsed single tool call")
-                return [tool_call]
-            else:
-                self.logger.error("Response does not contain tool_calls array or function object")
-                return None
-                
-        except json.JSONDecodeError as e:
-            self.logger.error(f"JSON parsing error", {"error": str(e)})
+                tool_calls.append(tool_call)
+            
+            self.logger.debug("Parsed tool calls", {"count": len(tool_calls)})
+            return tool_calls
+            
+        # Handle single tool call format (for backward compatibility)
+        elif "function" in model_response:
+            # Convert single tool call to list format
+            call_id = self.generate_call_id()
+            tool_call = {
+                "id": call_id,
+                "type": "function",
+                "function": model_response.get("function", {})
+            }
+            
+            self.logger.debug("Parsed single tool call")
+            return [tool_call]
+        else:
+            self.logger.error("Response does not contain tool_calls array or function object")
             return None
     
     async def call_tool(self, instruction: str, tools: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
@@ -397,6 +480,113 @@ Output JSON only, no other text. The arguments must be a valid JSON object."""
         stats["success"] = False
         return [], stats
     
+    async def call_tool_batch(self, instructions: List[str], tools: List[Dict[str, Any]]) -> List[Tuple[List[Dict[str, Any]], Dict[str, Any]]]:
+        """
+        Convert several instructions into tool calls with a single completion.
+        
+        Each instruction is validated on its own. Instructions the batched
+        completion produced no valid tool calls for are converted again one by
+        one with call_tool, so a bad instruction doesn't fail the others.
+        
+        Args:
+            instructions: The instructions to execute
+            tools: List of available tools
+            
+        Returns:
+            One (tool calls, stats) tuple per instruction, in the same order
+        """
+        available_tools = [tool['function']['name'] for tool in tools]
+        results: List[Optional[Tuple[List[Dict[str, Any]], Dict[str, Any]]]] = [None] * len(instructions)
+        
+        self.logger.debug("Starting batched tool call generation", {
+            "instructions": len(instructions),
+            "tools_available": len(tools)
+        })
+        
+        requests_text = "\n\n".join(f"REQUEST {i}:\n{instruction}" for i, instruction in enumerate(instructions))
+        response, error = await self._create_chat_completion(
+            messages=[
+                {"role": "system", "content": self.create_batch_system_prompt(tools)},
+                {"role": "user", "content": requests_text}
+            ],
+            response_format={"type": "json_object"}
+        )
+        
+        batch = self._parse_batch_response(response, len(instructions)) if not error else {}
+        for index, tool_calls in batch.items():
+            stats = {
+                "attempts": 1,
+                "success": False,
+                "valid_calls": 0,
+                "invalid_calls": 0,
+                "total_calls": len(tool_calls),
+                "errors": [],
+                "batched": True
+            }
+            valid_tool_calls = []
+            for call in tool_calls:
+                if self._validate_tool_call(call, available_tools):
+                    valid_tool_calls.append(call)
+                    stats["valid_calls"] += 1
+                else:
+                    stats["invalid_calls"] += 1
+            if valid_tool_calls:
+                stats["success"] = True
+                results[index] = (valid_tool_calls, stats)
+        
+        retry_indices = [i for i, result in enumerate(results) if result is None]
+        if retry_indices:
+            self.logger.warning("Batched tool calling left requests unresolved, converting them one by one", {
+                "unresolved": retry_indices,
+                "error": str(error) if error else None
+            })
+            retried = await asyncio.gather(*(self.call_tool(instructions[i], tools) for i in retry_indices))
+            for index, (tool_calls, stats) in zip(retry_indices, retried):
+                stats["batched"] = False
+                results[index] = (tool_calls, stats)
+        
+        return results
+    
+    def _parse_batch_response(self, response: Any, request_count: int) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Parse a batched tool calling response.
+        
+        Args:
+            response: Raw response from the model
+            request_count: Number of requests that were sent
+            
+        Returns:
+            Tool calls by request index, requests missing from the response are left out
+        """
+        if not response or not response.choices or not response.choices[0].message.content:
+            self.logger.warning("Empty response from model")
+            return {}
+        
+        content = repair_json(response.choices[0].message.content.strip())
+        try:
+            model_response = json.loads(content) if content else None
+        except json.JSONDecodeError as e:
+            self.logger.error(f"JSON parsing error", {"error": str(e)})
+            return {}
+        if not isinstance(model_response, dict) or not isinstance(model_response.get("requests"), list):
+            self.logger.error("Batched response does not contain a requests array")
+            return {}
+        
+        batch = {}
+        for position, entry in enumerate(model_response["requests"]):
+            if not isinstance(entry, dict):
+                continue
+            index = entry.get("request", position)
+            if not isinstance(index, int) or not 0 <= index < request_count or index in batch:
+                self.logger.warning("Ignoring batched entry with an unknown request number", {"request": index})
+                continue
+            tool_calls = self._extract_tool_calls(entry)
+            if tool_calls:
+                batch[index] = tool_calls
+        
+        self.logger.debug("Parsed batched tool calls", {"requests": len(batch)})
+        return batch
+    
     async def _internal_call_tool(self, instruction: str, tools: List[Dict[str, Any]]) -> Tuple[Optional[List[Dict[str, Any]]], Optional[Exception]]:
         """
         Internal method to call the model and get tool call responses.
@@ -599,7 +789,8 @@ class ToolCallHelper_v2:
         self.config.push_to_call_path("tool_call_helper_v2")
         
         # Initialize logger
-        self.logger = get_logger(self.config.get_call_path())
+        self.call_path = self.config.get_call_path()
+        self.logger = get_logger(self.call_path)
         
         # Load configuration with defaults
         self.max_retries = self.config.get('tool_calling.max_retries', 5)
@@ -607,27 +798,38 @@ class ToolCallHelper_v2:
         self.api_key = self.config.get('tool_calling.api_key', self.config.get('deepseek.api_key'))
         self.model = self.config.get('tool_calling.model', 'deepseek-chat')
         self.temperature = self.config.get('tool_calling.temperature', 0)
+        self.token_counter = TokenCounter(self.config.get('history.tokenizer_encoding', 'cl100k_base'))
+        self.completion_cache = get_completion_cache(self.config, 'tool_calling')
+        self.rate_limiter = get_rate_limiter(self.config)
         
         self.client = None
         
+        # Compiled argument validators and tool name index, reused across calls
+        self._validator_cache = ToolValidatorCache()
+        
+        # How each tool call was resolved since the helper was created
+        self.path_stats = {
+            "fast_path": 0,     # Valid as written, no repair needed
+            "local_repair": 0,  # Repaired locally without calling the LLM
+            "llm_repair": 0,    # Tool name resolved by the LLM
+            "failed": 0         # Could not be repaired
+        }
+        
         self.logger.debug("ToolCallHelper_v2 initialized", {
             "model": self.model,
             "max_retries": self.max_retries
         })
     
-    async def initialize_client(self) -> OpenAI:
+    async def initialize_client(self) -> AsyncOpenAI:
         """
-        Initialize the OpenAI-compatible client.
+        Get the async OpenAI-compatible client for the running event loop.
         
         Returns:
-            Configured OpenAI client
+            AsyncOpenAI client sharing the process-wide connection pool
         """
         if self.client is None:
             self.logger.debug("Initializing OpenAI client", {"base_url": self.base_url})
-            self.client = OpenAI(
-                base_url=self.base_url,
-                api_key=self.api_key
-            )
+        self.client = get_async_openai_client(self.base_url, self.api_key)
         return self.client
 
     async def _create_chat_completion(self, **kwargs) -> Tuple[Optional[Any], Optional[Exception]]:
@@ -643,9 +845,8 @@ class ToolCallHelper_v2:
             - The exception if an error occurred, or None if successful
         """
         try:
-            # Make sure client is initialized
-            if not self.client:
-                await self.initialize_client()
+            # Get the client bound to the running event loop
+            client = await self.initialize_client()
                 
             # Add model if not provided
             if 'model' not in kwargs:
@@ -654,7 +855,7 @@ class ToolCallHelper_v2:
             
             # Set max_tokens dynamically if not explicitly provided
             if 'max_tokens' not in kwargs and 'messages' in kwargs:
-                input_tokens = sum(len(m.get("content", "")) for m in kwargs['messages']) // 4  # Rough estimate
+                input_tokens = self.token_counter.count_messages(kwargs['messages'])
                 max_output_tokens = max(512, 8192 - input_tokens - 50)  # 50 tokens buffer
                 kwargs['max_tokens'] = max_output_tokens
                 
@@ -663,9 +864,17 @@ class ToolCallHelper_v2:
                 "model": kwargs.get('model'),
                 "max_tokens": kwargs.get('max_tokens')
             })
-            result = self.client.chat.completions.create(**kwargs)
+            # Helper calls yield to the orchestrators' requests when the provider is rate limited
+            async def create() -> Any:
+                response = await create_chat_completion(client, kwargs, self.rate_limiter, PRIORITY_BACKGROUND)
+                usage.record(self.call_path, kwargs.get('model'), response)
+                return response
+            if self.completion_cache is not None:
+                result = await self.completion_cache.get_or_create(kwargs, create, client.base_url)
+            else:
+                result = await create()
             self.logger.debug("API call successful")
-            return await result if hasattr(result, "__await__") else result, None
+            return result, None
         except Exception as e:
             error = handle_error(e, {"kwargs": kwargs})
             self.logger.error(f"API call error", {"error": str(error)})
@@ -749,7 +958,10 @@ class ToolCallHelper_v2:
             "validated_calls": 0,
             "repaired_calls": 0,
             "failed_repairs": 0,
-            "param_optimizations": 0
+            "param_optimizations": 0,
+            "fast_path_calls": 0,
+            "local_repairs": 0,
+            "llm_repairs": 0
         }
         
         # Extract available tool names and their parameters
@@ -762,8 +974,10 @@ class ToolCallHelper_v2:
             tool_map[tool_name] = {
                 'parameters': parameters,
                 'description': tool['function'].get('description', ''),
-                'required': tool['function'].get('parameters', {}).get('required', [])
+                'required': tool['function'].get('parameters', {}).get('required', []),
+                'schema': tool['function'].get('parameters')
             }
+        name_index = self._validator_cache.get_name_index(list(tool_map.keys()))
         
         self.logger.debug("Available tools mapped", {
             "tool_count": len(tool_map), 
@@ -815,35 +1029,67 @@ class ToolCallHelper_v2:
                     })
                     arguments = {}
             
+            if not isinstance(arguments, dict):
+                arguments = {}
+            
             # Check if tool exists
             valid_tool_name = tool_name
+            path = "fast_path"
             if tool_name not in tool_map:
                 self.logger.warning(f"Invalid tool name", {
                     "tool": tool_name,
                     "available_tools": list(tool_map.keys())
                 })
                 
-                # Find closest match
-                self.logger.debug(f"Attempting to find closest tool match", {"invalid_tool": tool_name})
-                closest_tool = await self._find_closest_tool(tool_name, tool_map, function_data)
+                # Try the local edit distance index first, and only ask the LLM if it has no confident match
+                closest_tool = name_index.find(tool_name)
+                path = "local_repair"
+                if not closest_tool:
+                    self.logger.debug(f"Attempting to find closest tool match", {"invalid_tool": tool_name})
+                    closest_tool = await self._find_closest_tool(tool_name, tool_map, function_data)
+                    path = "llm_repair"
                 
                 if closest_tool:
                     valid_tool_name = closest_tool
                     repair_stats["repaired_calls"] += 1
                     self.logger.info(f"Repaired invalid tool name", {
                         "original": tool_name,
-                        "repaired": closest_tool
+                        "repaired": closest_tool,
+                        "path": path
                     })
                 else:
                     self.logger.error(f"Failed to find closest tool match", {"invalid_tool": tool_name})
                     repair_stats["failed_repairs"] += 1
+                    self.path_stats["failed"] += 1
                     continue
             
+            tool_info = tool_map[valid_tool_name]
+            validator = self._validator_cache.get_validator(valid_tool_name, tool_info['schema'])
+            
+            # Coerce mistyped values such as numbers written as strings before validating
+            validation_errors = validator(arguments)
+            if validation_errors:
+                arguments, coerced = coerce_arguments(arguments, tool_info['schema'])
+                if coerced:
+                    validation_errors = validator(arguments)
+            
+            known_params = not tool_info['parameters'] or all(name in tool_info['parameters'] for name in arguments)
+            
             # Validate and optimize parameters
             valid_args = {}
-            if valid_tool_name in tool_map:
-                valid_params = tool_map[valid_tool_name]['parameters']
-                required_params = tool_map[valid_tool_name]['required']
+            if not validation_errors and known_params:
+                # Fast path: the arguments already match the schema
+                valid_args = dict(arguments)
+            else:
+                if path == "fast_path":
+                    path = "local_repair"
+                self.logger.debug(f"Arguments failed validation", {
+                    "tool": valid_tool_name,
+                    "errors": validation_errors
+                })
+                
+                valid_params = tool_info['parameters']
+                required_params = tool_info['required']
                 
                 self.logger.debug(f"Validating parameters", {
                     "tool": valid_tool_name,
@@ -902,10 +1148,13 @@ class ToolCallHelper_v2:
             
             result_tool_calls.append(repaired_call)
             repair_stats["validated_calls"] += 1
+            repair_stats[{"fast_path": "fast_path_calls", "local_repair": "local_repairs", "llm_repair": "llm_repairs"}[path]] += 1
+            self.path_stats[path] += 1
             self.logger.debug(f"Validated tool call", {
                 "index": call_idx,
                 "tool": valid_tool_name,
-                "param_count": len(valid_args)
+                "param_count": len(valid_args),
+                "path": path
             })
         
         # Restore optimized parameter values
@@ -928,7 +1177,8 @@ class ToolCallHelper_v2:
         self.logger.info(f"Repair instruction completed", {
             "original_count": len(parsed_json.get("tool_calls", [])),
             "repaired_count": len(result_tool_calls),
-            "stats": repair_stats
+            "stats": repair_stats,
+            "path_stats": self.path_stats
         })
         
         return result_tool_calls, repair_stats
@@ -1008,33 +1258,14 @@ What is the closest matching tool from the available tools list? Respond with ON
                     "valid_tools": list(tool_map.keys())
                 })
                 
-                # Fall back to best effort string matching
-                self.logger.debug(f"Falling back to string similarity matching")
-                best_match = None
-                best_score = 0
-                for tool_name in tool_map.keys():
-                    # Simple similarity score based on common characters
-                    score = sum(1 for a, b in zip(invalid_tool, tool_name) if a == b)
-                    if score > best_score:
-                        best_score = score
-                        best_match = tool_name
-                
-                # Only return if we have a reasonable match
-                similarity_threshold = len(invalid_tool) * 0.3
-                if best_score > similarity_threshold:
-                    self.logger.info(f"Found similar tool via string matching", {
-                        "invalid": invalid_tool,
-                        "match": best_match,
-                        "score": best_score,
-                        "threshold": similarity_threshold
+                # The suggestion may be a near miss of a valid name, e.g. with quotes or different case
+                best_match = self._validator_cache.get_name_index(list(tool_map.keys())).find(suggested_tool.strip('`"\' '))
+                if best_match:
+                    self.logger.info(f"Matched LLM suggestion to a valid tool", {
+                        "suggestion": suggested_tool,
+                        "match": best_match
                     })
                     return best_match
-                else:
-                    self.logger.warning(f"No similar tool found", {
-                        "invalid": invalid_tool,
-                        "best_score": best_score,
-                        "threshold": similarity_threshold
-                    })
                     
                 return None
                 
@@ -0,0 +1,17 @@
+"""
+Multi-session agent service.
+
+Serves many concurrent conversations from one process: sessions keep their
+own history and share a pool of warm agents and tool servers.
+"""
+
+from .session_manager import Session, SessionManager, SessionNotFoundError, ServiceOverloadedError
+from .http_app import create_app
+
+__all__ = [
+    'Session',
+    'SessionManager',
+    'SessionNotFoundError',
+    'ServiceOverloadedError',
+    'create_app',
+]
@@ -0,0 +1,123 @@
+"""
+HTTP session service.
+
+FastAPI application exposing a SessionManager: sessions are created and
+queried over HTTP, and query progress can be streamed as server-sent events.
+"""
+
+import json
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+from .session_manager import ServiceOverloadedError, SessionManager, SessionNotFoundError
+
+# Seconds clients are asked to wait before retrying a rejected request
+RETRY_AFTER_SECONDS = 1
+
+class QueryRequest(BaseModel):
+    """Body of the query endpoints."""
+    query: str
+
+def _sse(event: Dict[str, Any]) -> str:
+    """Format an event as a server-sent event."""
+    # Tool results may hold MCP content objects, which are sent as text
+    data = json.dumps(event, ensure_ascii=False, default=str)
+    return f"event: {event.get('type', 'message')}\ndata: {data}\n\n"
+
+def create_app(manager: SessionManager) -> FastAPI:
+    """
+    Create the HTTP application for a session manager.
+
+    Endpoints:
+        POST   /sessions                      create a session
+        GET    /sessions                      list sessions
+        GET    /sessions/{session_id}         describe a session
+        DELETE /sessions/{session_id}         close a session
+        GET    /sessions/{session_id}/history conversation history
+        POST   /sessions/{session_id}/query   answer a query, {"query": str}
+        POST   /sessions/{session_id}/stream  answer a query as server-sent events
+        GET    /health                        load counters
+
+    Rejected requests get status 429 with a Retry-After header, unknown
+    sessions status 404. The session manager is closed when the application
+    shuts down.
+
+    Args:
+        manager: Session manager serving the requests
+
+    Returns:
+        The FastAPI application
+    """
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        yield
+        await manager.close()
+
+    app = FastAPI(title="FractFlow session service", lifespan=lifespan)
+
+    @app.exception_handler(SessionNotFoundError)
+    async def session_not_found(request, exc: SessionNotFoundError):
+        return JSONResponse({"detail": str(exc)}, status_code=404)
+
+    @app.exception_handler(ServiceOverloadedError)
+    async def service_overloaded(request, exc: ServiceOverloadedError):
+        return JSONResponse({"detail": str(exc)}, status_code=429,
+                            headers={"Retry-After": str(RETRY_AFTER_SECONDS)})
+
+    @app.post("/sessions", status_code=201)
+    async def create_session() -> Dict[str, Any]:
+        return manager.create_session().info()
+
+    @app.get("/sessions")
+    async def list_sessions() -> Dict[str, Any]:
+        return {"sessions": manager.list_sessions()}
+
+    @app.get("/sessions/{session_id}")
+    async def get_session(session_id: str) -> Dict[str, Any]:
+        return manager.get_session(session_id).info()
+
+    @app.delete("/sessions/{session_id}", status_code=204)
+    async def close_session(session_id: str) -> None:
+        manager.close_session(session_id)
+
+    @app.get("/sessions/{session_id}/history")
+    async def get_history(session_id: str) -> JSONResponse:
+        messages = manager.get_history(session_id)
+        return JSONResponse(json.loads(json.dumps({"messages": messages}, ensure_ascii=False, default=str)))
+
+    @app.post("/sessions/{session_id}/query")
+    async def query(session_id: str, request: QueryRequest) -> Dict[str, Any]:
+        content = await manager.run_query(session_id, request.query)
+        return {"session_id": session_id, "content": content}
+
+    @app.post("/sessions/{session_id}/stream")
+    async def stream(session_id: str, request: QueryRequest) -> StreamingResponse:
+        events = manager.stream_query(session_id, request.query)
+        # The first event arrives once the query is admitted, so rejections still get a proper status code
+        try:
+            first = await events.__anext__()
+        except StopAsyncIteration:
+            raise HTTPException(status_code=500, detail="Query produced no events")
+
+        async def body() -> AsyncIterator[str]:
+            try:
+                yield _sse(first)
+                async for event in events:
+                    yield _sse(event)
+            finally:
+                # Stops the query if the client went away
+                await events.aclose()
+
+        return StreamingResponse(body(), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    @app.get("/health")
+    async def health() -> Dict[str, Any]:
+        return {"status": "ok", **manager.stats()}
+
+    return app
@@ -0,0 +1,369 @@
+"""
+Session manager.
+
+Hosts many independent conversations on a bounded pool of warm agents.
+Every session only owns its conversation history, which is swapped into a
+leased agent for the duration of a query.
+"""
+
+import time
+import uuid
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from ..agent import Agent
+from ..agent_pool import AgentPool
+from ..conversation.base_history import ConversationHistory
+from ..infra.error_handling import AgentError
+from ..infra.logging_utils import get_logger
+
+class SessionNotFoundError(AgentError):
+    """Raised when a session id is unknown or the session was evicted."""
+    pass
+
+class ServiceOverloadedError(AgentError):
+    """Raised when a query or session is rejected to keep the service responsive."""
+    pass
+
+class Session:
+    """A conversation hosted by the session manager."""
+
+    def __init__(self, session_id: str, max_concurrent_queries: int = 1):
+        """
+        Initialize the session.
+
+        Args:
+            session_id: Unique id of the session
+            max_concurrent_queries: Queries of this session allowed to run at the same time
+        """
+        self.id = session_id
+        self.history: Optional[ConversationHistory] = None  # Created by the first query's agent
+        self.created_at = time.time()
+        self.last_used = time.monotonic()
+        self.active_queries = 0
+        self.pending_queries = 0
+        self.completed_queries = 0
+        self.semaphore = asyncio.Semaphore(max(1, max_concurrent_queries))
+
+    @property
+    def busy(self) -> bool:
+        """Whether a query of the session is running or waiting."""
+        return self.active_queries > 0 or self.pending_queries > 0
+
+    def info(self) -> Dict[str, Any]:
+        """
+        Describe the session.
+
+        Returns:
+            JSON-serializable session summary
+        """
+        return {
+            "session_id": self.id,
+            "created_at": self.created_at,
+            "idle_seconds": round(time.monotonic() - self.last_used, 3),
+            "messages": len(self.history.get_messages()) if self.history else 0,
+            "active_queries": self.active_queries,
+            "pending_queries": self.pending_queries,
+            "completed_queries": self.completed_queries
+        }
+
+class SessionManager:
+    """
+    Runs queries of many sessions on a shared AgentPool.
+
+    The pool size bounds how many queries run at the same time across all
+    sessions. Queries beyond that wait for an agent, up to
+    max_pending_queries waiting queries; further queries are rejected with
+    ServiceOverloadedError so that callers can back off. Each session runs
+    at most max_queries_per_session queries at a time, so by default the
+    turns of a conversation are processed in order.
+
+    Sessions that have been idle for session_idle_timeout seconds are
+    evicted together with their history.
+    """
+
+    def __init__(self,
+                 pool: AgentPool,
+                 max_sessions: int = 1000,
+                 session_idle_timeout: Optional[float] = 1800.0,
+                 max_queries_per_session: int = 1,
+                 max_pending_queries: int = 64,
+                 name: str = 'session_manager'):
+        """
+        Initialize the session manager.
+
+        Args:
+            pool: Pool of warm agents shared by all sessions
+            max_sessions: Maximum number of sessions kept at the same time
+            session_idle_timeout: Seconds an idle session is kept, None keeps sessions until closed
+            max_queries_per_session: Queries of one session allowed to run at the same time
+            max_pending_queries: Queries allowed to wait for an agent or their session
+            name: Name used for logging
+        """
+        self.pool = pool
+        self.max_sessions = max(1, max_sessions)
+        self.session_idle_timeout = session_idle_timeout
+        self.max_queries_per_session = max(1, max_queries_per_session)
+        self.max_pending_queries = max(0, max_pending_queries)
+        self.logger = get_logger(name)
+
+        self._sessions: Dict[str, Session] = {}
+        self._pending = 0
+        self._active = 0
+        self._rejected = 0
+        self._evicted = 0
+        self._reaper: Optional[asyncio.Task] = None
+        self._closed = False
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the load of the service.
+
+        Returns:
+            Session, query and agent counters
+        """
+        return {
+            "sessions": len(self._sessions),
+            "active_queries": self._active,
+            "pending_queries": self._pending,
+            "rejected_queries": self._rejected,
+            "evicted_sessions": self._evicted,
+            "agents": self.pool.size,
+            "max_agents": self.pool.max_size
+        }
+
+    def _ensure_reaper(self) -> None:
+        """Start the idle session eviction task if it is not running yet."""
+        if self.session_idle_timeout is None or self._reaper is not None:
+            return
+        self._reaper = asyncio.create_task(self._reap_idle())
+
+    async def _reap_idle(self) -> None:
+        """Periodically drop sessions that have been idle for too long."""
+        interval = max(1.0, min(self.session_idle_timeout / 2, 60.0))
+        while not self._closed:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            expired = [
+                session for session in self._sessions.values()
+                if not session.busy and now - session.last_used >= self.session_idle_timeout
+            ]
+            for session in expired:
+                self._drop(session, "idle")
+
+    def _drop(self, session: Session, reason: str) -> None:
+        """Forget a session and its history."""
+        if self._sessions.pop(session.id, None) is not None:
+            self._evicted += 1
+            self.logger.info("Evicted session", {
+                "session_id": session.id,
+                "reason": reason,
+                "idle_seconds": round(time.monotonic() - session.last_used, 1)
+            })
+
+    def create_session(self) -> Session:
+        """
+        Start a new conversation.
+
+        Evicts the least recently used idle session when the service is at
+        its session limit.
+
+        Returns:
+            The new session
+
+        Raises:
+            ServiceOverloadedError: If every session is busy and no more can be created
+        """
+        if self._closed:
+            raise ServiceOverloadedError("Session service is shutting down")
+        self._ensure_reaper()
+
+        if len(self._sessions) >= self.max_sessions:
+            idle = [session for session in self._sessions.values() if not session.busy]
+            if not idle:
+                self._rejected += 1
+                raise ServiceOverloadedError(f"Session limit of {self.max_sessions} reached")
+            self._drop(min(idle, key=lambda session: session.last_used), "capacity")
+
+        session = Session(uuid.uuid4().hex, self.max_queries_per_session)
+        self._sessions[session.id] = session
+        self.logger.debug("Created session", {"session_id": session.id, "sessions": len(self._sessions)})
+        return session
+
+    def get_session(self, session_id: str) -> Session:
+        """
+        Look up a session.
+
+        Args:
+            session_id: Id returned by create_session()
+
+        Returns:
+            The session
+
+        Raises:
+            SessionNotFoundError: If the session does not exist or was evicted
+        """
+        session = self._sessions.get(session_id)
+        if session is None:
+            raise SessionNotFoundError(f"Session not found: {session_id}")
+        return session
+
+    def list_sessions(self) -> List[Dict[str, Any]]:
+        """
+        Describe all sessions.
+
+        Returns:
+            Session summaries
+        """
+        return [session.info() for session in self._sessions.values()]
+
+    def close_session(self, session_id: str) -> None:
+        """
+        End a conversation and drop its history.
+
+        Queries of the session that are still running finish normally.
+
+        Args:
+            session_id: Id returned by create_session()
+
+        Raises:
+            SessionNotFoundError: If the session does not exist
+        """
+        session = self.get_session(session_id)
+        del self._sessions[session.id]
+        self.logger.debug("Closed session", {"session_id": session_id})
+
+    def get_history(self, session_id: str) -> List[Dict[str, Any]]:
+        """
+        Get the conversation history of a session.
+
+        Args:
+            session_id: Id returned by create_session()
+
+        Returns:
+            The messages of the session, empty before the first query
+        """
+        session = self.get_session(session_id)
+        return list(session.history.get_messages()) if session.history else []
+
+    def _admit(self, session: Session) -> None:
+        """
+        Count a query as pending, or reject it when too many are waiting.
+
+        Raises:
+            ServiceOverloadedError: If max_pending_queries queries already wait for an agent
+        """
+        if self._closed:
+            raise ServiceOverloadedError("Session service is shutting down")
+        # Pending queries beyond the free agents have to wait
+        waiting = self._pending - max(0, self.pool.max_size - self._active)
+        if waiting >= self.max_pending_queries:
+            self._rejected += 1
+            raise ServiceOverloadedError(f"Too many pending queries ({self._pending}), retry later")
+        self._pending += 1
+        session.pending_queries += 1
+        session.last_used = time.monotonic()
+
+    @asynccontextmanager
+    async def _session_agent(self, session: Session):
+        """
+        Lease an agent working on the session's history.
+
+        Must be entered right after _admit() for the same session.
+        """
+        try:
+            await session.semaphore.acquire()
+            try:
+                agent = await self.pool.acquire()
+            except BaseException:
+                session.semaphore.release()
+                raise
+        finally:
+            self._pending -= 1
+            session.pending_queries -= 1
+
+        self._active += 1
+        session.active_queries += 1
+        discard = True
+        try:
+            if session.history is None:
+                session.history = agent.new_history()
+            previous = agent.swap_history(session.history)
+            try:
+                yield agent
+                discard = False
+            finally:
+                agent.swap_history(previous)
+        finally:
+            self._active -= 1
+            session.active_queries -= 1
+            session.completed_queries += 1
+            session.last_used = time.monotonic()
+            session.semaphore.release()
+            # An agent whose query failed or was cancelled is not trusted again
+            await self.pool.release(agent, discard=discard)
+
+    async def run_query(self, session_id: str, query: str) -> str:
+        """
+        Answer a query in a session.
+
+        Args:
+            session_id: Id returned by create_session()
+            query: The user's input query
+
+        Returns:
+            The agent's response
+
+        Raises:
+            SessionNotFoundError: If the session does not exist
+            ServiceOverloadedError: If too many queries are waiting
+        """
+        session = self.get_session(session_id)
+        self._admit(session)
+        async with self._session_agent(session) as agent:
+            return await agent.process_query(query)
+
+    async def stream_query(self, session_id: str, query: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Answer a query in a session, streaming progress events.
+
+        The first event, of type "accepted", is yielded as soon as the query
+        is admitted, before it waits for an agent. The remaining events are
+        those of Agent.stream_query.
+
+        Args:
+            session_id: Id returned by create_session()
+            query: The user's input query
+
+        Yields:
+            Event dictionaries with a "type" key
+
+        Raises:
+            SessionNotFoundError: If the session does not exist
+            ServiceOverloadedError: If too many queries are waiting
+        """
+        session = self.get_session(session_id)
+        self._admit(session)
+        try:
+            yield {"type": "accepted", "session_id": session.id}
+        except BaseException:
+            self._pending -= 1
+            session.pending_queries -= 1
+            raise
+        async with self._session_agent(session) as agent:
+            async for event in agent.stream_query(query):
+                yield event
+
+    async def close(self) -> None:
+        """Drop every session, stop idle eviction and close the agent pool."""
+        self._closed = True
+        if self._reaper:
+            self._reaper.cancel()
+            try:
+                await self._reaper
+            except asyncio.CancelledError:
+                pass
+            self._reaper = None
+        self._sessions.clear()
+        await self.pool.close()
@@ -0,0 +1,152 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+import httpx
+from openai import BadRequestError
+
+from FractFlow.conversation.provider_adapters.deepseek_adapter import DeepSeekHistoryAdapter
+from FractFlow.infra.config import ConfigManager
+from FractFlow.models.deepseek_model import DeepSeekModel
+from FractFlow.models.orchestrator_model import OrchestratorModel
+
+def tool_call_delta(index, id=None, name=None, arguments=None):
+    return SimpleNamespace(index=index, id=id, function=SimpleNamespace(name=name, arguments=arguments))
+
+def bad_request(message, body=None):
+    response = httpx.Response(400, request=httpx.Request('POST', 'https://api.example.com/chat/completions'))
+    return BadRequestError(message, response=response, body=body)
+
+class TestToolCallParsing(unittest.TestCase):
+    def test_merge_tool_call_deltas(self):
+        """Test assembling streamed tool calls from their deltas"""
+        tool_calls = []
+        OrchestratorModel._merge_tool_call_deltas(tool_calls, [tool_call_delta(0, id='call_a', name='read_', arguments='{"pa')])
+        OrchestratorModel._merge_tool_call_deltas(tool_calls, [tool_call_delta(0, name='file', arguments='th": "a.txt"}')])
+        OrchestratorModel._merge_tool_call_deltas(tool_calls, [tool_call_delta(1, id='call_b', name='list_dir')])
+        # Some providers omit the index of continuation deltas
+        OrchestratorModel._merge_tool_call_deltas(tool_calls, [tool_call_delta(None, arguments='{}')])
+
+        self.assertEqual(len(tool_calls), 2)
+        self.assertEqual(tool_calls[0], {
+            "id": "call_a", "type": "function",
+            "function": {"name": "read_file", "arguments": '{"path": "a.txt"}'}
+        })
+        self.assertEqual(tool_calls[1]["id"], "call_b")
+        self.assertEqual(tool_calls[1]["function"], {"name": "list_dir", "arguments": "{}"})
+
+    def test_merge_tool_call_deltas_fills_gaps(self):
+        """Test that a delta for a later index creates the calls before it"""
+        tool_calls = []
+        OrchestratorModel._merge_tool_call_deltas(tool_calls, [tool_call_delta(1, name='search')])
+        self.assertEqual(len(tool_calls), 2)
+        self.assertEqual(tool_calls[0]["function"]["name"], "")
+        self.assertTrue(tool_calls[0]["id"].startswith("call_"))
+
+    def test_native_tool_calls(self):
+        """Test reading the tool calls of a complete response message"""
+        message = SimpleNamespace(tool_calls=[
+            SimpleNamespace(id='call_a', function=SimpleNamespace(name='read_file', arguments='{"path": "a.txt"}')),
+            SimpleNamespace(id=None, function=SimpleNamespace(name='list_dir', arguments=None)),
+            SimpleNamespace(id='call_c', function=SimpleNamespace(name='', arguments='{}')),
+            SimpleNamespace(id='call_d', function=None),
+        ])
+        tool_calls = OrchestratorModel._native_tool_calls(message)
+
+        self.assertEqual([call["function"]["name"] for call in tool_calls], ["read_file", "list_dir"])
+        self.assertEqual(tool_calls[0]["id"], "call_a")
+        self.assertTrue(tool_calls[1]["id"].startswith("call_"))
+        self.assertEqual(tool_calls[1]["function"]["arguments"], "{}")
+        self.assertEqual(OrchestratorModel._native_tool_calls(SimpleNamespace(tool_calls=None)), [])
+
+class TestNativeHistoryFormatting(unittest.TestCase):
+    def setUp(self):
+        self.tool_calls = [{"id": "call_a", "type": "function", "function": {"name": "read_file", "arguments": "{}"}},
+                           {"id": "call_b", "type": "function", "function": {"name": "list_dir", "arguments": "{}"}}]
+        self.messages = [
+            {"role": "system", "content": "system"},
+            {"role": "user", "content": "look around"},
+            {"role": "assistant", "content": "", "tool_calls": self.tool_calls},
+            {"role": "tool", "tool_name": "read_file", "tool_call_id": "call_a", "content": "text"},
+            {"role": "tool", "tool_name": "list_dir", "tool_call_id": "call_b", "content": [{"type": "text", "text": "a.txt"}]},
+        ]
+        self.tools = [{"type": "function", "function": {"name": "read_file", "description": "Read a file", "parameters": {}}}]
+
+    def test_native_format(self):
+        """Test that native formatting keeps tool calls and sends each result as its own tool message"""
+        adapter = DeepSeekHistoryAdapter()
+        adapter.set_native_tool_calls(True)
+        formatted = adapter.format_for_model(self.messages, tools=self.tools)
+
+        self.assertEqual([message["role"] for message in formatted], ["system", "user", "assistant", "tool", "tool"])
+        self.assertEqual(formatted[1]["content"], "look around")
+        self.assertEqual(formatted[2]["tool_calls"], self.tool_calls)
+        self.assertEqual(formatted[3], {"role": "tool", "tool_call_id": "call_a", "content": "text"})
+        self.assertEqual(formatted[4]["tool_call_id"], "call_b")
+        self.assertIsInstance(formatted[4]["content"], str)
+
+    def test_two_stage_format(self):
+        """Test that two-stage formatting turns tool results into user messages"""
+        adapter = DeepSeekHistoryAdapter()
+        adapter.set_native_tool_calls(False)
+        formatted = adapter.format_for_model(self.messages, tools=self.tools)
+
+        self.assertEqual([message["role"] for message in formatted], ["system", "user", "assistant", "user"])
+        self.assertNotIn("tool_calls", formatted[2])
+        self.assertIn("Tool result from read_file", formatted[3]["content"])
+        self.assertIn("Tool result from list_dir", formatted[3]["content"])
+
+class TestNativeFallback(unittest.TestCase):
+    def _model(self, error):
+        model = DeepSeekModel(config=ConfigManager(deepseek_api_key='test'), native_tool_calling=True)
+
+        async def request(**kwargs):
+            raise error
+        model._request_chat_completion = request
+        return model
+
+    def test_rejects_tools(self):
+        """Test telling tool rejections from other bad requests"""
+        self.assertTrue(OrchestratorModel._rejects_tools(bad_request("This model does not support tools")))
+        self.assertTrue(OrchestratorModel._rejects_tools(bad_request("Invalid request", {"param": "tools"})))
+        self.assertTrue(OrchestratorModel._rejects_tools(bad_request("Function calling is not enabled for this model")))
+        self.assertFalse(OrchestratorModel._rejects_tools(bad_request(
+            "This model's maximum context length is 65536 tokens. However, you requested 70000 tokens")))
+        self.assertFalse(OrchestratorModel._rejects_tools(bad_request(
+            "Messages with role 'tool' must be a response to a preceding message with 'tool_calls'")))
+
+    def test_tool_rejection_falls_back(self):
+        """Test that rejected tool definitions switch the model to two-stage tool calling"""
+        model = self._model(bad_request("This model does not support tools"))
+        system_prompt = model.history.get_messages()[0]["content"]
+
+        self.assertIsNone(asyncio.run(model._create_native_chat_completion(model='m', messages=[], tools=[{}])))
+        self.assertFalse(model.native_tool_calling)
+        self.assertNotEqual(model.history.get_messages()[0]["content"], system_prompt)
+
+    def test_other_bad_request_keeps_native(self):
+        """Test that a context length overflow neither falls back nor rewrites the system prompt"""
+        model = self._model(bad_request("This model's maximum context length is 65536 tokens"))
+        system_prompt = model.history.get_messages()[0]["content"]
+
+        self.assertIsNone(asyncio.run(model._create_native_chat_completion(model='m', messages=[], tools=[{}])))
+        self.assertTrue(model.native_tool_calling)
+        self.assertEqual(model.history.get_messages()[0]["content"], system_prompt)
+
+    def test_fallback_updates_swapped_in_histories(self):
+        """Test that a history created in native mode gets the two-stage prompt when swapped in after a fallback"""
+        model = self._model(bad_request("This model does not support tools"))
+        other_session = model.create_history()
+        self.assertNotIn("<tool_request>", other_session.get_messages()[0]["content"])
+
+        asyncio.run(model._create_native_chat_completion(model='m', messages=[], tools=[{}]))
+        self.assertIn("<tool_request>", model.history.get_messages()[0]["content"])
+
+        previous = model.swap_history(other_session)
+        self.assertIn("<tool_request>", other_session.get_messages()[0]["content"])
+        self.assertEqual(other_session.get_messages()[0]["role"], "system")
+        model.swap_history(previous)
+        self.assertIn("<tool_request>", model.history.get_messages()[0]["content"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+from FractFlow.models import rate_limiter
+from FractFlow.models.rate_limiter import RateLimiter
+
+BASE_URL = 'https://api.example.com/v1'
+
+def content_chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))], usage=None)
+
+def usage_chunk(total_tokens):
+    return SimpleNamespace(choices=[], usage=SimpleNamespace(total_tokens=total_tokens))
+
+class StubClient:
+    """Stands in for an AsyncOpenAI client, streaming fixed chunks."""
+
+    def __init__(self, chunks):
+        self.base_url = BASE_URL
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        self.chunks = chunks
+
+    async def create(self, **kwargs):
+        async def stream():
+            for chunk in self.chunks:
+                yield chunk
+        return stream()
+
+class TestStreamSettlement(unittest.TestCase):
+    def setUp(self):
+        self.limiter = RateLimiter({'*': {'tokens_per_minute': 100000}})
+        self.request = {'model': 'm', 'messages': [{'role': 'user', 'content': 'hello'}], 'stream': True}
+        self.key = self.limiter.endpoint_key(BASE_URL)
+
+    def _consume(self, chunks):
+        async def run():
+            stream = await rate_limiter.create_chat_completion(StubClient(chunks), self.request, self.limiter)
+            before = self.limiter.stats[self.key]['tokens']
+            return before, [chunk async for chunk in stream]
+        return asyncio.run(run())
+
+    def test_stream_settles_with_usage_chunk(self):
+        """Test that a streamed request is settled with the usage of its final chunk once consumed"""
+        before, chunks = self._consume([content_chunk('Hi'), content_chunk(' there'), usage_chunk(42)])
+
+        self.assertEqual(before, 0)
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(self.limiter.stats[self.key]['tokens'], 42)
+
+    def test_stream_without_usage_settles_with_count(self):
+        """Test that a streamed request without a usage chunk is settled with the estimate and the streamed text"""
+        self._consume([content_chunk('Hi'), content_chunk(' there')])
+
+        estimate = rate_limiter.estimate_request_tokens(self.request)
+        self.assertGreater(self.limiter.stats[self.key]['tokens'], estimate)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import asyncio
+import unittest
+
+from FractFlow.infra.config import ConfigManager
+from FractFlow.models.routing_model import RoutingModel
+
+class StubBackend:
+    """Stands in for an OrchestratorModel, answering after a delay."""
+
+    def __init__(self, name, delay):
+        self.provider_name = name
+        self.model = f'{name}-model'
+        self.delay = delay
+        self.router = None
+        self.calls = 0
+
+    async def send_chat_completion(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.provider_name
+
+class TestRoutingProbes(unittest.TestCase):
+    def _router(self, primary_delay, secondary_delay):
+        config = ConfigManager(routing_initial_hedge_delay=0.2, routing_min_hedge_delay=0.05, routing_probe_interval=0.0)
+        primary, secondary = StubBackend('primary', primary_delay), StubBackend('secondary', secondary_delay)
+        return RoutingModel([primary, secondary], config), primary, secondary
+
+    def test_healthy_secondary_is_not_probed(self):
+        """Test that probes keep the preference order while the primary is healthy"""
+        router, primary, secondary = self._router(0.01, 0.01)
+
+        async def run():
+            return [await router.request({'model': 'any'}) for _ in range(10)]
+
+        self.assertEqual(asyncio.run(run()), ['primary'] * 10)
+        self.assertEqual(secondary.calls, 0)
+        self.assertEqual(router.get_endpoint_stats()['secondary']['probes'], 0)
+
+    def test_recovered_primary_is_probed(self):
+        """Test that a primary ranked down after a slow spike gets probed and wins its place back"""
+        router, primary, secondary = self._router(0.5, 0.01)
+
+        async def run():
+            # The slow primary loses to the hedge and is ranked behind the secondary
+            first = await router.request({'model': 'any'})
+            demoted = router.rank_endpoints(False)
+            primary.delay = 0.01
+            answers = [await router.request({'model': 'any'}) for _ in range(20)]
+            return first, demoted, answers
+
+        first, demoted, answers = asyncio.run(run())
+        self.assertEqual(first, 'secondary')
+        self.assertEqual(demoted, [1, 0])
+        self.assertGreater(router.get_endpoint_stats()['primary']['probes'], 0)
+        self.assertEqual(router.rank_endpoints(False), [0, 1])
+        self.assertEqual(answers[-1], 'primary')
+
+if __name__ == '__main__':
+    unittest.main()
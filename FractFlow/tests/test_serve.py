@@ -0,0 +1,58 @@
+import os
+import asyncio
+import tempfile
+import unittest
+from unittest import mock
+
+from mcp.server.fastmcp import FastMCP
+
+from FractFlow.mcpcore.serve import load_server
+from FractFlow.tool_template import ToolTemplate
+
+TOOL_TEMPLATE_SCRIPT = '''
+from FractFlow.tool_template import ToolTemplate
+
+class EchoAgent(ToolTemplate):
+    SYSTEM_PROMPT = "You echo the query."
+    TOOL_DESCRIPTION = "Echoes the query."
+    # Relative tool paths are resolved against the project root found from the script's __file__
+    TOOLS = [("echo_leaf_mcp.py", "echo_leaf")]
+
+if __name__ == "__main__":
+    raise SystemExit("load_server must not run the script's main block")
+'''
+
+class TestLoadServer(unittest.TestCase):
+    def test_load_tool_template_script(self):
+        """Test that a ToolTemplate subclass script is loaded as an MCP server without running its main block"""
+        with tempfile.TemporaryDirectory() as directory:
+            # Mark the directory as a project root, ToolTemplate searches upwards from the script
+            open(os.path.join(directory, 'pyproject.toml'), 'w').close()
+            open(os.path.join(directory, 'echo_leaf_mcp.py'), 'w').close()
+            script_path = os.path.join(directory, 'echo_agent.py')
+            with open(script_path, 'w') as f:
+                f.write(TOOL_TEMPLATE_SCRIPT)
+
+            server = load_server(script_path)
+            tools = asyncio.run(server.list_tools())
+
+        self.assertEqual([tool.name for tool in tools], ['echoagent'])
+
+class TestServerShutdown(unittest.TestCase):
+    def test_stopping_server_closes_agent_pool(self):
+        """Test that the agent pool is closed once the MCP server stops"""
+        class PooledAgent(ToolTemplate):
+            SYSTEM_PROMPT = "You answer."
+            TOOL_DESCRIPTION = "Answers."
+
+        pool = PooledAgent._get_agent_pool()
+        server = PooledAgent._get_mcp_server()
+        # The transport returns right away, as when the client disconnects
+        with mock.patch.object(FastMCP, 'run_stdio_async', mock.AsyncMock()):
+            server.run(transport='stdio')
+
+        self.assertTrue(pool._closed)
+        self.assertIsNone(PooledAgent._agent_pool)
+
+if __name__ == '__main__':
+    unittest.main()
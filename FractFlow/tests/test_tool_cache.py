@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+
+from FractFlow.core.tool_cache import ToolCachePolicy, ToolResultCache
+
+READ_POLICY = ToolCachePolicy(cacheable=True, read_only=True)
+
+class TestToolResultCache(unittest.TestCase):
+    def _cache_read(self, cache, client_name, tool_name, arguments, result):
+        key = cache.make_key(tool_name, arguments)
+        cache.put(key, result, client_name, arguments, READ_POLICY)
+        return key
+
+    def test_path_write_drops_overlapping_reads(self):
+        """Test that a write with path arguments only drops reads of overlapping paths"""
+        cache = ToolResultCache()
+        file_key = self._cache_read(cache, 'file_io', 'read_lines', {'file_path': '/tmp/x.txt'}, 'old')
+        other_key = self._cache_read(cache, 'file_io', 'read_lines', {'file_path': '/tmp/y.txt'}, 'other')
+
+        self.assertEqual(cache.invalidate_for_call('file_io', {'file_path': '/tmp/x.txt', 'content': 'new'}), 1)
+        self.assertIsNone(cache.get(file_key))
+        self.assertEqual(cache.get(other_key), 'other')
+
+    def test_pathless_write_drops_other_clients_reads(self):
+        """Test that a nested agent taking only a query drops file reads cached from other clients"""
+        cache = ToolResultCache()
+        key = self._cache_read(cache, 'file_io', 'read_lines', {'file_path': '/tmp/x.txt'}, 'old content')
+
+        dropped = cache.invalidate_for_call('editor_agent', {'query': 'rewrite /tmp/x.txt in uppercase'})
+
+        self.assertEqual(dropped, 1)
+        self.assertIsNone(cache.get(key))
+
+    def test_output_argument_drops_reads_of_its_path(self):
+        """Test that a write taking its target as a non-path-named argument drops reads of that path"""
+        cache = ToolResultCache()
+        with tempfile.TemporaryDirectory() as directory:
+            target = os.path.join(directory, 'result.png')
+            key = self._cache_read(cache, 'file_io', 'read_image', {'file_path': target}, 'old image')
+            other_key = self._cache_read(cache, 'file_io', 'read_lines', {'file_path': '/tmp/y.txt'}, 'other')
+
+            dropped = cache.invalidate_for_call('image_gen', {'prompt': 'a red cube', 'output': target})
+
+        self.assertEqual(dropped, 1)
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(cache.get(other_key), 'other')
+
+    def test_state_change_during_call_is_not_cached(self):
+        """Test that a result computed across a state-changing call is not cached"""
+        cache = ToolResultCache()
+        generation = cache.generation
+        cache.invalidate_for_call('editor_agent', {'query': 'edit'})
+        key = cache.make_key('read_lines', {'file_path': '/tmp/x.txt'})
+        cache.put(key, 'stale', 'file_io', {'file_path': '/tmp/x.txt'}, READ_POLICY, generation=generation)
+        self.assertIsNone(cache.get(key))
+
+if __name__ == '__main__':
+    unittest.main()
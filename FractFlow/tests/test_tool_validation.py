@@ -0,0 +1,65 @@
+import unittest
+
+from FractFlow.models.tool_validation import (
+    ToolNameIndex,
+    ToolValidatorCache,
+    coerce_arguments,
+    compile_validator,
+    edit_distance,
+)
+
+SEARCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "query": {"type": "string"},
+        "max_results": {"type": "integer"},
+        "mode": {"type": "string", "enum": ["fast", "full"]}
+    },
+    "required": ["query"]
+}
+
+class TestToolValidation(unittest.TestCase):
+    def test_edit_distance(self):
+        """Test Levenshtein distance and its early exit bound"""
+        self.assertEqual(edit_distance("kitten", "sitting"), 3)
+        self.assertEqual(edit_distance("", "abc"), 3)
+        self.assertEqual(edit_distance("same", "same"), 0)
+        self.assertEqual(edit_distance("abcdef", "uvwxyz", max_distance=2), 3)
+
+    def test_name_index(self):
+        """Test fuzzy tool name resolution"""
+        index = ToolNameIndex(["search_documents", "generate_chart", "read_file", "write_file"])
+        self.assertEqual(index.find("search_docs"), "search_documents")
+        self.assertEqual(index.find("Generate-Chart"), "generate_chart")
+        self.assertEqual(index.find("files.read_file"), "read_file")
+        self.assertIsNone(index.find("send_email"))
+        # Equally close to two tools is ambiguous
+        self.assertIsNone(ToolNameIndex(["tool_a", "tool_b"]).find("tool_c"))
+
+    def test_compiled_validator(self):
+        """Test the built-in schema validator"""
+        validator = compile_validator(SEARCH_SCHEMA)
+        self.assertEqual(validator({"query": "ai", "max_results": 5}), [])
+        self.assertTrue(validator({"max_results": 5}))
+        self.assertTrue(validator({"query": "ai", "max_results": "5"}))
+        self.assertTrue(validator({"query": "ai", "mode": "slow"}))
+
+    def test_coerce_arguments(self):
+        """Test coercion of values written as strings"""
+        arguments, changed = coerce_arguments({"query": "1", "max_results": "5"}, SEARCH_SCHEMA)
+        self.assertEqual(arguments, {"query": "1", "max_results": 5})
+        self.assertEqual(changed, 1)
+
+        arguments, changed = coerce_arguments({"max_results": "many"}, SEARCH_SCHEMA)
+        self.assertEqual(arguments, {"max_results": "many"})
+        self.assertEqual(changed, 0)
+
+    def test_validator_cache(self):
+        """Test that validators are reused until the schema object changes"""
+        cache = ToolValidatorCache()
+        first = cache.get_validator("search_documents", SEARCH_SCHEMA)
+        self.assertIs(cache.get_validator("search_documents", SEARCH_SCHEMA), first)
+        self.assertIsNot(cache.get_validator("search_documents", dict(SEARCH_SCHEMA)), first)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,14 +13,54 @@ import sys
 import logging
 import argparse
 from typing import List, Tuple, Dict, Any, Optional
+import anyio
 from dotenv import load_dotenv
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
 import os.path as osp
 
 # Import the FractFlow Agent and Config
 from .agent import Agent
+from .agent_pool import AgentPool
 from .infra.config import ConfigManager
+from .mcpcore.connection import is_remote_server
 from .infra.logging_utils import setup_logging, get_logger
+from .infra import tracing, usage
+from .models import rate_limiter
+
+class _ToolServer(FastMCP):
+    """
+    MCP server of a ToolTemplate, closing its agent pool when the server stops.
+    
+    FastMCP's lifespan runs once per session on network transports, so the
+    pool is closed when the transport's run coroutine returns instead.
+    """
+    
+    def __init__(self, name: str, tool_class: type):
+        super().__init__(name)
+        self.tool_class = tool_class
+    
+    async def _close_agent_pool(self) -> None:
+        # Shielded, so that the pool is closed on interrupt as well
+        with anyio.CancelScope(shield=True):
+            await self.tool_class._close_agent_pool()
+    
+    async def run_stdio_async(self) -> None:
+        try:
+            await super().run_stdio_async()
+        finally:
+            await self._close_agent_pool()
+    
+    async def run_sse_async(self, mount_path: Optional[str] = None) -> None:
+        try:
+            await super().run_sse_async(mount_path)
+        finally:
+            await self._close_agent_pool()
+    
+    async def run_streamable_http_async(self) -> None:
+        try:
+            await super().run_streamable_http_async()
+        finally:
+            await self._close_agent_pool()
 
 class ToolTemplate:
     """
@@ -57,6 +97,14 @@ class ToolTemplate:
     The system will automatically inform the model that "file_manager_agent" maps to 
     the actual functions provided by file_io_agent.py (like "fileioagent").
     
+    A tool can also be the URL of an MCP server that is already running as a
+    network service, so that many agents share one server process:
+    
+        TOOLS = [("http://127.0.0.1:9001/mcp", "file_manager_agent")]
+    
+    Such servers are started with ``python -m FractFlow.mcpcore.serve`` or,
+    for ToolTemplate tools, with ``--mcp-transport streamable-http``.
+    
     ===== SCENARIO 3: Advanced Configuration =====
     Override configuration method for complex setups:
     
@@ -79,8 +127,14 @@ class ToolTemplate:
     TOOL_DESCRIPTION (str): Description for the main MCP tool function
     
     ===== OPTIONAL ATTRIBUTES =====
-    TOOLS (List[Tuple[str, str]]): List of (tool_path, tool_name) tuples
+    TOOLS (List[Tuple[str, str]]): List of (tool_path, tool_name) tuples, tool_path may be a server URL
     MCP_SERVER_NAME (str): Custom MCP server name (defaults to class name)
+    AGENT_POOL_SIZE (int): Warm agents kept alive in MCP server mode (default 1)
+    AGENT_IDLE_TIMEOUT (float): Seconds before an idle warm agent is shut down
+                                (default 600, None keeps it for the server lifetime)
+    MAX_SESSIONS (int): Conversations kept at the same time in HTTP mode (default 1000)
+    SESSION_IDLE_TIMEOUT (float): Seconds before an idle HTTP session is dropped (default 1800)
+    MAX_PENDING_QUERIES (int): Queries allowed to wait for an agent in HTTP mode (default 64)
     
     ===== OPTIONAL OVERRIDES =====
     create_config() -> ConfigManager: Custom configuration creation
@@ -147,10 +201,17 @@ class ToolTemplate:
     # ===== OPTIONAL: User can define these =====
     TOOLS: List[Tuple[str, str]] = []
     MCP_SERVER_NAME: Optional[str] = None
+    AGENT_POOL_SIZE: int = 1
+    AGENT_IDLE_TIMEOUT: Optional[float] = 600.0
+    MAX_SESSIONS: int = 1000
+    SESSION_IDLE_TIMEOUT: Optional[float] = 1800.0
+    MAX_PENDING_QUERIES: int = 64
     
     # ===== INTERNAL: Template implementation =====
     # Class-level MCP server instance
     _mcp = None
+    # Class-level pool of warm agents used in MCP server mode
+    _agent_pool = None
     
     @classmethod
     def create_config(cls) -> ConfigManager:
@@ -183,17 +244,19 @@ class ToolTemplate:
         return ConfigManager(custom_system_prompt=cls.SYSTEM_PROMPT)
     
     @classmethod
-    async def create_agent(cls, name_suffix='assistant') -> Agent:
+    async def create_agent(cls, name_suffix='assistant', config: Optional[ConfigManager] = None) -> Agent:
         """
         Create and initialize an Agent with tools.
         
         Args:
             name_suffix: Suffix for agent name (e.g., 'assistant', 'agent')
+            config: Configuration to use instead of create_config()
             
         Returns:
             Agent: Initialized agent ready for use
         """
-        config = cls.create_config()
+        if config is None:
+            config = cls.create_config()
         agent = Agent(config=config, name=f'{cls.__name__.lower()}_{name_suffix}')
         
         # Add tools to the agent
@@ -213,20 +276,21 @@ class ToolTemplate:
         Args:
             agent: Agent instance to add tools to
         """
-        project_root = cls._get_project_root()
-        
         for tool_path, tool_name in cls.TOOLS:
-            # Handle relative paths - now relative to project root
-            if not os.path.isabs(tool_path):
-                full_path = os.path.join(project_root, tool_path)
-            else:
-                full_path = tool_path
-                
-            if not os.path.exists(full_path):
+            full_path = cls._resolve_tool_path(tool_path)
+            
+            if not is_remote_server(full_path) and not os.path.exists(full_path):
                 raise ValueError(f"Tool path does not exist: {full_path}")
                 
             agent.add_tool(full_path, tool_name)
     
+    @classmethod
+    def _resolve_tool_path(cls, tool_path: str) -> str:
+        """Resolve a TOOLS entry, relative paths are relative to the project root and URLs are kept"""
+        if is_remote_server(tool_path) or os.path.isabs(tool_path):
+            return tool_path
+        return os.path.join(cls._get_project_root(), tool_path)
+    
     @classmethod
     def _get_project_root(cls):
         """
@@ -308,31 +372,59 @@ class ToolTemplate:
             pass
         
         # Validate tool paths exist
-        project_root = cls._get_project_root()
         for tool_path, tool_name in cls.TOOLS:
-            # Handle relative paths - now relative to project root
-            if not os.path.isabs(tool_path):
-                full_path = os.path.join(project_root, tool_path)
-            else:
-                full_path = tool_path
+            full_path = cls._resolve_tool_path(tool_path)
+            if is_remote_server(full_path):
+                # Network servers are checked when the agent connects
+                continue
                 
             if not os.path.exists(full_path):
                 raise ValueError(
                     f"Tool path does not exist: {full_path}\n"
                     f"Check the TOOLS configuration in {cls.__name__}.\n"
                     f"Tool paths should be relative to the project root or absolute paths.\n"
-                    f"Project root detected: {project_root}"
+                    f"Project root detected: {cls._get_project_root()}"
                 )
     
     @classmethod
-    async def _mcp_tool_function(cls, query: str) -> str:
+    def _get_agent_pool(cls) -> AgentPool:
+        """Get the pool of warm agents, creating it on first use"""
+        if cls._agent_pool is None:
+            cls._agent_pool = AgentPool(
+                cls.create_agent,
+                max_size=cls.AGENT_POOL_SIZE,
+                idle_timeout=cls.AGENT_IDLE_TIMEOUT,
+                name=f"{cls.__name__.lower()}_agent_pool"
+            )
+        return cls._agent_pool
+    
+    @classmethod
+    async def _close_agent_pool(cls) -> None:
+        """Shut down the pooled agents and their tool servers, if the pool was created"""
+        if cls._agent_pool is not None:
+            pool, cls._agent_pool = cls._agent_pool, None
+            await pool.close()
+    
+    @classmethod
+    async def _mcp_tool_function(cls, query: str, ctx: Context = None) -> Any:
         """The main MCP tool function that processes queries"""
-        agent = await cls.create_agent()
-        try:
-            result = await agent.process_query(query)
-            return result
-        finally:
-            await agent.shutdown()
+        # Continue the caller's trace, if it sent one along with the request
+        trace_context = None
+        return_usage = False
+        if ctx is not None and ctx.request_context.meta is not None:
+            trace_context = getattr(ctx.request_context.meta, tracing.META_KEY, None)
+            return_usage = bool(getattr(ctx.request_context.meta, usage.META_KEY, False))
+        
+        # Requests of agents serving another agent wait behind the top-level orchestrator's
+        with tracing.remote_parent(trace_context), tracing.span("mcp_tool_request", "mcp", tool=cls.__name__), \
+                rate_limiter.priority(rate_limiter.PRIORITY_NESTED):
+            # Lease a warm agent so tool servers are only started once per server lifetime
+            async with cls._get_agent_pool().lease() as agent:
+                if not return_usage:
+                    return await agent.process_query(query)
+                # The calling agent asked for the token usage of this query and the agents below it
+                result, query_usage = await agent.process_query(query, return_usage=True)
+                return [result, usage.to_resource(query_usage['records'])]
     
     @classmethod
     async def _run_interactive(cls):
@@ -372,11 +464,10 @@ class ToolTemplate:
             print("\nAgent session ended.")
     
     @classmethod
-    def _run_mcp_server(cls):
-        """Run in MCP Server mode"""
-        # Initialize MCP server if not already done
+    def _get_mcp_server(cls) -> FastMCP:
+        """Get the MCP server exposing the tool, creating it on first use"""
         if cls._mcp is None:
-            cls._mcp = FastMCP(cls._get_mcp_server_name())
+            cls._mcp = _ToolServer(cls._get_mcp_server_name(), cls)
             
             # Generate a proper tool name based on the class name
             tool_name = f"{cls.__name__.lower()}"
@@ -384,9 +475,46 @@ class ToolTemplate:
             # Register the main tool function with description and custom name
             tool_description = cls._get_tool_description()
             cls._mcp.tool(name=tool_name, description=tool_description)(cls._mcp_tool_function)
+        return cls._mcp
+    
+    @classmethod
+    def _run_mcp_server(cls, transport: str = 'stdio', host: str = '127.0.0.1', port: int = 8000):
+        """Run in MCP Server mode, over stdio or as a network service shared by many agents"""
+        mcp = cls._get_mcp_server()
+        if transport != 'stdio':
+            mcp.settings.host = host
+            mcp.settings.port = port
+            path = mcp.settings.sse_path if transport == 'sse' else mcp.settings.streamable_http_path
+            print(f"Serving MCP over {transport} at http://{host}:{port}{path}")
+        mcp.run(transport=transport)
+    
+    @classmethod
+    async def _create_session_agent(cls) -> Agent:
+        """Create an agent for the HTTP session service, sharing tool servers with its siblings"""
+        config = cls.create_config()
+        config.set('mcp.share_servers', True)
+        return await cls.create_agent('session_agent', config=config)
+    
+    @classmethod
+    def _run_http_server(cls, host: str, port: int, agents: int):
+        """Run the multi-session HTTP service"""
+        import uvicorn
+        from .service import SessionManager, create_app
         
-        # Run the MCP server
-        cls._mcp.run(transport='stdio')
+        pool = AgentPool(
+            cls._create_session_agent,
+            max_size=agents,
+            idle_timeout=cls.AGENT_IDLE_TIMEOUT,
+            name=f"{cls.__name__.lower()}_session_agent_pool"
+        )
+        manager = SessionManager(
+            pool,
+            max_sessions=cls.MAX_SESSIONS,
+            session_idle_timeout=cls.SESSION_IDLE_TIMEOUT,
+            max_pending_queries=cls.MAX_PENDING_QUERIES,
+            name=f"{cls.__name__.lower()}_sessions"
+        )
+        uvicorn.run(create_app(manager), host=host, port=port, log_level="warning")
     
     @classmethod
     def main(cls):
@@ -399,15 +527,25 @@ class ToolTemplate:
         parser.add_argument('--interactive', '-i', action='store_true', help='Run in interactive mode')
         parser.add_argument('--query', '-q', type=str, help='Single query mode: process this query and exit')
         parser.add_argument('--log-level', '-l', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'], default='INFO', help='Log level: DEBUG, INFO, WARNING, ERROR, CRITICAL')
+        parser.add_argument('--log-json', type=str, help='Also write logs as JSON lines to this file')
+        parser.add_argument('--http', action='store_true', help='Run as a multi-session HTTP service')
+        parser.add_argument('--mcp-transport', choices=['stdio', 'sse', 'streamable-http'], default='stdio', help='MCP Server mode: transport, network transports serve many agents from one process')
+        parser.add_argument('--host', type=str, default='127.0.0.1', help='HTTP and network MCP modes: interface to listen on')
+        parser.add_argument('--port', type=int, default=8000, help='HTTP and network MCP modes: port to listen on')
+        parser.add_argument('--agents', type=int, default=cls.AGENT_POOL_SIZE, help='HTTP mode: queries answered at the same time')
         args = parser.parse_args()
         
         # Setup logging
-        setup_logging(level=args.log_level)
+        setup_logging(level=args.log_level, json_log_file=args.log_json)
         
         if args.interactive:
             # Interactive mode
             print(f"Starting {cls.__name__} in interactive mode.")
             asyncio.run(cls._run_interactive())
+        elif args.http:
+            # Multi-session HTTP service mode
+            print(f"Starting {cls.__name__} as an HTTP service on {args.host}:{args.port}.")
+            cls._run_http_server(args.host, args.port, args.agents)
         elif args.query:
             # Single query mode
             print(f"Starting {cls.__name__} in single query mode.")
@@ -415,4 +553,4 @@ class ToolTemplate:
         else:
             # Default: MCP Server mode
             print(f"Starting {cls.__name__} in MCP Server mode.")
-            cls._run_mcp_server() 
\ No newline at end of file
+            cls._run_mcp_server(args.mcp_transport, args.host, args.port) 
\ No newline at end of file
@@ -4,6 +4,7 @@ ui.py
 Description: UI implementation for FractFlow using NiceGUI
 """
 
+import time
 import asyncio
 from datetime import datetime
 from typing import List, Tuple, Dict, Any
@@ -17,6 +18,9 @@ from FractFlow.agent import Agent
 class FractFlowUI:
     """UI implementation for FractFlow using NiceGUI"""
     
+    # Minimum seconds between re-renders while a response is streaming
+    STREAM_REFRESH_INTERVAL = 0.1
+    
     def __init__(self, agent: Agent):
         """Initialize the UI with an agent instance"""
         self.agent = agent
@@ -195,11 +199,28 @@ class FractFlowUI:
         self._loading_indicator.visible = True
         
         try:
-            # Process with agent using the captured text
-            result = await self.agent.process_query(message_text)
-            # Get history from agent after processing
-            history = self.agent.get_history()
-            self._add_bot_message(result, history)
+            # Stream the agent's progress into a placeholder message
+            index = self._add_bot_message('')
+            streamed_text = ''
+            last_refresh = 0.0
+            
+            async for event in self.agent.stream_query(message_text):
+                if event['type'] == 'token':
+                    streamed_text += event['content']
+                elif event['type'] == 'tool_result':
+                    streamed_text += f"\n\n> 工具 `{event['name']}` 已完成\n\n"
+                elif event['type'] == 'final':
+                    # Get history from agent after processing
+                    self._update_bot_message(index, event['content'], self.agent.get_history())
+                    break
+                else:
+                    continue
+                
+                # Throttle refreshes so long answers don't re-render on every token
+                now = time.monotonic()
+                if now - last_refresh >= self.STREAM_REFRESH_INTERVAL:
+                    self._update_bot_message(index, streamed_text)
+                    last_refresh = now
         except Exception as e:
             self._add_error_message(str(e))
         finally:
@@ -217,8 +238,8 @@ class FractFlowUI:
         ))
         self._chat_messages.refresh()
 
-    def _add_bot_message(self, text: str, history: List[Dict[str, Any]] = None):
-        """Add a bot message with optional history"""
+    def _add_bot_message(self, text: str, history: List[Dict[str, Any]] = None) -> int:
+        """Add a bot message with optional history, returning its index"""
         if history is None:
             history = []
             
@@ -230,6 +251,19 @@ class FractFlowUI:
             history
         ))
         self._chat_messages.refresh()
+        return len(self.messages) - 1
+
+    def _update_bot_message(self, index: int, text: str, history: List[Dict[str, Any]] = None):
+        """Replace the text, and optionally the history, of a bot message"""
+        user_id, avatar, _, stamp, old_history = self.messages[index]
+        self.messages[index] = (
+            user_id,
+            avatar,
+            text,
+            stamp,
+            old_history if history is None else history
+        )
+        self._chat_messages.refresh()
 
     def _add_error_message(self, error: str):
         """Add an error message"""
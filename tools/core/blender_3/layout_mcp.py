@@ -9,6 +9,7 @@ import sys
 import time
 from pathlib import Path
 from mcp.server.fastmcp import FastMCP, Context
+from mcp.types import ToolAnnotations
 import json
 
 # Import the BlenderPrimitive for unified Blender interaction
@@ -22,7 +23,7 @@ from typing import List
 # Initialize FastMCP server
 mcp = FastMCP("layout_manager")
 
-@mcp.tool()
+@mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
 def analyze_scene_space() -> str:
     """
     分析当前场景的空间状况，返回原始数据
@@ -38,7 +39,7 @@ def analyze_scene_space() -> str:
 
 
 
-@mcp.tool()
+@mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
 def validate_current_layout(ctx: Context) -> str:
     """
     验证当前场景中布局的可行性，返回原始数据让LLM分析
@@ -6,6 +6,7 @@ import urllib.parse
 import os
 from typing import List
 from mcp.server.fastmcp import FastMCP
+from mcp.types import ToolAnnotations
 from dotenv import load_dotenv
 from pathlib import Path
 
@@ -122,7 +123,7 @@ def download_outputs(history: dict, save_directory: str, meta: dict, custom_file
     return saved_files
 
 
-@mcp.tool()
+@mcp.tool(annotations=ToolAnnotations(readOnlyHint=True, idempotentHint=True, openWorldHint=False))
 async def list_comfyui_workflows() -> str:
     """列出所有可用的ComfyUI工作流及其完整文档"""
     try:
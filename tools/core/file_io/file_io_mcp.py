@@ -3,11 +3,17 @@ import pathlib
 from typing import List, Dict, Union, Optional, Tuple, Any
 import re
 from mcp.server.fastmcp import FastMCP
+from mcp.types import ToolAnnotations
 import json
 
 # Initialize MCP server
 mcp = FastMCP("file_io_tool")
 
+# Tool annotations, read-only tools can have their results cached by the agent
+READ_ONLY = ToolAnnotations(readOnlyHint=True, idempotentHint=True, openWorldHint=False)
+ADDITIVE_WRITE = ToolAnnotations(readOnlyHint=False, destructiveHint=False, openWorldHint=False)
+DESTRUCTIVE_WRITE = ToolAnnotations(readOnlyHint=False, destructiveHint=True, openWorldHint=False)
+
 
 def normalize_path(file_path: str) -> str:
     """
@@ -67,7 +73,7 @@ def check_file_exists(file_path: str) -> Dict[str, Union[bool, str]]:
         }
 
 
-@mcp.tool()
+@mcp.tool(annotations=READ_ONLY)
 def get_total_line_count(file_path: str) -> Dict[str, Union[int, str, bool]]:
     """
     Counts the total number of lines in a text file.
@@ -127,7 +133,7 @@ def get_total_line_count(file_path: str) -> Dict[str, Union[int, str, bool]]:
         }
 
 
-@mcp.tool()
+@mcp.tool(annotations=READ_ONLY)
 def read_lines(file_path: str, start_line: int = 1, end_line: Optional[int] = None) -> Dict[str, Union[str, int, bool, List[str]]]:
     """
     Reads specific line range from a text file.
@@ -242,7 +248,7 @@ def read_lines(file_path: str, start_line: int = 1, end_line: Optional[int] = No
         }
 
 
-@mcp.tool()
+@mcp.tool(annotations=READ_ONLY)
 def read_file_in_chunks(file_path: str, chunk_size: int, 
                     overlap: int = 0, 
                     chunk_index: Optional[int] = None) -> Dict[str, Union[str, int, bool, List[Dict]]]:
@@ -406,7 +412,7 @@ def read_file_in_chunks(file_path: str, chunk_size: int,
         }
 
 
-@mcp.tool()
+@mcp.tool(annotations=READ_ONLY)
 def read_with_line_numbers(file_path: str, start_line: int = 1, 
                                end_line: Optional[int] = None) -> Dict[str, Union[str, int, bool]]:
     """
@@ -470,7 +476,7 @@ def read_with_line_numbers(file_path: str, start_line: int = 1,
         }
 
 
-@mcp.tool()
+@mcp.tool(annotations=DESTRUCTIVE_WRITE)
 def create_file(file_path: str, content: str) -> Dict[str, Union[bool, str]]:
     """
     Creates a new file or overwrites an existing file with specified content.
@@ -527,7 +533,7 @@ def create_file(file_path: str, content: str) -> Dict[str, Union[bool, str]]:
         }
 
 
-@mcp.tool()
+@mcp.tool(annotations=ADDITIVE_WRITE)
 def append_to_file(file_path: str, content: str) -> Dict[str, Union[bool, str]]:
     """
     Appends content to the end of an existing file or creates new file with content.
@@ -582,7 +588,7 @@ def append_to_file(file_path: str, content: str) -> Dict[str, Union[bool, str]]:
             "message": f"Error appending to file: {str(e)}"
         }
 
-@mcp.tool()
+@mcp.tool(annotations=DESTRUCTIVE_WRITE)
 def create_jsonfile(file_path: str, content: Dict[str, Any]) -> Dict[str, Union[bool, str]]:
     """
     Creates a new JSON file or overwrites an existing one with the provided dict.
@@ -631,7 +637,7 @@ def create_jsonfile(file_path: str, content: Dict[str, Any]) -> Dict[str, Union[
         }
 
 
-@mcp.tool()
+@mcp.tool(annotations=ADDITIVE_WRITE)
 def append_to_jsonfile(file_path: str, content: Dict[str, Any]) -> Dict[str, Union[bool, str]]:
     """
     Appends/merges a dict into an existing JSON file, or creates the file if absent.
@@ -694,7 +700,7 @@ def append_to_jsonfile(file_path: str, content: Dict[str, Any]) -> Dict[str, Uni
         }
 
 
-@mcp.tool()
+@mcp.tool(annotations=DESTRUCTIVE_WRITE)
 def insert_at_line(file_path: str, line_number: int, content: str) -> Dict[str, Union[bool, str, int]]:
     """
     Inserts content at a specific line number in a file.
@@ -790,7 +796,7 @@ def insert_at_line(file_path: str, line_number: int, content: str) -> Dict[str,
         }
 
 
-@mcp.tool()
+@mcp.tool(annotations=DESTRUCTIVE_WRITE)
 def delete_line(file_path: str, line_number: int) -> Dict[str, Union[bool, str, int]]:
     """
     Deletes a specific line from a file.
@@ -880,7 +886,7 @@ def delete_line(file_path: str, line_number: int) -> Dict[str, Union[bool, str,
         }
 
 
-@mcp.tool()
+@mcp.tool(annotations=READ_ONLY)
 def list_directory(dir_path: str) -> Dict[str, Union[bool, str, List[str]]]:
     """
     Lists files and directories in the specified directory.
@@ -1,12 +1,22 @@
-import cv2
-import numpy as np
 import urllib.request
 import os
+import sys
+from pathlib import Path
 from uuid import uuid4
 from urllib.parse import urlparse
 
 from mcp.server.fastmcp import FastMCP
 
+# Add the project root directory to the Python path
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from FractFlow.infra.lazy_import import lazy_import
+
+# OpenCV and numpy are only loaded when the tool is first called
+cv2 = lazy_import('cv2')
+np = lazy_import('numpy')
+
 mcp = FastMCP("laplacian_blending")
 
 def load_image(path_or_url):
@@ -2,6 +2,7 @@ import os
 import numpy as np
 from typing import List, Dict, Tuple
 from mcp.server.fastmcp import FastMCP
+from mcp.types import ToolAnnotations
 from dotenv import load_dotenv
 import httpx
 
@@ -156,7 +157,7 @@ def calculate_3d_iou(bbox1: List[float], bbox2: List[float]) -> str:
     except Exception as e:
         return f"计算过程中出现错误: {str(e)}"
 
-@mcp.tool()
+@mcp.tool(annotations=ToolAnnotations(readOnlyHint=True, idempotentHint=True, openWorldHint=False))
 def read_json(json_path: str) -> str:
     """
     读取室内布局JSON文件，解析objects并转换为bbox格式
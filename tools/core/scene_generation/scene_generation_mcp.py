@@ -10,6 +10,8 @@ Usage:
   python scene_generation_mcp.py --query "..."          # Single query mode
 """
 
+from __future__ import annotations
+
 import os
 import sys
 import json
@@ -19,11 +21,6 @@ import time
 from pathlib import Path
 from typing import Dict, Any, Optional
 
-import numpy as np
-import trimesh
-from PIL import Image
-import replicate
-from gradio_client import Client, handle_file
 from dotenv import load_dotenv
 
 # Add the project root directory to the Python path
@@ -31,6 +28,15 @@ project_root = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from FractFlow.tool_template import ToolTemplate
+from FractFlow.infra.lazy_import import lazy_import
+
+# Heavy 3D and API client libraries are loaded on first use, so the server answers
+# initialize without waiting for them
+np = lazy_import('numpy')
+trimesh = lazy_import('trimesh')
+Image = lazy_import('PIL.Image')
+replicate = lazy_import('replicate')
+gradio_client = lazy_import('gradio_client')
 
 # 加载环境变量
 load_dotenv()
@@ -185,13 +191,13 @@ class SceneGenerationTool(ToolTemplate):
             self.log(f"文本到图像生成失败: {str(e)}", "error")
             raise
 
-    def process_image_to_3d(self, input_image: str, client: Client) -> str:
+    def process_image_to_3d(self, input_image: str, client: gradio_client.Client) -> str:
         """图像到3D模型转换"""
         try:
             self.log(f"开始3D模型转换: {input_image}", "info")
             
             result = client.predict(
-                input_image=handle_file(input_image),
+                input_image=gradio_client.handle_file(input_image),
                 api_name="/process_image_to_3d"
             )
             
@@ -387,7 +393,7 @@ class SceneGenerationTool(ToolTemplate):
             self.log(f"开始创建3D场景: {layout_json}", "info")
             
             # 初始化Gradio客户端
-            client = Client(self.HUNYUAN_API_BASE, download_files=self.TEMP_DIR)
+            client = gradio_client.Client(self.HUNYUAN_API_BASE, download_files=self.TEMP_DIR)
             
             # 读取JSON文件
             with open(layout_json, 'r', encoding='utf-8') as f:
@@ -612,7 +618,7 @@ class SceneGenerationTool(ToolTemplate):
         """基于scene_mcp.py的create_scene函数"""
         try:
             # 初始化Gradio客户端
-            client = Client(self.HUNYUAN_API_BASE, download_files=self.TEMP_DIR)
+            client = gradio_client.Client(self.HUNYUAN_API_BASE, download_files=self.TEMP_DIR)
             
             # 读取JSON文件
             with open(json_file_path, 'r', encoding='utf-8') as f:
@@ -1,4 +1,5 @@
 import os
+import sys
 import tempfile
 from typing import List, Optional
 from pathlib import Path
@@ -6,8 +7,16 @@ from mcp.server.fastmcp import FastMCP
 from dotenv import load_dotenv
 import subprocess
 import json
-from moviepy.editor import VideoFileClip, concatenate_videoclips, CompositeVideoClip
-from moviepy.video.fx import fadein, fadeout
+
+# Add the project root directory to the Python path
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from FractFlow.infra.lazy_import import lazy_import
+
+# moviepy takes seconds to import, load it on the first tool call instead of at startup
+editor = lazy_import('moviepy.editor')
+fx = lazy_import('moviepy.video.fx')
 
 
 load_dotenv()
@@ -15,8 +24,10 @@ mcp = FastMCP("video_processor")
 
 
 def ensure_moviepy():
-    """确保moviepy可用"""
-    if VideoFileClip is None:
+    """确保moviepy可用（首次调用时导入）"""
+    try:
+        editor.VideoFileClip
+    except ImportError:
         raise ImportError("moviepy is required but not installed. Install with: pip install moviepy")
 
 
@@ -82,7 +93,7 @@ async def concatenate_videos(video_paths: List[str], output_path: str, transitio
         clips = []
         for path in validated_paths:
             try:
-                clip = VideoFileClip(path)
+                clip = editor.VideoFileClip(path)
                 clips.append(clip)
             except Exception as e:
                 # 清理已加载的clips
@@ -96,18 +107,18 @@ async def concatenate_videos(video_paths: List[str], output_path: str, transitio
             for i, clip in enumerate(clips):
                 if i == 0:
                     # 第一个clip只需要fadeout
-                    processed_clip = clip.fx(fadeout, transition_duration)
+                    processed_clip = clip.fx(fx.fadeout, transition_duration)
                 elif i == len(clips) - 1:
                     # 最后一个clip只需要fadein
-                    processed_clip = clip.fx(fadein, transition_duration)
+                    processed_clip = clip.fx(fx.fadein, transition_duration)
                 else:
                     # 中间的clips需要fadein和fadeout
-                    processed_clip = clip.fx(fadein, transition_duration).fx(fadeout, transition_duration)
+                    processed_clip = clip.fx(fx.fadein, transition_duration).fx(fx.fadeout, transition_duration)
                 processed_clips.append(processed_clip)
             
-            final_clip = concatenate_videoclips(processed_clips, method="compose")
+            final_clip = editor.concatenate_videoclips(processed_clips, method="compose")
         else:
-            final_clip = concatenate_videoclips(clips, method="compose")
+            final_clip = editor.concatenate_videoclips(clips, method="compose")
         
         # 导出视频
         final_clip.write_videofile(
@@ -166,22 +177,22 @@ async def add_transitions(video_paths: List[str], transition_type: str = "fade",
         # 处理每个视频
         for i, path in enumerate(validated_paths):
             try:
-                clip = VideoFileClip(path)
+                clip = editor.VideoFileClip(path)
                 
                 # 根据过渡类型处理
                 if transition_type == "fade":
                     if i == 0:
                         # 第一个视频：只有fadeout
-                        processed_clip = clip.fx(fadeout, duration)
+                        processed_clip = clip.fx(fx.fadeout, duration)
                     elif i == len(validated_paths) - 1:
                         # 最后一个视频：只有fadein
-                        processed_clip = clip.fx(fadein, duration)
+                        processed_clip = clip.fx(fx.fadein, duration)
                     else:
                         # 中间视频：fadein + fadeout
-                        processed_clip = clip.fx(fadein, duration).fx(fadeout, duration)
+                        processed_clip = clip.fx(fx.fadein, duration).fx(fx.fadeout, duration)
                 else:
                     # 其他过渡类型暂时使用fade
-                    processed_clip = clip.fx(fadein, duration).fx(fadeout, duration)
+                    processed_clip = clip.fx(fx.fadein, duration).fx(fx.fadeout, duration)
                 
                 # 保存处理后的视频
                 output_filename = f"transition_{i:03d}_{os.path.basename(path)}"
@@ -238,7 +249,7 @@ async def convert_format(input_path: str, output_path: str, format: str = "mp4",
         output_path = ensure_output_dir(output_path)
         
         # 加载视频
-        clip = VideoFileClip(input_path)
+        clip = editor.VideoFileClip(input_path)
         
         # 根据质量设置参数
         if quality == "high":
@@ -309,7 +320,7 @@ async def optimize_quality(input_path: str, output_path: str, target_size_mb: Op
         original_size = os.path.getsize(input_path) / (1024 * 1024)  # MB
         
         # 加载视频
-        clip = VideoFileClip(input_path)
+        clip = editor.VideoFileClip(input_path)
         duration = clip.duration
         
         # 计算目标比特率
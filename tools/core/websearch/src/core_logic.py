@@ -17,11 +17,9 @@ License: MIT License
 """
 
 import asyncio
-import requests
 import httpx
 from typing import List, Dict, Optional, Any, Union
 from urllib.parse import urlparse, parse_qs, urljoin
-from bs4 import BeautifulSoup
 import logging
 import sys
 import os
@@ -30,23 +28,27 @@ import io
 from pathlib import Path
 from datetime import datetime
 
-# 尝试导入PDF处理库
-try:
-    import PyPDF2
-    PDF_SUPPORT = True
-except ImportError:
-    PDF_SUPPORT = False
-
 # Import search engines from search directory
 current_dir = Path(__file__).parent
 # Add current directory to path so we can import from search directory
 sys.path.append(str(current_dir))
+# Add the project root directory to the Python path
+sys.path.append(str(current_dir.parent.parent.parent.parent))
+
+from FractFlow.infra.lazy_import import lazy_import, is_available
+
+# HTTP, PDF and search engine libraries are loaded on first use, not at server startup
+requests = lazy_import('requests')
+PyPDF2 = lazy_import('PyPDF2')
+google_search = lazy_import('search.google_search')
+baidu_search = lazy_import('search.baidu_search')
+duckduckgo_search = lazy_import('search.duckduckgo_search')
+
+# 检查PDF处理库是否可用（不导入）
+PDF_SUPPORT = is_available('PyPDF2')
 
-# Import search models and engines
+# Import search models
 from search.base import SearchItem, WebSearchEngine
-from search.google_search import GoogleSearchEngine
-from search.baidu_search import BaiduSearchEngine
-from search.duckduckgo_search import DuckDuckGoSearchEngine
 
 # Constants
 MAX_CONTENT_LENGTH = 40000  # Maximum content length in characters
@@ -257,9 +259,9 @@ async def web_search(query: str, search_engine: str = "duckduckgo", num_results:
         
         # Initialize search engines
         engines = {
-            "google": GoogleSearchEngine(),
-            "baidu": BaiduSearchEngine(),
-            "duckduckgo": DuckDuckGoSearchEngine()
+            "google": google_search.GoogleSearchEngine(),
+            "baidu": baidu_search.BaiduSearchEngine(),
+            "duckduckgo": duckduckgo_search.DuckDuckGoSearchEngine()
         }
         
         if search_engine not in engines:
@@ -8,9 +8,19 @@ Date: 2025-05-02
 """
 
 from .base import SearchItem, WebSearchEngine
-from .google_search import GoogleSearchEngine
-from .baidu_search import BaiduSearchEngine
-from .duckduckgo_search import DuckDuckGoSearchEngine
+
+# Engines pull in their search client libraries, so they are imported on first use
+_ENGINE_MODULES = {
+    "GoogleSearchEngine": ".google_search",
+    "BaiduSearchEngine": ".baidu_search",
+    "DuckDuckGoSearchEngine": ".duckduckgo_search",
+}
+
+def __getattr__(name):
+    if name in _ENGINE_MODULES:
+        import importlib
+        return getattr(importlib.import_module(_ENGINE_MODULES[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
     "WebSearchEngine",